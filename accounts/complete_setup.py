@@ -5,9 +5,9 @@ Visit /complete-setup/ to initialize everything
 from django.http import HttpResponse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from events.cloudinary_sync import sync_event
 from events.models import Event, Photo
 import cloudinary
-import cloudinary.api
 from decouple import config
 from datetime import datetime
 
@@ -102,60 +102,25 @@ def complete_setup(request):
             api_secret=config('CLOUDINARY_API_SECRET')
         )
         
-        output.append("<p>📡 Fetching photos from Cloudinary...</p>")
+        output.append("<p>📡 Syncing photos uploaded to Cloudinary since the last sync...</p>")
         
-        # Fetch all photos from Cloudinary root
-        resources = cloudinary.api.resources(
-            type='upload',
-            max_results=500
-        )
-        
-        cloudinary_photos = resources.get('resources', [])
-        total_cloudinary = len(cloudinary_photos)
-        
-        output.append(f"<p class='success'>✅ Found {total_cloudinary} photos in Cloudinary</p>")
+        # All pages of the Cloudinary root, from the last checkpoint on
+        stats = sync_event(event)
+        synced = stats['created']
+        skipped = stats['existing']
+        errors = stats['errors']
         
-        # Sync to database
-        synced = 0
-        skipped = 0
-        errors = 0
-        
-        output.append("<p>🔄 Syncing to database...</p>")
+        output.append(f"<p class='success'>✅ Listed {stats['listed']} photos in Cloudinary ({stats['pages']} pages)</p>")
         output.append("<ul>")
-        
-        for idx, photo_data in enumerate(cloudinary_photos, 1):
-            public_id = photo_data['public_id']
-            cloudinary_url = photo_data['secure_url']
-            
-            # Check if already exists
-            if Photo.objects.filter(image__contains=public_id).exists():
-                skipped += 1
-                if idx <= 5:  # Show first 5
-                    output.append(f"<li class='warning'>⏭️ [{idx}/{total_cloudinary}] {public_id} - Already exists</li>")
-                continue
-            
-            try:
-                # Create photo
-                photo = Photo.objects.create(
-                    event=event,
-                    image=cloudinary_url
-                )
-                synced += 1
-                if idx <= 5:  # Show first 5
-                    output.append(f"<li class='success'>✅ [{idx}/{total_cloudinary}] {public_id} - Created</li>")
-            except Exception as e:
-                errors += 1
-                if idx <= 5:
-                    output.append(f"<li class='error'>❌ [{idx}/{total_cloudinary}] {public_id} - Error: {str(e)}</li>")
-        
-        if total_cloudinary > 5:
-            output.append(f"<li>... processing {total_cloudinary - 5} more photos ...</li>")
-        
+        for photo in stats['photos'][:5]:  # Show first 5
+            output.append(f"<li class='success'>✅ {photo.public_id} - Created</li>")
+        if synced > 5:
+            output.append(f"<li>... and {synced - 5} more photos ...</li>")
         output.append("</ul>")
         
         output.append(f"<p class='success'><strong>📊 Sync Summary:</strong></p>")
         output.append(f"<ul>")
-        output.append(f"<li>Total in Cloudinary: {total_cloudinary}</li>")
+        output.append(f"<li>Listed in Cloudinary: {stats['listed']}</li>")
         output.append(f"<li>Newly Synced: {synced}</li>")
         output.append(f"<li>Already Existed: {skipped}</li>")
         output.append(f"<li>Errors: {errors}</li>")
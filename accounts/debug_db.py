@@ -28,7 +28,7 @@ def debug_db(request):
         output_html += f"<h2>📅 Events: {events.count()}</h2>"
         output_html += "<ul>"
         for event in events:
-            photo_count = event.photos.count()
+            photo_count = event.photo_count
             output_html += f"<li><strong>{event.name}</strong> (slug: {event.slug}) - Photos: {photo_count} - Public: {event.is_public}</li>"
         output_html += "</ul>"
         
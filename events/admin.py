@@ -1,5 +1,6 @@
-from django.contrib import admin
-from .models import Event, Photo, FaceEncoding, SearchHistory
+from django.contrib import admin, messages
+from .deletion import delete_photos, schedule_event_deletion
+from .models import Event, EventDeletion, Photo, FaceEncoding, EmbeddingIndex, UploadBatch, UploadItem, SyncCheckpoint, SearchHistory
 
 
 @admin.register(Event)
@@ -7,11 +8,11 @@ class EventAdmin(admin.ModelAdmin):
     """
     Admin interface for Event model
     """
-    list_display = ['name', 'event_date', 'location', 'is_public', 'created_by', 'get_photo_count', 'created_at']
+    list_display = ['name', 'event_date', 'location', 'is_public', 'created_by', 'photo_count', 'face_count', 'created_at']
     list_filter = ['is_public', 'event_date', 'created_at']
     search_fields = ['name', 'description', 'location']
     prepopulated_fields = {'slug': ('name',)}
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at', 'photo_count', 'face_count', 'processed_count', 'last_photo_at']
     date_hierarchy = 'event_date'
     
     fieldsets = (
@@ -24,11 +25,23 @@ class EventAdmin(admin.ModelAdmin):
         ('Settings', {
             'fields': ('is_public', 'created_by')
         }),
+        ('Counters', {
+            'fields': ('photo_count', 'face_count', 'processed_count', 'last_photo_at'),
+            'description': 'Maintained automatically; run recount_events to repair them'
+        }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
+    
+    def delete_model(self, request, obj):
+        schedule_event_deletion(obj, requested_by=request.user)
+    
+    def delete_queryset(self, request, queryset):
+        # Hidden now, deleted by the background job (see deletion.py)
+        for event in queryset:
+            schedule_event_deletion(event, requested_by=request.user)
 
 
 @admin.register(Photo)
@@ -36,11 +49,23 @@ class PhotoAdmin(admin.ModelAdmin):
     """
     Admin interface for Photo model
     """
-    list_display = ['event', 'uploaded_by', 'faces_processed', 'face_count', 'uploaded_at']
-    list_filter = ['faces_processed', 'uploaded_at', 'event']
-    search_fields = ['caption', 'event__name']
-    readonly_fields = ['uploaded_at']
+    list_display = ['event', 'uploaded_by', 'processing_status', 'face_count', 'face_detector', 'model_version', 'uploaded_at']
+    list_filter = ['processing_status', 'faces_processed', 'face_detector', 'model_version', 'uploaded_at', 'event']
+    search_fields = ['caption', 'event__name', 'processing_error', 'public_id']
+    readonly_fields = [
+        'uploaded_at', 'processing_error', 'processing_attempts', 'processing_duration', 'processed_at',
+        'public_id', 'secure_url', 'width', 'height', 'bytes'
+    ]
     date_hierarchy = 'uploaded_at'
+    
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Photo.objects.filter(pk=obj.pk))
+    
+    def delete_queryset(self, request, queryset):
+        # Cloudinary files go with the rows (Photo is ignored by django-cleanup)
+        result = delete_photos(queryset)
+        for error in result['errors']:
+            self.message_user(request, error, messages.WARNING)
 
 
 @admin.register(FaceEncoding)
@@ -48,12 +73,68 @@ class FaceEncodingAdmin(admin.ModelAdmin):
     """
     Admin interface for FaceEncoding model
     """
-    list_display = ['photo', 'created_at']
-    list_filter = ['created_at']
+    list_display = ['photo', 'model_version', 'created_at']
+    list_filter = ['model_version', 'created_at']
     search_fields = ['photo__event__name']
     readonly_fields = ['created_at', 'encoding']
 
 
+@admin.register(EmbeddingIndex)
+class EmbeddingIndexAdmin(admin.ModelAdmin):
+    """
+    Admin interface for EmbeddingIndex model (use migrate_embeddings to change state)
+    """
+    list_display = ['model_version', 'state', 'created_at', 'activated_at']
+    list_filter = ['state']
+    readonly_fields = ['model_version', 'state', 'created_at', 'activated_at']
+
+
+class UploadItemInline(admin.TabularInline):
+    model = UploadItem
+    extra = 0
+    fields = [
+        'position', 'filename', 'status', 'message', 'photo', 'face_count',
+        'received_bytes', 'upload_seconds', 'upload_attempts', 'finished_at'
+    ]
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(UploadBatch)
+class UploadBatchAdmin(admin.ModelAdmin):
+    """
+    Admin interface for UploadBatch model
+    """
+    list_display = ['event', 'created_by', 'is_open', 'created_at', 'finished_at']
+    list_filter = ['is_open', 'event', 'created_at']
+    readonly_fields = ['event', 'created_by', 'is_open', 'created_at', 'finished_at']
+    inlines = [UploadItemInline]
+
+
+@admin.register(SyncCheckpoint)
+class SyncCheckpointAdmin(admin.ModelAdmin):
+    """
+    Admin interface for SyncCheckpoint model (delete one to resync its folder from scratch)
+    """
+    list_display = ['event', 'folder', 'last_created_at', 'synced_count', 'last_synced_at']
+    list_filter = ['event']
+    readonly_fields = ['last_created_at', 'cursor', 'cursor_start_at', 'synced_count', 'last_synced_at', 'updated_at']
+
+
+@admin.register(EventDeletion)
+class EventDeletionAdmin(admin.ModelAdmin):
+    """
+    Admin interface for EventDeletion model (use resume_deletions to retry)
+    """
+    list_display = ['event_name', 'status', 'deleted_photos', 'failed_photos', 'total_photos', 'requested_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['event_name', 'message']
+    readonly_fields = [
+        'event', 'event_name', 'requested_by', 'status', 'total_photos', 'deleted_photos', 'failed_photos',
+        'deleted_folders', 'message', 'created_at', 'started_at', 'finished_at'
+    ]
+
+
 @admin.register(SearchHistory)
 class SearchHistoryAdmin(admin.ModelAdmin):
     """
@@ -0,0 +1,93 @@
+"""
+Streaming ZIP downloads for Hackotsava 2025
+
+stream_photo_zip writes the archive as it goes: each photo is fetched
+through the pooled media session (fetch_many, at most
+DOWNLOAD_ZIP_READ_AHEAD photos ahead of the writer), written as a stored
+entry and handed to the response in ZIP_CHUNK_SIZE pieces. zipfile writes
+to the unseekable response with data descriptors and switches to ZIP64
+records by itself once the archive passes 4GB or 65535 entries, so memory
+per download stays at a few photos whatever the archive size.
+"""
+
+import os
+import zipfile
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import media
+
+
+# Bytes handed to the response at a time
+ZIP_CHUNK_SIZE = 1024 * 1024
+
+
+class _ChunkWriter:
+    """Write-only file object collecting zipfile's output until it is drained"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _entry_info(name, photo, size):
+    date_time = timezone.localtime(photo.uploaded_at).timetuple()[:6] if photo.uploaded_at else None
+    if date_time is None or date_time[0] < 1980:
+        date_time = (1980, 1, 1, 0, 0, 0)
+    info = zipfile.ZipInfo(name, date_time=date_time)
+    info.compress_type = zipfile.ZIP_STORED  # JPEGs don't compress; storing is fastest
+    info.external_attr = 0o644 << 16
+    info.file_size = size
+    return info
+
+
+def stream_photo_zip(photos, read_ahead=None):
+    """
+    Generate a ZIP archive of photo originals chunk by chunk.
+
+    Photos that can't be downloaded are left out (the response has already
+    started, so there is no error status to send).
+
+    Args:
+        photos: List of Photo objects, in archive order; no database access
+            happens while streaming
+        read_ahead: Photos downloaded ahead of the writer (defaults to
+            DOWNLOAD_ZIP_READ_AHEAD)
+
+    Yields:
+        bytes: successive pieces of the archive
+    """
+    writer = _ChunkWriter()
+    urls = [photo.get_image_url() for photo in photos]
+    added = 0
+
+    with zipfile.ZipFile(writer, 'w', zipfile.ZIP_STORED) as archive:
+        fetched = media.fetch_many(urls, window=read_ahead or settings.DOWNLOAD_ZIP_READ_AHEAD)
+        for idx, (photo, (photo_url, content, error)) in enumerate(zip(photos, fetched), 1):
+            if error is not None:
+                print(f"  ✗ Failed to download photo {photo.id}: {error}")
+                continue
+
+            filename = f"{idx:03d}_{os.path.basename(photo.image.name)}"
+            view = memoryview(content)
+            with archive.open(_entry_info(filename, photo, len(content)), 'w') as entry:
+                for start in range(0, len(view), ZIP_CHUNK_SIZE):
+                    entry.write(view[start:start + ZIP_CHUNK_SIZE])
+                    yield writer.drain()
+            added += 1
+            print(f"  ✓ Added {idx}/{len(photos)}: {filename[:50]}...")
+
+    yield writer.drain()
+    print(f"✅ ZIP streamed with {added}/{len(photos)} photos")
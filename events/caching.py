@@ -0,0 +1,195 @@
+"""
+Page and fragment caching for public pages
+
+Anonymous visitors all see the same home, event list, event and gallery
+pages, so those responses are cached whole (cache_anonymous_page) and
+logged-in visitors get the expensive parts from template fragment caches.
+Every key includes a version instead of being deleted on changes:
+
+- an event's pages use the event's version, which is bumped whenever the
+  event is edited or its photos are added, processed or removed
+  (Event.save and Event.adjust_counters)
+- pages listing events use the site version, the number of events and the
+  newest updated_at among them
+
+Old entries simply stop being read and age out, which works the same with
+the locmem, file and database backends (see CACHES in settings).
+
+The same versions make HTTP validators (conditional): galleries send an
+ETag built from the event version and page cursor and photo downloads one
+built from the photo's content hash, so a browser that already holds the
+content gets 304 Not Modified before any rendering or image re-encoding.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import Event, Photo
+
+
+def site_cache_version():
+    """Version of everything that lists events (changes with any event)"""
+    stats = Event.all_objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    updated = stats['updated'].timestamp() if stats['updated'] else 0
+    return f"{stats['count']}.{updated}"
+
+
+def event_cache_version(slug):
+    """
+    Version of one event's pages.
+
+    Returns:
+        str, or None when there is no such (visible) event
+    """
+    row = Event.objects.filter(slug=slug).values_list('id', 'version').first()
+    if row is None:
+        return None
+    return f"{row[0].hex}.{row[1]}"
+
+
+def page_cache_key(request, name, version):
+    """Cache key of a page for a URL (path and query string) at a version"""
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"page:{name}:{version}:{url}"
+
+
+def cache_anonymous_page(version_func):
+    """
+    Serve anonymous GET requests for a view from the cache.
+
+    Only 200 responses that set no cookies and carry no CSRF token or
+    flash messages are stored, so nothing session-specific is shared.
+
+    Args:
+        version_func: Called with the view's arguments (request, *args,
+            **kwargs); returns the version the page depends on, or None to
+            skip the cache
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated or len(messages.get_messages(request)):
+                return view(request, *args, **kwargs)
+
+            version = version_func(request, *args, **kwargs)
+            if version is None:
+                return view(request, *args, **kwargs)
+
+            key = page_cache_key(request, view.__name__, version)
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view(request, *args, **kwargs)
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not response.cookies
+                and not request.META.get('CSRF_COOKIE_USED')
+            ):
+                cache.set(key, response, settings.PAGE_CACHE_SECONDS)
+            return response
+        return wrapper
+    return decorator
+
+
+def site_page_version(request, *args, **kwargs):
+    """version_func for pages listing events"""
+    return site_cache_version()
+
+
+def event_page_version(request, slug, *args, **kwargs):
+    """version_func for pages of one event"""
+    return event_cache_version(slug)
+
+
+def _can_see(request, is_public):
+    return is_public or (request.user.is_authenticated and request.user.is_admin())
+
+
+def _viewer_key(request):
+    """Part of an ETag for pages that differ per visitor (menus, admin controls)"""
+    if not request.user.is_authenticated:
+        return 'anon'
+    return f"{request.user.pk}.{int(request.user.is_admin())}"
+
+
+def _etag(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def conditional(validators_func):
+    """
+    Answer conditional GETs for a view with 304 Not Modified before it runs.
+
+    Wraps django's condition() so the validators are looked up once per
+    request, and marks the responses private and no-cache: browsers keep
+    them but revalidate every time, which costs one small query.
+
+    Args:
+        validators_func: Called with the view's arguments; returns
+            (etag, last_modified), or None when the request can't be
+            validated (missing or hidden object, pending messages)
+    """
+    def validators(request, *args, **kwargs):
+        if not hasattr(request, '_validators'):
+            request._validators = validators_func(request, *args, **kwargs) or (None, None)
+        return request._validators
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if validators(request, *args, **kwargs)[0] is not None and response.status_code == 200:
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return condition(
+            etag_func=lambda request, *args, **kwargs: validators(request, *args, **kwargs)[0],
+            last_modified_func=lambda request, *args, **kwargs: validators(request, *args, **kwargs)[1],
+        )(wrapper)
+    return decorator
+
+
+def gallery_validators(request, slug, *args, **kwargs):
+    """
+    Validators for a gallery page: event version, page cursor and visitor.
+
+    Returns:
+        tuple: (etag, last_modified), or None
+    """
+    if len(messages.get_messages(request)):
+        return None
+    row = Event.objects.filter(slug=slug).values_list('id', 'version', 'updated_at', 'is_public').first()
+    if row is None or not _can_see(request, row[3]):
+        return None
+    event_id, version, updated_at, _ = row
+    etag = _etag('gallery', event_id.hex, version, request.GET.get('cursor', ''), _viewer_key(request))
+    return etag, updated_at
+
+
+def download_validators(request, photo_id, *args, **kwargs):
+    """
+    Validators for a photo download: photo id and content hash.
+
+    Photos stored before content hashing are identified by their stored
+    name instead (a re-upload gets a new one).
+
+    Returns:
+        tuple: (etag, last_modified), or None
+    """
+    row = Photo.objects.filter(id=photo_id, event__deleted_at__isnull=True).values_list(
+        'content_hash', 'image', 'uploaded_at', 'event__is_public'
+    ).first()
+    if row is None or not _can_see(request, row[3]):
+        return None
+    content_hash, name, uploaded_at, _ = row
+    # 'jpeg95' names the re-encoding; change it with the download format
+    return _etag('download', photo_id, content_hash or name, 'jpeg95'), uploaded_at
@@ -0,0 +1,260 @@
+"""
+Incremental sync of Cloudinary images into an event
+
+The Admin API listing is paged through oldest first, starting from the
+event/folder checkpoint (the newest created_at already synced), and new
+images are inserted as Photo rows in bulk. Each page's photos and the
+checkpoint (including the page cursor) are committed together, so an
+interrupted sync resumes where it stopped instead of rescanning the
+account, and a finished one only lists images uploaded since.
+
+Folder listings are different: the Admin API ignores start_at and
+direction together with a prefix and orders by public_id, so a folder is
+paged through by next_cursor alone and images older than the checkpoint
+are dropped on our side. An image uploaded while such a listing runs can
+sort before its position, so the checkpoint of a folder is the time the
+listing began (less FOLDER_SYNC_MARGIN), not the newest created_at seen.
+"""
+
+from datetime import timedelta
+
+import cloudinary.api
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import media
+from .face_utils import compute_content_hash, compute_perceptual_hash, find_duplicate_photo
+from .models import Photo, SyncCheckpoint
+from .renditions import RENDITION_FIELDS
+
+
+# Allowance for clock differences between Cloudinary and us when a folder
+# checkpoint is taken from our clock
+FOLDER_SYNC_MARGIN = timedelta(minutes=5)
+
+
+def rendition_folders():
+    """Folders our stored renditions are uploaded to (they are not photos to sync)"""
+    return {
+        Photo._meta.get_field(field).upload_to.split('%', 1)[0]
+        for field in RENDITION_FIELDS
+    }
+
+
+def is_rendition(public_id, folders=None):
+    """Whether a Cloudinary public_id is one of our stored renditions"""
+    path = '/' + public_id
+    return any(f'/{folder}' in path for folder in (folders or rendition_folders()))
+
+
+def list_resources(folder='', start_at=None, cursor=None, page_size=None):
+    """
+    Page through the uploaded images of the account (oldest first) or of a folder.
+
+    The Admin API supports start_at and direction only without a prefix; a
+    folder is listed in public_id order and filtered by start_at here.
+
+    Args:
+        folder: Cloudinary folder prefix ('' for the whole account)
+        start_at: Only images created at or after this datetime
+        cursor: next_cursor to continue an earlier listing from
+        page_size: Images per Admin API call (max 500)
+
+    Yields:
+        tuple: (resources, next_cursor) per page; next_cursor is None on the last page
+    """
+    params = {
+        'type': 'upload',
+        'resource_type': 'image',
+        'max_results': page_size or settings.CLOUDINARY_SYNC_PAGE_SIZE,
+    }
+    if folder:
+        params['prefix'] = folder
+    else:
+        params['direction'] = 'asc'
+        if start_at:
+            params['start_at'] = start_at.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    while True:
+        if cursor:
+            params['next_cursor'] = cursor
+        response = cloudinary.api.resources(**params)
+        cursor = response.get('next_cursor')
+        resources = response.get('resources', [])
+        if folder and start_at:
+            resources = [resource for resource in resources if _created_since(resource, start_at)]
+        yield resources, cursor
+        if not cursor:
+            return
+
+
+def _created_since(resource, start_at):
+    created_at = parse_datetime(resource.get('created_at') or '')
+    return created_at is None or created_at >= start_at
+
+
+def _build_photos(event, resources, hash_originals, stats, uploaded_by=None):
+    """
+    Create unsaved Photo rows for new resources.
+
+    With hash_originals the originals are downloaded (a few at a time) to
+    fill in the content and perceptual hashes, and images whose exact bytes
+    are already in the event are left out.
+    """
+    if not hash_originals:
+        return [
+            Photo.from_cloudinary_resource(resource, event=event, uploaded_by=uploaded_by)
+            for resource in resources
+        ]
+
+    photos = []
+    seen_hashes = set()
+    urls = [resource['secure_url'] for resource in resources]
+    for resource, (url, content, error) in zip(resources, media.fetch_many(urls)):
+        if error is not None:
+            # Still created: face processing downloads it again and records any failure
+            print(f"  ⚠️  Could not download {resource['public_id']}: {str(error)}")
+            stats['errors'] += 1
+            photos.append(Photo.from_cloudinary_resource(resource, event=event, uploaded_by=uploaded_by))
+            continue
+
+        content_hash = compute_content_hash(content)
+        if content_hash in seen_hashes or find_duplicate_photo(content_hash, event=event):
+            stats['duplicates'] += 1
+            continue
+        seen_hashes.add(content_hash)
+        photos.append(Photo.from_cloudinary_resource(
+            resource,
+            event=event,
+            uploaded_by=uploaded_by,
+            content_hash=content_hash,
+            perceptual_hash=compute_perceptual_hash(content)
+        ))
+    return photos
+
+
+def _with_dimensions(resources):
+    """
+    Existing photos of the given resources that lack their size, with the
+    size the Admin API reports filled in (unsaved).
+    """
+    by_public_id = {resource['public_id']: resource for resource in resources}
+    if not by_public_id:
+        return []
+
+    photos = list(Photo.objects.filter(public_id__in=list(by_public_id), width__isnull=True).only('id', 'public_id'))
+    for photo in photos:
+        resource = by_public_id[photo.public_id]
+        photo.width = resource.get('width')
+        photo.height = resource.get('height')
+        photo.bytes = resource.get('bytes')
+    return photos
+
+
+def _save_page(photos, sized, checkpoint, stats):
+    """
+    Insert a page of new photos and advance the checkpoint in one transaction.
+
+    An upload notification (webhooks.py) can create one of the photos
+    between the existing_public_ids check and the insert; the page is then
+    retried without the photos that now exist.
+
+    Returns:
+        list: the Photo rows actually created
+    """
+    while True:
+        try:
+            with transaction.atomic():
+                Photo.objects.bulk_create(photos, batch_size=settings.CLOUDINARY_SYNC_BATCH_SIZE)
+                Photo.objects.bulk_update(sized, ['width', 'height', 'bytes'], batch_size=settings.CLOUDINARY_SYNC_BATCH_SIZE)
+                checkpoint.synced_count += len(photos)
+                checkpoint.save()
+            return photos
+        except IntegrityError:
+            taken = Photo.existing_public_ids(photo.public_id for photo in photos)
+            if not taken:
+                raise
+            print(f"  ↻ {len(taken)} photo(s) were added meanwhile, retrying the page without them")
+            photos = [photo for photo in photos if photo.public_id not in taken]
+            stats['existing'] += len(taken)
+
+
+def sync_event(event, folder='', full=False, hash_originals=False, uploaded_by=None, on_page=None):
+    """
+    Create Photo rows for the Cloudinary images of a folder not yet in the database.
+
+    Args:
+        event: Event the photos are added to
+        folder: Cloudinary folder prefix ('' for the whole account)
+        full: Ignore the checkpoint and list every image again
+        hash_originals: Download new originals to hash them and skip
+            exact duplicates already in the event
+        uploaded_by: User recorded as the uploader of the created photos
+        on_page: Optional callback(page_number, photos) after each page is
+            saved, with the Photo rows created from it
+
+    Returns:
+        dict: {'pages', 'listed', 'created', 'existing', 'renditions',
+        'duplicates', 'errors', 'photos'} - 'photos' are the created rows
+    """
+    checkpoint, _ = SyncCheckpoint.objects.get_or_create(event=event, folder=folder)
+    if full:
+        checkpoint.last_created_at = None
+        checkpoint.cursor = ''
+        checkpoint.cursor_start_at = None
+
+    # Continue an interrupted run with the listing its cursor belongs to
+    if checkpoint.cursor:
+        start_at, cursor = checkpoint.cursor_start_at, checkpoint.cursor
+    else:
+        start_at, cursor = checkpoint.last_created_at, None
+        if folder:
+            # Saved with the first page and kept through a resumed run
+            checkpoint.last_created_at = timezone.now() - FOLDER_SYNC_MARGIN
+
+    stats = {
+        'pages': 0,
+        'listed': 0,
+        'created': 0,
+        'existing': 0,
+        'renditions': 0,
+        'duplicates': 0,
+        'errors': 0,
+        'photos': [],
+    }
+    folders = rendition_folders()
+
+    for resources, next_cursor in list_resources(folder, start_at=start_at, cursor=cursor):
+        stats['pages'] += 1
+        stats['listed'] += len(resources)
+
+        candidates = [resource for resource in resources if not is_rendition(resource['public_id'], folders)]
+        stats['renditions'] += len(resources) - len(candidates)
+
+        existing = Photo.existing_public_ids(resource['public_id'] for resource in candidates)
+        new_resources = [resource for resource in candidates if resource['public_id'] not in existing]
+        stats['existing'] += len(candidates) - len(new_resources)
+
+        photos = _build_photos(event, new_resources, hash_originals, stats, uploaded_by=uploaded_by)
+        sized = _with_dimensions([resource for resource in candidates if resource['public_id'] in existing])
+
+        created_at = [parse_datetime(resource['created_at']) for resource in resources if resource.get('created_at')]
+        if created_at and not folder:
+            newest = max(created_at)
+            if checkpoint.last_created_at is None or newest > checkpoint.last_created_at:
+                checkpoint.last_created_at = newest
+        checkpoint.cursor = next_cursor or ''
+        checkpoint.cursor_start_at = start_at if next_cursor else None
+        if not next_cursor:
+            checkpoint.last_synced_at = timezone.now()
+
+        photos = _save_page(photos, sized, checkpoint, stats)
+
+        stats['created'] += len(photos)
+        stats['photos'].extend(photos)
+        if on_page:
+            on_page(stats['pages'], photos)
+
+    return stats
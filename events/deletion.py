@@ -0,0 +1,369 @@
+"""
+Batched photo deletion for Hackotsava 2025
+
+Deleting photos one at a time costs a query to load each photo, a
+Cloudinary destroy call per file and a cascade per photo. delete_photos
+loads the whole selection in one query, removes the originals and their
+stored renditions from Cloudinary with the bulk delete_resources call (up
+to 100 public_ids per call, several calls at once) and then deletes the
+face encodings and photos with set-based queries in one transaction.
+
+A photo whose files could not be removed from Cloudinary keeps its row,
+so deleting it again retries instead of leaving the files orphaned (and
+re-imported by the next full sync).
+
+Deleting an event (schedule_event_deletion) hides it at once and hands
+the work to the background pool. The job first removes the Cloudinary
+folders synced into the event with delete_resources_by_prefix, when no
+other event has photos there, and then deletes the photos in batches of
+EVENT_DELETION_BATCH_SIZE, recording its progress on an EventDeletion row
+for the dashboard.
+"""
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import cloudinary.api
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from . import tasks
+from .models import Event, EventDeletion, FaceEncoding, Photo, SyncCheckpoint
+from .renditions import RENDITION_FIELDS
+
+
+# Most public_ids the Admin API accepts per delete_resources call
+DELETE_CHUNK_SIZE = 100
+
+# Rows per DELETE statement (keeps IN lists within database limits)
+DATABASE_BATCH_SIZE = 500
+
+
+def photo_public_ids(photo):
+    """
+    Cloudinary public_ids of a photo's original and stored renditions.
+
+    Stored names are public_ids (the storage saves images without extension);
+    photos only known by URL have none to delete.
+    """
+    public_ids = []
+    if photo.public_id:
+        public_ids.append(photo.public_id)
+    elif photo.image.name and not photo.image.name.startswith(('http://', 'https://')):
+        public_ids.append(photo.image.name)
+    for field in RENDITION_FIELDS:
+        name = getattr(photo, field).name
+        if name:
+            public_ids.append(name)
+    return public_ids
+
+
+def _valid_id(photo_id):
+    try:
+        uuid.UUID(str(photo_id))
+    except ValueError:
+        return False
+    return True
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _delete_chunk(public_ids):
+    """
+    Delete one chunk of images from Cloudinary.
+
+    Returns:
+        dict: public_id -> error message for the ones that were not deleted
+    """
+    try:
+        response = cloudinary.api.delete_resources(public_ids, invalidate=True)
+    except Exception as e:
+        return {public_id: str(e) for public_id in public_ids}
+
+    results = response.get('deleted', {})
+    return {
+        public_id: results.get(public_id, 'no result')
+        for public_id in public_ids
+        if results.get(public_id) not in ('deleted', 'not_found')
+    }
+
+
+def delete_from_cloudinary(public_ids, workers=None):
+    """
+    Delete images from Cloudinary in chunks of DELETE_CHUNK_SIZE, several chunks at once.
+
+    Images that are already gone count as deleted.
+
+    Args:
+        public_ids: Cloudinary public_ids
+        workers: Concurrent delete_resources calls (defaults to CLOUDINARY_DELETE_WORKERS)
+
+    Returns:
+        dict: public_id -> error message for every image that could not be deleted
+    """
+    chunks = list(_chunks(list(dict.fromkeys(public_ids)), DELETE_CHUNK_SIZE))
+    if not chunks:
+        return {}
+
+    workers = min(workers or settings.CLOUDINARY_DELETE_WORKERS, len(chunks))
+    failures = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cloudinary-delete') as executor:
+        for chunk_failures in executor.map(_delete_chunk, chunks):
+            failures.update(chunk_failures)
+    return failures
+
+
+def delete_photo_rows(photo_ids):
+    """
+    Delete photos and their face encodings with set-based queries in one transaction.
+
+    Returns:
+        int: Number of photos deleted
+    """
+    photo_ids = list(photo_ids)
+    deleted = 0
+    with transaction.atomic():
+        for batch in _chunks(photo_ids, DATABASE_BATCH_SIZE):
+            FaceEncoding.objects.filter(photo_id__in=batch).delete()
+            deleted += Photo.objects.filter(id__in=batch).delete()[1].get(Photo._meta.label, 0)
+    return deleted
+
+
+def delete_photos(photos, workers=None, deleted_prefixes=()):
+    """
+    Delete photos from Cloudinary and the database.
+
+    Args:
+        photos: Photo queryset (or iterable of photo ids)
+        workers: Concurrent Cloudinary delete calls
+        deleted_prefixes: Cloudinary prefixes already deleted as a whole;
+            images under them are not deleted again
+
+    Returns:
+        dict: {'requested', 'deleted', 'missing', 'failed', 'errors'} -
+        'failed' are photos kept because Cloudinary did not delete their
+        files, 'missing' are requested ids with no photo, 'errors' lists
+        one message per failed or missing photo
+    """
+    if isinstance(photos, QuerySet):
+        queryset = photos
+        requested = None
+    else:
+        requested = [str(photo_id) for photo_id in photos]
+        queryset = Photo.objects.filter(id__in=[photo_id for photo_id in requested if _valid_id(photo_id)])
+
+    rows = list(queryset.only('id', 'public_id', 'image', *RENDITION_FIELDS))
+    result = {
+        'requested': len(requested) if requested is not None else len(rows),
+        'deleted': 0,
+        'missing': 0,
+        'failed': 0,
+        'errors': [],
+    }
+
+    if requested is not None:
+        found = {photo.id for photo in rows}
+        for photo_id in dict.fromkeys(requested):
+            if not _valid_id(photo_id) or uuid.UUID(photo_id) not in found:
+                result['missing'] += 1
+                result['errors'].append(f"Photo {photo_id} not found")
+
+    deleted_prefixes = tuple(folder_prefix(prefix) for prefix in deleted_prefixes)
+    public_ids = {
+        photo.id: [
+            public_id for public_id in photo_public_ids(photo)
+            if not (deleted_prefixes and public_id.startswith(deleted_prefixes))
+        ]
+        for photo in rows
+    }
+    failures = delete_from_cloudinary(
+        [public_id for ids in public_ids.values() for public_id in ids],
+        workers=workers
+    )
+
+    deletable = []
+    for photo in rows:
+        failed = [public_id for public_id in public_ids[photo.id] if public_id in failures]
+        if failed:
+            result['failed'] += 1
+            result['errors'].append(
+                f"Photo {photo.id} kept: Cloudinary did not delete {failed[0]} ({failures[failed[0]]})"
+            )
+        else:
+            deletable.append(photo.id)
+
+    result['deleted'] = delete_photo_rows(deletable)
+    if result['failed']:
+        print(f"⚠️  {result['failed']} photo(s) kept after Cloudinary deletion failures")
+    return result
+
+
+def folder_prefix(folder):
+    """Prefix matching only what is inside a folder ('shoots/day1' -> 'shoots/day1/', not 'shoots/day10')"""
+    return folder.rstrip('/') + '/'
+
+
+def delete_cloudinary_prefix(prefix):
+    """
+    Delete every image under a folder prefix, 1000 per call.
+
+    Returns:
+        int: Number of images deleted
+    """
+    prefix = folder_prefix(prefix)
+    deleted = 0
+    while True:
+        response = cloudinary.api.delete_resources_by_prefix(prefix, invalidate=True)
+        deleted += sum(1 for status in response.get('deleted', {}).values() if status == 'deleted')
+        if not response.get('partial'):
+            return deleted
+
+
+def event_folders(event):
+    """
+    Cloudinary folders synced into an event that can be deleted by prefix.
+
+    A folder qualifies only if it is a real folder (not the whole account),
+    does not overlap the storage's own folder or another event's sync
+    folder, and no photo of another event lives under it. Folders are
+    returned as prefixes ending in '/', so deleting 'shoots/day1' never
+    touches 'shoots/day10'.
+    """
+    storage_prefix = folder_prefix(settings.CLOUDINARY_STORAGE.get('PREFIX', 'media'))
+    other_folders = {
+        folder_prefix(folder)
+        for folder in SyncCheckpoint.objects.exclude(event=event).exclude(folder='').values_list('folder', flat=True)
+    }
+
+    folders = []
+    for folder in event.sync_checkpoints.exclude(folder='').values_list('folder', flat=True):
+        folder = folder_prefix(folder)
+        if folder == '/':
+            continue
+        if folder.startswith(storage_prefix) or storage_prefix.startswith(folder):
+            continue
+        if any(other.startswith(folder) or folder.startswith(other) for other in other_folders):
+            continue
+        if Photo.objects.filter(public_id__startswith=folder).exclude(event=event).exists():
+            continue
+        folders.append(folder)
+    return folders
+
+
+def schedule_event_deletion(event, requested_by=None):
+    """
+    Hide an event and delete it in the background.
+
+    Returns:
+        EventDeletion tracking the job
+    """
+    with transaction.atomic():
+        event.deleted_at = timezone.now()
+        event.save(update_fields=['deleted_at'])
+        deletion = EventDeletion.objects.create(
+            event=event,
+            event_name=event.name,
+            requested_by=requested_by,
+            total_photos=event.photos.count()
+        )
+        transaction.on_commit(lambda: tasks.submit(run_event_deletion, deletion.id))
+
+    print(f"🗑️  Event {event.name} hidden, deleting {deletion.total_photos} photos in the background")
+    return deletion
+
+
+def run_event_deletion(deletion_id):
+    """
+    Delete a hidden event's Cloudinary images, photos and finally the event.
+
+    Safe to run again after an interruption or a failure: whatever is
+    already gone is skipped.
+
+    Returns:
+        str: the final EventDeletion status
+    """
+    deletion = EventDeletion.objects.get(pk=deletion_id)
+    event = Event.all_objects.filter(pk=deletion.event_id).first()
+    if event is None:
+        deletion.status = EventDeletion.Status.DONE
+        deletion.finished_at = deletion.finished_at or timezone.now()
+        deletion.save(update_fields=['status', 'finished_at'])
+        return deletion.status
+
+    deletion.status = EventDeletion.Status.RUNNING
+    deletion.started_at = timezone.now()
+    deletion.failed_photos = 0
+    deletion.message = ''
+    deletion.save(update_fields=['status', 'started_at', 'failed_photos', 'message'])
+
+    try:
+        folders = event_folders(event)
+        for folder in folders:
+            count = delete_cloudinary_prefix(folder)
+            print(f"  🗑️  Deleted {count} Cloudinary images under {folder}")
+        deletion.deleted_folders = '\n'.join(folders)
+        deletion.save(update_fields=['deleted_folders'])
+
+        last_id = None
+        while True:
+            batch = event.photos.order_by('id')
+            if last_id is not None:
+                batch = batch.filter(id__gt=last_id)
+            batch_ids = list(batch.values_list('id', flat=True)[:settings.EVENT_DELETION_BATCH_SIZE])
+            if not batch_ids:
+                break
+            last_id = batch_ids[-1]
+
+            result = delete_photos(Photo.objects.filter(id__in=batch_ids), deleted_prefixes=folders)
+            deletion.deleted_photos += result['deleted']
+            deletion.failed_photos += result['failed']
+            if result['errors']:
+                deletion.message = result['errors'][0][:500]
+            deletion.save(update_fields=['deleted_photos', 'failed_photos', 'message'])
+
+        if deletion.failed_photos:
+            deletion.status = EventDeletion.Status.FAILED
+            deletion.message = (
+                f"{deletion.failed_photos} photo(s) could not be removed from Cloudinary; "
+                f"run resume_deletions to retry. {deletion.message}"
+            )[:500]
+        else:
+            event.delete()
+            deletion.status = EventDeletion.Status.DONE
+    except Exception as e:
+        deletion.status = EventDeletion.Status.FAILED
+        deletion.message = str(e)[:500]
+
+    deletion.finished_at = timezone.now()
+    deletion.save(update_fields=['status', 'message', 'finished_at'])
+    if deletion.status == EventDeletion.Status.DONE:
+        print(f"✅ Event {deletion.event_name} deleted ({deletion.deleted_photos} photos)")
+    else:
+        print(f"❌ Deletion of {deletion.event_name} failed: {deletion.message}")
+    return deletion.status
+
+
+def deletion_progress(deletion):
+    """
+    Summarise an event deletion for the progress endpoint.
+
+    Returns:
+        dict: status, photo counts and completion percentage
+    """
+    done = deletion.deleted_photos + deletion.failed_photos
+    return {
+        'deletion_id': str(deletion.id),
+        'event': deletion.event_name,
+        'status': deletion.status,
+        'total': deletion.total_photos,
+        'deleted': deletion.deleted_photos,
+        'failed': deletion.failed_photos,
+        'percent': min(100, round(done / deletion.total_photos * 100)) if deletion.total_photos else 100,
+        'finished': deletion.status in (EventDeletion.Status.DONE, EventDeletion.Status.FAILED),
+        'message': deletion.message,
+    }
@@ -0,0 +1,164 @@
+"""
+Persistent on-disk cache of face detection results for Hackotsava 2025
+
+Maps (image SHA-256, detector cascade, embedding model, preprocessing version)
+to the detected face boxes and embeddings, so re-running ingestion (after a
+database reset, or when a photo is moved between events) skips the whole
+TensorFlow pipeline. Entries live in a single SQLite file and are evicted
+least-recently-used once the cache grows past its size limit.
+"""
+
+import io
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed LRU cache of face detection results.
+
+    A new connection is opened per operation, so one instance can be shared
+    between threads and processes.
+    """
+
+    def __init__(self, path, max_bytes):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self._initialised = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialised:
+            with self._lock:
+                if not self._initialised:
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS face_cache ('
+                        ' key TEXT PRIMARY KEY,'
+                        ' payload BLOB NOT NULL,'
+                        ' size INTEGER NOT NULL,'
+                        ' last_access REAL NOT NULL)'
+                    )
+                    conn.execute(
+                        'CREATE INDEX IF NOT EXISTS face_cache_last_access ON face_cache (last_access)'
+                    )
+                    conn.commit()
+                    self._initialised = True
+        return conn
+
+    @staticmethod
+    def make_key(content_hash, detector, model_name, preprocessing_version):
+        """Build the cache key for one image under one pipeline configuration"""
+        return f"{content_hash}:{detector}:{model_name}:{preprocessing_version}"
+
+    def get(self, key):
+        """
+        Look up cached detection results.
+
+        Returns:
+            tuple: (faces, detector) in the same shape as extract_faces,
+            or None on a cache miss
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT payload FROM face_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE face_cache SET last_access = ? WHERE key = ?', (time.time(), key))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return _unpack(row[0])
+
+    def set(self, key, faces, detector):
+        """Store detection results and evict old entries if the cache is too big"""
+        payload = _pack(faces, detector)
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO face_cache (key, payload, size, last_access) VALUES (?, ?, ?, ?)',
+                (key, payload, len(payload), time.time())
+            )
+            conn.commit()
+            self._evict(conn)
+        finally:
+            conn.close()
+
+    def _evict(self, conn):
+        """Drop least-recently-used entries until the cache is back under 90% of its limit"""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM face_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * 0.9)
+        stale_keys = []
+        for key, size in conn.execute('SELECT key, size FROM face_cache ORDER BY last_access'):
+            if total <= target:
+                break
+            stale_keys.append((key,))
+            total -= size
+
+        conn.executemany('DELETE FROM face_cache WHERE key = ?', stale_keys)
+        conn.commit()
+
+    def clear(self):
+        """Remove every cached entry"""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM face_cache')
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def _pack(faces, detector):
+    """Serialise [(embedding, (top, right, bottom, left)), ...] to compressed npz bytes"""
+    embeddings = np.array([np.asarray(encoding, dtype=np.float64) for encoding, _ in faces])
+    boxes = np.array([list(location) for _, location in faces], dtype=np.int64).reshape(-1, 4)
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, embeddings=embeddings, boxes=boxes, detector=np.array(detector or ''))
+    return buffer.getvalue()
+
+
+def _unpack(payload):
+    """Inverse of _pack"""
+    data = np.load(io.BytesIO(payload))
+    faces = [
+        (embedding, tuple(int(v) for v in box))
+        for embedding, box in zip(data['embeddings'], data['boxes'])
+    ]
+    detector = str(data['detector']) or None
+    return faces, detector
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    """
+    Get the shared embedding cache configured in settings.
+
+    Returns:
+        EmbeddingCache, or None when the cache is disabled
+    """
+    global _cache
+
+    if not getattr(settings, 'FACE_EMBEDDING_CACHE_ENABLED', True):
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = settings.FACE_EMBEDDING_CACHE_PATH
+                os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+                _cache = EmbeddingCache(path, settings.FACE_EMBEDDING_CACHE_MAX_BYTES)
+    return _cache
@@ -5,12 +5,16 @@ Uses DeepFace library for face detection and matching
 
 import os
 import io
+import time
 import hashlib
+import threading
 import numpy as np
-import requests
 from PIL import Image
 from django.conf import settings
 from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from . import media
 
 # Lazy loading: Don't import DeepFace until actually needed
 _deepface_loaded = False
@@ -40,6 +44,97 @@ def _ensure_deepface():
 
 DEEPFACE_AVAILABLE = True  # Assume available unless import fails
 
+# DeepFace builds its models lazily into a global cache and Keras inference
+# is not safe to run from several threads at once, so every DeepFace call
+# holds this lock; downloads, preprocessing and database writes around it
+# still overlap between threads
+_inference_lock = threading.Lock()
+
+# Detector cascade used for event photos
+FACE_DETECTOR_BACKENDS = ['retinaface', 'mtcnn', 'opencv', 'ssd']
+
+# Embedding models that have produced FaceEncoding rows, keyed by model version.
+# Vectors are only ever compared with vectors of the same version.
+EMBEDDING_MODELS = {
+    'arcface-512': {'model_name': 'ArcFace', 'dimensions': 512},
+    'facenet512': {'model_name': 'Facenet512', 'dimensions': 512},
+    'dlib-128': {'model_name': 'Dlib', 'dimensions': 128},
+}
+
+# Version used when no EmbeddingIndex is marked active
+FACE_MODEL_VERSION = 'arcface-512'
+FACE_EMBEDDING_MODEL = EMBEDDING_MODELS[FACE_MODEL_VERSION]['model_name']
+# Bump whenever preprocess_image_for_matching changes so cached results are not reused
+PREPROCESSING_VERSION = 1
+
+# Images are downscaled to this size before detection; stored face boxes are
+# in the coordinate space of the downscaled image
+DETECTION_MAX_DIMENSION = 1024
+
+
+def get_active_model_version():
+    """
+    Get the embedding model version of the index currently serving searches.
+    
+    Returns:
+        str: model version key from EMBEDDING_MODELS
+    """
+    from .models import EmbeddingIndex
+    
+    active = EmbeddingIndex.objects.filter(
+        state=EmbeddingIndex.State.ACTIVE
+    ).values_list('model_version', flat=True).first()
+    return active or FACE_MODEL_VERSION
+
+
+def warm_up_models(model_version=None):
+    """
+    Build the detector and embedding models once, before photos are processed in parallel.
+    
+    Runs the detector cascade and the embedding model on a blank image so
+    DeepFace's model cache is filled by one thread instead of by every
+    worker at once. Failures are only logged; the first real photo will
+    surface them.
+    
+    Args:
+        model_version: Embedding model version (defaults to the active one)
+    """
+    try:
+        DeepFace, _ = _ensure_deepface()
+    except ImportError:
+        return
+    
+    model_name = get_embedding_model(model_version or get_active_model_version())['model_name']
+    blank = np.zeros((160, 160, 3), dtype=np.uint8)
+    started = time.time()
+    with _inference_lock:
+        for detector in FACE_DETECTOR_BACKENDS:
+            try:
+                DeepFace.extract_faces(img_path=blank, detector_backend=detector, enforce_detection=False)
+            except Exception as e:
+                print(f"  ⚠️ Could not load {detector} detector: {str(e)}")
+        try:
+            DeepFace.represent(img_path=blank, model_name=model_name, detector_backend='skip', enforce_detection=False)
+        except Exception as e:
+            print(f"  ⚠️ Could not load {model_name} model: {str(e)}")
+    print(f"🔥 Face models ready ({time.time() - started:.1f}s)")
+
+
+def get_embedding_model(model_version):
+    """
+    Look up the DeepFace model settings for a model version.
+    
+    Raises:
+        ValueError: if the version is not in EMBEDDING_MODELS
+    """
+    try:
+        return EMBEDDING_MODELS[model_version]
+    except KeyError:
+        raise ValueError(
+            f"Unknown embedding model version '{model_version}' "
+            f"(known: {', '.join(EMBEDDING_MODELS)})"
+        )
+
 
 def preprocess_image_for_matching(img_path, is_selfie=False):
     """
@@ -69,7 +164,7 @@ def preprocess_image_for_matching(img_path, is_selfie=False):
         
         # Resize to standard size for consistency
         height, width = img.shape[:2]
-        max_dim = 1024
+        max_dim = DETECTION_MAX_DIMENSION
         if max(height, width) > max_dim:
             scale = max_dim / max(height, width)
             new_width = int(width * scale)
@@ -100,163 +195,262 @@ def preprocess_image_for_matching(img_path, is_selfie=False):
         return img_path
 
 
-def detect_faces_in_image(image_path, url_hash=None, is_selfie=False):
+def extract_faces(image_path, url_hash=None, is_selfie=False, model_version=None):
     """
-    Detect all faces in an image and return their encodings and locations.
+    Detect all faces in an image and return their encodings, locations and
+    the detector that found them.
     Uses multi-detector fallback: retinaface → mtcnn → opencv → ssd
     
+    Unlike detect_faces_in_image, errors are raised instead of being swallowed
+    so callers can tell "no faces" apart from "processing crashed".
+    
     Args:
-        image_path: Path to the image file (string path)
+        image_path: Path to the image file (string path), file object, or a
+            BGR numpy array already downscaled to DETECTION_MAX_DIMENSION
+            (see images.IngestionImage.detection_array)
         url_hash: Optional hash string for consistent encoding generation
         is_selfie: If True, applies extra preprocessing for selfie matching
+        model_version: Embedding model version to use (defaults to the active one)
         
     Returns:
-        list of tuples: [(encoding, location), ...]
-        where encoding is a 512-d face embedding
-        and location is (top, right, bottom, left) coordinates
+        tuple: (faces, detector) where faces is [(encoding, location), ...]
+        and detector is the name of the backend that found them (or None)
     """
+    embedding_model = get_embedding_model(model_version or get_active_model_version())
+    
     # Lazy load DeepFace only when actually needed
     try:
         DeepFace, cv2 = _ensure_deepface()
     except ImportError:
         # Fallback mock mode
-        return _mock_detect_faces(image_path, url_hash)
+        return _mock_detect_faces(image_path, url_hash, embedding_model['dimensions']), 'mock'
     
-    try:
-        # Ensure we have a file path
-        if hasattr(image_path, 'read'):
-            # It's a file object - save to temp file
-            import tempfile
-            image_path.seek(0)
-            img_data = image_path.read()
-            image_path.seek(0)
-            
-            temp_fd, temp_path = tempfile.mkstemp(suffix='.jpg')
-            with os.fdopen(temp_fd, 'wb') as tmp:
-                tmp.write(img_data)
-            
-            img_path = temp_path
-            cleanup_temp = True
-        else:
-            # It's already a file path
-            img_path = image_path
-            cleanup_temp = False
+    img = None
+    if isinstance(image_path, np.ndarray):
+        # Already decoded and downscaled: detect on the pixels directly
+        img = image_path
+        img_path = None
+        cleanup_temp = False
+    # Ensure we have a file path
+    elif hasattr(image_path, 'read'):
+        # It's a file object - save to temp file
+        import tempfile
+        image_path.seek(0)
+        img_data = image_path.read()
+        image_path.seek(0)
         
-        # 🔥 Apply preprocessing for better matching
-        preprocessed_path = preprocess_image_for_matching(img_path, is_selfie=is_selfie)
-        if preprocessed_path != img_path:
-            # Use preprocessed image, clean it up later
-            img_path = preprocessed_path
-            cleanup_temp = True
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.jpg')
+        with os.fdopen(temp_fd, 'wb') as tmp:
+            tmp.write(img_data)
         
-        faces = []
+        img_path = temp_path
+        cleanup_temp = True
+    else:
+        # It's already a file path
+        img_path = image_path
+        cleanup_temp = False
+    
+    # 🔥 Apply preprocessing for better matching
+    preprocessed_path = preprocess_image_for_matching(img_path, is_selfie=is_selfie) if img is None else None
+    if img is None and preprocessed_path != img_path:
+        if cleanup_temp and os.path.exists(img_path):
+            os.unlink(img_path)
+        # Use preprocessed image, clean it up later
+        img_path = preprocessed_path
+        cleanup_temp = True
+    
+    faces = []
+    
+    try:
+        # 🔥 MULTI-DETECTOR FALLBACK for maximum detection success
+        face_objs = None
+        successful_detector = None
+        detector_errors = []
         
-        try:
-            # 🔥 MULTI-DETECTOR FALLBACK for maximum detection success
-            detector_backends = ['retinaface', 'mtcnn', 'opencv', 'ssd']
-            face_objs = None
-            successful_detector = None
-            
-            for detector in detector_backends:
-                try:
-                    print(f"  🔍 Trying {detector} detector...")
+        for detector in FACE_DETECTOR_BACKENDS:
+            try:
+                print(f"  🔍 Trying {detector} detector...")
+                with _inference_lock:
                     face_objs = DeepFace.extract_faces(
-                        img_path=img_path,
+                        img_path=img if img is not None else img_path,
                         detector_backend=detector,
                         enforce_detection=False,     # Don't fail if no face found
                         align=True                   # ⭐ CRITICAL: Align faces for consistency
                     )
+                
+                if face_objs and len(face_objs) > 0:
+                    successful_detector = detector
+                    print(f"  ✅ {detector} detected {len(face_objs)} face(s)")
+                    break  # Success! Use this detector
                     
-                    if face_objs and len(face_objs) > 0:
-                        successful_detector = detector
-                        print(f"  ✅ {detector} detected {len(face_objs)} face(s)")
-                        break  # Success! Use this detector
-                        
-                except Exception as e:
-                    print(f"  ⚠️ {detector} failed: {str(e)}")
-                    continue
-            
-            if not face_objs:
-                print("  ❌ All detectors failed to find faces")
-                return []
-            
-            # Load the image to get face regions (cv2 already loaded via _ensure_deepface)
+            except Exception as e:
+                print(f"  ⚠️ {detector} failed: {str(e)}")
+                detector_errors.append(f"{detector}: {e}")
+                continue
+        
+        if not face_objs:
+            if len(detector_errors) == len(FACE_DETECTOR_BACKENDS):
+                raise RuntimeError("All face detectors failed - " + "; ".join(detector_errors))
+            print("  ❌ All detectors failed to find faces")
+            return [], None
+        
+        # Load the image to get face regions (cv2 already loaded via _ensure_deepface)
+        if img is None:
             img = cv2.imread(img_path)
-            if img is None:
-                print(f"❌ Error: Could not load image from {img_path}")
-                return []
+        if img is None:
+            raise ValueError(f"Could not load image from {img_path}")
+        
+        for idx, face_obj in enumerate(face_objs):
+            # Get face region (pixel coordinates)
+            region = face_obj['facial_area']
+            x, y, w, h = region['x'], region['y'], region['w'], region['h']
             
-            img_height, img_width = img.shape[:2]
+            location = (int(y), int(x + w), int(y + h), int(x))  # (top, right, bottom, left) without padding
             
-            for idx, face_obj in enumerate(face_objs):
-                # Get face region (pixel coordinates)
-                region = face_obj['facial_area']
-                x, y, w, h = region['x'], region['y'], region['w'], region['h']
-                
-                # Convert to (top, right, bottom, left) with padding
-                padding = 20  # Add padding for better recognition
-                top = max(0, int(y) - padding)
-                right = min(img_width, int(x + w) + padding)
-                bottom = min(img_height, int(y + h) + padding)
-                left = max(0, int(x) - padding)
-                
-                location = (int(y), int(x + w), int(y + h), int(x))  # Original location without padding
-                
-                # Extract the face region with padding
-                face_img = img[top:bottom, left:right]
-                
-                if face_img.size == 0:
-                    print(f"  ⚠️ Face #{idx+1}: empty face region")
-                    continue
-                
-                # Save face to temp file
-                import tempfile
-                temp_face_fd, temp_face_path = tempfile.mkstemp(suffix='.jpg')
-                cv2.imwrite(temp_face_path, face_img)
-                os.close(temp_face_fd)
-                
-                try:
-                    # Get embedding using ArcFace (512 dimensions, best accuracy 95%+)
-                    embedding_objs = DeepFace.represent(
-                        img_path=temp_face_path,
-                        model_name='ArcFace',      # ⭐ Best model - 95%+ accuracy
-                        detector_backend='skip',   # We already detected the face
-                        enforce_detection=False,
-                        align=True                 # ⭐ CRITICAL: Align for consistency
-                    )
-                    
-                    if embedding_objs and len(embedding_objs) > 0:
-                        embedding = np.array(embedding_objs[0]['embedding'])
-                        
-                        # ⭐ CRITICAL: L2 normalization for proper cosine similarity
-                        norm = np.linalg.norm(embedding)
-                        if norm > 0:
-                            embedding = embedding / norm
-                        
-                        # Verify embedding is valid
-                        if not np.any(np.isnan(embedding)) and not np.all(embedding == 0):
-                            faces.append((embedding, location))
-                            print(f"    ✓ Face #{idx+1}: embedding extracted (shape={embedding.shape}, norm={np.linalg.norm(embedding):.4f})")
-                        else:
-                            print(f"    ⚠️ Face #{idx+1}: invalid embedding (NaN or zeros)")
-                    else:
-                        print(f"    ⚠️ Face #{idx+1}: no embedding returned")
-                        
-                except Exception as e:
-                    print(f"    ❌ Face #{idx+1}: embedding extraction failed - {str(e)}")
-                finally:
-                    # Clean up temp face file
-                    if os.path.exists(temp_face_path):
-                        os.unlink(temp_face_path)
-        
-        finally:
-            # Clean up temp file if we created one
-            if cleanup_temp and os.path.exists(img_path):
-                os.unlink(img_path)
-        
-        print(f"  📊 Successfully extracted {len(faces)} valid embedding(s)")
-        return faces
+            try:
+                embedding = _embed_face_crop(DeepFace, img, location, embedding_model['model_name'])
+                if embedding is not None:
+                    faces.append((embedding, location))
+                    print(f"    ✓ Face #{idx+1}: embedding extracted (shape={embedding.shape}, norm={np.linalg.norm(embedding):.4f})")
+                else:
+                    print(f"    ⚠️ Face #{idx+1}: no valid embedding (empty region, NaN or zeros)")
+            except Exception as e:
+                print(f"    ❌ Face #{idx+1}: embedding extraction failed - {str(e)}")
+    
+    finally:
+        # Clean up temp file if we created one
+        if cleanup_temp and os.path.exists(img_path):
+            os.unlink(img_path)
+    
+    print(f"  📊 Successfully extracted {len(faces)} valid embedding(s)")
+    return faces, successful_detector
+
+
+def _crop_face(img, location, padding=20):
+    """Cut one face (with padding) out of a BGR image; None if the crop is empty"""
+    img_height, img_width = img.shape[:2]
+    top, right, bottom, left = location
+    
+    face_img = img[
+        max(0, int(top) - padding):min(img_height, int(bottom) + padding),
+        max(0, int(left) - padding):min(img_width, int(right) + padding)
+    ]
+    return face_img if face_img.size else None
+
+
+def _normalise_embedding(values):
+    """L2-normalise an embedding; None if it is empty, NaN or all zeros"""
+    embedding = np.array(values)
     
+    # ⭐ CRITICAL: L2 normalization for proper cosine similarity
+    norm = np.linalg.norm(embedding)
+    if norm > 0:
+        embedding = embedding / norm
+    
+    # Verify embedding is valid
+    if embedding.size == 0 or np.any(np.isnan(embedding)) or np.all(embedding == 0):
+        return None
+    return embedding
+
+
+# Whether DeepFace.represent accepts a list of images (newer releases);
+# None until the first batch has been tried
+_batch_represent_supported = None
+
+
+def _represent_crops(DeepFace, crops, model_name):
+    """
+    Run the embedding model on face crops, one model call for all of them.
+    
+    Releases of DeepFace that can't take a batch get one call per crop
+    instead (a failing crop then gives None); a single crop's errors are
+    raised.
+    
+    Args:
+        DeepFace: loaded DeepFace module
+        crops: BGR numpy arrays from _crop_face
+        model_name: DeepFace model name (e.g. 'ArcFace')
+        
+    Returns:
+        list: L2-normalised numpy embedding (or None) per crop
+    """
+    global _batch_represent_supported
+    
+    options = {
+        'model_name': model_name,
+        'detector_backend': 'skip',   # We already detected the faces
+        'enforce_detection': False,
+        'align': True,                # ⭐ CRITICAL: Align for consistency
+    }
+    
+    with _inference_lock:
+        if len(crops) > 1 and _batch_represent_supported is not False:
+            try:
+                results = DeepFace.represent(img_path=list(crops), **options)
+            except Exception as e:
+                if _batch_represent_supported:
+                    raise
+                print(f"  ⚠️ Batched embedding unavailable, embedding faces one by one: {str(e)}")
+                results = None
+            if isinstance(results, list) and len(results) == len(crops) and all(isinstance(r, list) for r in results):
+                _batch_represent_supported = True
+                return [_normalise_embedding(result[0]['embedding']) if result else None for result in results]
+            _batch_represent_supported = False
+        
+        embeddings = []
+        for crop in crops:
+            try:
+                embedding_objs = DeepFace.represent(img_path=crop, **options)
+            except Exception as e:
+                if len(crops) == 1:
+                    raise
+                print(f"    ❌ Embedding failed - {str(e)}")
+                embedding_objs = None
+            embeddings.append(_normalise_embedding(embedding_objs[0]['embedding']) if embedding_objs else None)
+        return embeddings
+
+
+def _embed_face_crop(DeepFace, img, location, model_name, padding=20):
+    """
+    Crop one face (with padding) out of a BGR image and compute its embedding.
+    
+    Args:
+        DeepFace: loaded DeepFace module
+        img: BGR numpy array the location refers to
+        location: (top, right, bottom, left) without padding
+        model_name: DeepFace model name (e.g. 'ArcFace')
+        padding: pixels added around the box for better recognition
+        
+    Returns:
+        L2-normalised numpy embedding, or None if the crop or embedding is invalid
+    """
+    face_img = _crop_face(img, location, padding)
+    if face_img is None:
+        return None
+    return _represent_crops(DeepFace, [face_img], model_name)[0]
+
+
+def detect_faces_in_image(image_path, url_hash=None, is_selfie=False, model_version=None):
+    """
+    Detect all faces in an image and return their encodings and locations.
+    Uses multi-detector fallback: retinaface → mtcnn → opencv → ssd
+    
+    Args:
+        image_path: Path to the image file (string path)
+        url_hash: Optional hash string for consistent encoding generation
+        is_selfie: If True, applies extra preprocessing for selfie matching
+        model_version: Embedding model version to use (defaults to the active one)
+        
+    Returns:
+        list of tuples: [(encoding, location), ...]
+        where encoding is a 512-d face embedding
+        and location is (top, right, bottom, left) coordinates
+    """
+    try:
+        faces, _ = extract_faces(
+            image_path, url_hash=url_hash, is_selfie=is_selfie, model_version=model_version
+        )
+        return faces
     except Exception as e:
         print(f"❌ Error detecting faces with DeepFace: {str(e)}")
         import traceback
@@ -264,7 +458,7 @@ def detect_faces_in_image(image_path, url_hash=None, is_selfie=False):
         return []
 
 
-def _mock_detect_faces(image_path, url_hash=None):
+def _mock_detect_faces(image_path, url_hash=None, dimensions=512):
     """Mock face detection for when DeepFace is not available"""
     import random
     
@@ -278,7 +472,7 @@ def _mock_detect_faces(image_path, url_hash=None):
     random.seed(seed)
     
     # Generate 1 fake face
-    fake_encoding = np.random.randn(512) * 0.1  # Match ArcFace dimensions (512-D)
+    fake_encoding = np.random.randn(dimensions) * 0.1  # Match the embedding model's dimensions
     fake_encoding = fake_encoding / np.linalg.norm(fake_encoding)
     
     fake_location = (50, 350, 250, 150)
@@ -351,6 +545,11 @@ def compare_faces(known_encodings, face_encoding, tolerance=0.6):
             distances.append(float('inf'))
             continue
         
+        # Vectors from different embedding models can't be compared
+        if len(known_encoding) != len(face_encoding):
+            distances.append(float('inf'))
+            continue
+        
         # Euclidean distance
         distance = np.linalg.norm(known_encoding - face_encoding)
         distances.append(distance)
@@ -361,75 +560,502 @@ def compare_faces(known_encodings, face_encoding, tolerance=0.6):
     return matches, distances
 
 
-def process_photo_faces(photo):
+def process_photo_faces(photo, image_bytes=None, detection=None):
     """
     Process a photo to detect and store face encodings.
     
+    Records the outcome on the photo (processing_status, error, attempts,
+    duration, detector and model version) so failed photos can be told apart
+    from photos without faces and reprocessed selectively.
+    
+    Work is avoided where possible: an already-processed exact duplicate or
+    a hit in the local embedding cache means no inference, and when the
+    content hash is known up front nothing is downloaded either.
+    
     Args:
         photo: Photo model instance with uploaded image
+        image_bytes: Original image bytes if already in memory (e.g. a fresh
+            upload), so nothing is downloaded back from Cloudinary
+        detection: (faces, detector) already computed from image_bytes with
+            the active model version, e.g. while the upload was running
         
     Returns:
         int: number of faces detected
     """
-    from .models import FaceEncoding
+    from .models import Photo
+    from .embedding_cache import get_embedding_cache
+    
+    started = time.monotonic()
+    photo.processing_status = Photo.ProcessingStatus.PROCESSING
+    photo.processing_attempts += 1
+    photo.save(update_fields=['processing_status', 'processing_attempts'])
     
     try:
-        # Get image URL
-        image_url = photo.image.url
+        # Inside the try so a failure here records FAILED instead of leaving PROCESSING
+        model_version = get_active_model_version()
+        try:
+            cache = get_embedding_cache()
+        except Exception as e:
+            print(f"  ⚠️ Embedding cache unavailable: {e}")
+            cache = None
+        
+        # Exact duplicate already processed? Reuse its encodings, skip the download
+        duplicate = find_duplicate_photo(photo.content_hash, exclude=photo, processed=True)
+        if duplicate:
+            return _reuse_duplicate_faces(duplicate, photo)
+        
+        cached = _get_cached_faces(cache, photo.content_hash, model_version)
+        if cached is not None:
+            return _store_faces(photo, *cached, model_version=model_version)
+        
+        # Get image URL (handles both storage names and full Cloudinary URLs)
+        image_url = photo.get_image_url()
         
         # Create hash from URL for consistent encoding
         url_hash = hashlib.md5(image_url.encode()).hexdigest()
         
-        # Download image and save to temp file (DeepFace needs real file path)
-        import tempfile
-        response = requests.get(image_url)
+        # Download the detection input (pooled session, served from the disk cache when possible)
+        if image_bytes is None:
+            image_bytes = media.fetch_rendition(image_url, _detection_rendition_size(photo))
         
-        # Create temp file with proper extension
-        temp_fd, temp_path = tempfile.mkstemp(suffix='.jpg')
-        with os.fdopen(temp_fd, 'wb') as tmp:
-            tmp.write(response.content)
+        if not photo.content_hash:
+            photo.content_hash = compute_content_hash(image_bytes)
+            duplicate = find_duplicate_photo(photo.content_hash, exclude=photo, processed=True)
+            if duplicate:
+                return _reuse_duplicate_faces(duplicate, photo)
+            cached = _get_cached_faces(cache, photo.content_hash, model_version)
+            if cached is not None:
+                return _store_faces(photo, *cached, model_version=model_version)
+        if not photo.perceptual_hash:
+            photo.perceptual_hash = compute_perceptual_hash(image_bytes)
         
-        try:
-            # Detect faces - pass file path instead of BytesIO
-            faces = detect_faces_in_image(temp_path, url_hash=url_hash)
-            
-            # Store each face encoding
-            for encoding, location in faces:
-                FaceEncoding.objects.create(
-                    photo=photo,
-                    encoding=encoding_to_string(encoding),
-                    top=location[0],
-                    right=location[1],
-                    bottom=location[2],
-                    left=location[3]
-                )
-            
-            # Update photo face count
-            photo.face_count = len(faces)
-            photo.faces_processed = True
-            photo.save()
-            
-            return len(faces)
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        if detection is not None:
+            faces, detector = detection
+        else:
+            faces, detector = _extract_faces_from_bytes(image_bytes, url_hash, model_version)
+        
+        # Mock results are never cached so they can't shadow real detections later
+        if detector != 'mock':
+            _set_cached_faces(cache, photo.content_hash, model_version, faces, detector)
+        
+        return _store_faces(photo, faces, detector, model_version=model_version)
     
     except Exception as e:
         print(f"Error processing photo faces: {str(e)}")
         import traceback
         traceback.print_exc()
-        photo.faces_processed = True  # Mark as processed even if failed
+        photo.faces_processed = False
+        photo.processing_status = Photo.ProcessingStatus.FAILED
+        photo.processing_error = f"{type(e).__name__}: {e}"
+        return 0
+    
+    finally:
+        photo.processing_duration = time.monotonic() - started
+        photo.processed_at = timezone.now()
         photo.save()
+
+
+def detect_faces_for_upload(image, content_hash):
+    """
+    Run detection on a freshly uploaded image before the Photo row exists.
+    
+    Lets detection overlap with the Cloudinary upload; the result is then
+    handed to process_photo_faces(detection=...). Nothing is computed when
+    process_photo_faces would not need it anyway (an already-processed
+    duplicate or an embedding cache hit).
+    
+    Args:
+        image: images.IngestionImage of the upload (its decoded pixels are
+            used directly, nothing is decoded again)
+        content_hash: SHA-256 of the original bytes
+        
+    Returns:
+        tuple: (faces, detector), or None if no detection is needed
+    """
+    from .embedding_cache import get_embedding_cache
+    
+    if find_duplicate_photo(content_hash, processed=True):
+        return None
+    
+    model_version = get_active_model_version()
+    if _get_cached_faces(get_embedding_cache(), content_hash, model_version) is not None:
+        return None
+    
+    return extract_faces(image.detection_array(), url_hash=content_hash, model_version=model_version)
+
+
+def embed_photo_for_version(photo, model_version):
+    """
+    Compute a photo's encodings with another embedding model for a shadow index.
+    
+    The photo's processing state and its encodings of other model versions are
+    left untouched, so the active index keeps serving searches meanwhile.
+    
+    Args:
+        photo: Photo model instance that has already been processed
+        model_version: Embedding model version to build encodings for
+        
+    Returns:
+        int: number of faces stored for that version
+        
+    Raises:
+        Exception: on download or detection errors
+    """
+    from .embedding_cache import get_embedding_cache
+    
+    cache = get_embedding_cache()
+    cached = _get_cached_faces(cache, photo.content_hash, model_version)
+    
+    if cached is None:
+        image_url = photo.get_image_url()
+        image_bytes = media.fetch_rendition(image_url, _detection_rendition_size(photo))
+        
+        url_hash = hashlib.md5(image_url.encode()).hexdigest()
+        faces, detector = _extract_faces_from_bytes(image_bytes, url_hash, model_version)
+        
+        content_hash = photo.content_hash or compute_content_hash(image_bytes)
+        if detector != 'mock':
+            _set_cached_faces(cache, content_hash, model_version, faces, detector)
+    else:
+        faces, _ = cached
+    
+    _replace_face_encodings(photo, faces, model_version)
+    return len(faces)
+
+
+def reembed_photo_from_boxes(photo, model_version, source_version=None, in_place=False, rendition_size=None):
+    """
+    Recompute a photo's embeddings from its stored face boxes.
+    
+    Single-photo form of reembed_photos_from_boxes (same arguments).
+    
+    Returns:
+        int: number of faces re-embedded
+        
+    Raises:
+        Exception: on download or decode errors
+    """
+    [(_, faces_count, error)] = reembed_photos_from_boxes(
+        [photo], model_version, source_version=source_version, in_place=in_place, rendition_size=rendition_size
+    )
+    if error is not None:
+        raise error
+    return faces_count
+
+
+def reembed_photos_from_boxes(photos, model_version, source_version=None, in_place=False, rendition_size=None):
+    """
+    Recompute the embeddings of several photos from their stored face boxes.
+    
+    The images are downloaded concurrently, once each, and every stored box
+    is cropped out; all the crops of the batch then go through the
+    embedding model in one call - the detector cascade is skipped. Crops
+    are taken from a higher-resolution rendition than detection used
+    (FACE_REEMBED_RENDITION_SIZE), with the boxes scaled up to match.
+    
+    Args:
+        photos: Photos with encodings of source_version
+        model_version: Embedding model version to compute
+        source_version: Version whose boxes are reused (defaults to the active one)
+        in_place: If True the source rows are overwritten with the new vectors;
+            otherwise new rows are added for model_version (shadow index).
+            Only allowed into the active or the source version, since
+            searches filter on the active version's rows
+        rendition_size: Longest side of the image to crop from (0 for the original)
+        
+    Returns:
+        list: (photo, faces_count, error) per photo - faces_count is None
+        when error (download, decode or database) is set
+        
+    Raises:
+        ValueError: for an in-place re-embed into another inactive version
+    """
+    from .models import FaceEncoding
+    
+    active = get_active_model_version()
+    source_version = source_version or active
+    if in_place and model_version not in (active, source_version):
+        raise ValueError(
+            f"In-place re-embedding into {model_version} would hide these photos from searches "
+            f"on the active index ({active}); build a shadow index instead"
+        )
+    model_name = get_embedding_model(model_version)['model_name']
+    dimensions = get_embedding_model(model_version)['dimensions']
+    
+    photos = list(photos)
+    faces_by_photo = {photo.id: [] for photo in photos}
+    for face in FaceEncoding.objects.filter(photo__in=photos, model_version=source_version).order_by('id'):
+        faces_by_photo[face.photo_id].append(face)
+    
+    try:
+        DeepFace, cv2 = _ensure_deepface()
+    except ImportError:
+        DeepFace = cv2 = None
+    
+    results = {}
+    crops = []
+    owners = []   # (photo, face) of each crop
+    working = [photo for photo in photos if faces_by_photo[photo.id]]
+    size = _reembed_rendition_size(rendition_size)
+    urls = [media.rendition_url(photo.get_image_url(), size) for photo in working]
+    for photo, (url, image_bytes, error) in zip(working, media.fetch_many(urls)):
+        faces = faces_by_photo[photo.id]
+        if DeepFace is None:
+            # Mock mode: deterministic fake vectors per box
+            for face in faces:
+                crops.append(_mock_embedding(f"{photo.id}:{face.get_face_location()}", dimensions))
+                owners.append((photo, face))
+            continue
+        try:
+            if error is not None:
+                # The rendition may be unavailable (strict transformations); fall back to the original
+                image_bytes = media.fetch_rendition(photo.get_image_url(), size)
+            img = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if img is None:
+                raise ValueError("Could not decode image")
+        except Exception as e:
+            results[photo.id] = (photo, None, e)
+            continue
+        
+        # Boxes are in detection space (longest side <= DETECTION_MAX_DIMENSION);
+        # renditions are never smaller than that, so scale boxes up to the crop image
+        scale = max(1.0, max(img.shape[:2]) / DETECTION_MAX_DIMENSION)
+        for face in faces:
+            location = tuple(int(round(value * scale)) for value in face.get_face_location())
+            crops.append(_crop_face(img, location, padding=int(round(20 * scale))))
+            owners.append((photo, face))
+    
+    if DeepFace is None:
+        embeddings = crops
+    else:
+        embeddings = [None] * len(crops)
+        valid = [index for index, crop in enumerate(crops) if crop is not None]
+        if valid:
+            for index, embedding in zip(valid, _represent_crops(DeepFace, [crops[i] for i in valid], model_name)):
+                embeddings[index] = embedding
+    
+    embeddings_by_face = {face.pk: embedding for (_, face), embedding in zip(owners, embeddings)}
+    for photo in photos:
+        if photo.id in results:
+            continue
+        faces = faces_by_photo[photo.id]
+        if not faces:
+            results[photo.id] = (photo, 0, None)
+            continue
+        for face in faces:
+            if embeddings_by_face.get(face.pk) is None:
+                print(f"    ❌ Face {face.id}: no valid embedding")
+        try:
+            kept = _save_reembedded(
+                photo, faces, [embeddings_by_face.get(face.pk) for face in faces],
+                model_version, source_version, in_place
+            )
+            results[photo.id] = (photo, kept, None)
+        except Exception as e:
+            results[photo.id] = (photo, None, e)
+    
+    return [results[photo.id] for photo in photos]
+
+
+def _save_reembedded(photo, faces, embeddings, model_version, source_version, in_place):
+    """Write a photo's re-embedded vectors; returns the number of faces kept"""
+    from django.db import transaction
+    from .models import FaceEncoding
+    
+    kept = [(face, embedding) for face, embedding in zip(faces, embeddings) if embedding is not None]
+    
+    with transaction.atomic():
+        if in_place:
+            if model_version != source_version:
+                # Any earlier shadow rows for the target would duplicate the rewritten ones
+                photo.face_encodings.filter(model_version=model_version).delete()
+            for face, embedding in kept:
+                face.encoding = encoding_to_string(embedding)
+                face.model_version = model_version
+            FaceEncoding.objects.bulk_update([face for face, _ in kept], ['encoding', 'model_version'])
+            
+            # Boxes that no longer yield a valid vector can't stay in the old version's space
+            dropped = [face.pk for face, embedding in zip(faces, embeddings) if embedding is None]
+            if dropped:
+                FaceEncoding.objects.filter(pk__in=dropped).delete()
+            
+            if photo.model_version == source_version:
+                photo.face_count = len(kept)
+                photo.model_version = model_version
+                photo.save(update_fields=['face_count', 'model_version'])
+        else:
+            _replace_face_encodings(
+                photo,
+                [(embedding, face.get_face_location()) for face, embedding in kept],
+                model_version
+            )
+    
+    return len(kept)
+
+
+def get_detection_image_url(photo):
+    """
+    URL of the image face detection runs on.
+    
+    Detection downscales to DETECTION_MAX_DIMENSION anyway, so a Cloudinary
+    rendition of that size is fetched instead of the original. Photos without
+    a content hash yet get the original, since the hash must match the one
+    computed from uploaded bytes.
+    """
+    return media.rendition_url(photo.get_image_url(), _detection_rendition_size(photo))
+
+
+def get_reembed_image_url(photo, rendition_size=None):
+    """URL of the higher-resolution rendition that stored face boxes are cropped from"""
+    return media.rendition_url(photo.get_image_url(), _reembed_rendition_size(rendition_size))
+
+
+def _detection_rendition_size(photo):
+    if not photo.content_hash or not settings.FACE_DETECTION_RENDITION_SIZE:
         return 0
+    # Boxes must stay in detection space, so never go below the detection size
+    return max(settings.FACE_DETECTION_RENDITION_SIZE, DETECTION_MAX_DIMENSION)
+
+
+def _reembed_rendition_size(rendition_size=None):
+    if rendition_size is None:
+        rendition_size = settings.FACE_REEMBED_RENDITION_SIZE
+    if rendition_size:
+        # Smaller renditions would lose the mapping back from detection space
+        rendition_size = max(rendition_size, DETECTION_MAX_DIMENSION)
+    return rendition_size
+
+
+def _mock_embedding(seed_text, dimensions):
+    """Deterministic fake embedding for when DeepFace is not available"""
+    seed = int(hashlib.md5(seed_text.encode()).hexdigest()[:8], 16)
+    embedding = np.random.default_rng(seed).standard_normal(dimensions)
+    return embedding / np.linalg.norm(embedding)
+
+
+def _extract_faces_from_bytes(image_bytes, url_hash, model_version):
+    """Write downloaded bytes to a temp file (DeepFace needs a real path) and extract faces"""
+    import tempfile
+    
+    # Create temp file with proper extension
+    temp_fd, temp_path = tempfile.mkstemp(suffix='.jpg')
+    with os.fdopen(temp_fd, 'wb') as tmp:
+        tmp.write(image_bytes)
+    
+    try:
+        return extract_faces(temp_path, url_hash=url_hash, model_version=model_version)
+    finally:
+        # Clean up temp file
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def _embedding_cache_key(content_hash, model_version):
+    """Cache key for an image under the current detector cascade, a model version and preprocessing"""
+    from .embedding_cache import EmbeddingCache
+    
+    return EmbeddingCache.make_key(
+        content_hash,
+        ','.join(FACE_DETECTOR_BACKENDS),
+        get_embedding_model(model_version)['model_name'],
+        f"{PREPROCESSING_VERSION}-r{settings.FACE_DETECTION_RENDITION_SIZE}"
+    )
+
+
+def _get_cached_faces(cache, content_hash, model_version):
+    """Look up (faces, detector) in the embedding cache; None on a miss or cache error"""
+    if cache is None or not content_hash:
+        return None
+    
+    try:
+        cached = cache.get(_embedding_cache_key(content_hash, model_version))
+    except Exception as e:
+        print(f"  ⚠️ Embedding cache lookup failed: {e}")
+        return None
+    
+    if cached is not None:
+        print(f"  ⚡ Embedding cache hit ({len(cached[0])} face(s))")
+    return cached
+
+
+def _set_cached_faces(cache, content_hash, model_version, faces, detector):
+    """Store (faces, detector) in the embedding cache; a cache error never fails the photo"""
+    if cache is None or not content_hash:
+        return
+    
+    try:
+        cache.set(_embedding_cache_key(content_hash, model_version), faces, detector)
+    except Exception as e:
+        print(f"  ⚠️ Embedding cache write failed: {e}")
+
+
+def _store_faces(photo, faces, detector, model_version):
+    """Replace the photo's encodings for a model version with fresh faces and mark it done"""
+    from .models import Photo
+    
+    _replace_face_encodings(photo, faces, model_version)
+    
+    # Update photo face count and processing state
+    photo.face_count = len(faces)
+    photo.faces_processed = True
+    photo.processing_status = Photo.ProcessingStatus.DONE
+    photo.processing_error = ''
+    photo.face_detector = detector or ''
+    photo.model_version = model_version
+    return len(faces)
+
+
+def _replace_face_encodings(photo, faces, model_version):
+    """
+    Store faces as the photo's encodings for one model version.
+    
+    Rows of other model versions (e.g. a shadow index being built) are kept.
+    """
+    from .models import FaceEncoding
+    
+    # Replace any encodings of this version left over from a previous run
+    photo.face_encodings.filter(model_version=model_version).delete()
+    
+    FaceEncoding.objects.bulk_create([
+        FaceEncoding(
+            photo=photo,
+            model_version=model_version,
+            encoding=encoding_to_string(encoding),
+            top=location[0],
+            right=location[1],
+            bottom=location[2],
+            left=location[3]
+        )
+        for encoding, location in faces
+    ])
+
+
+def _reuse_duplicate_faces(duplicate, photo):
+    """Copy encodings from an already-processed duplicate and mark the photo as skipped"""
+    from .models import Photo
+    
+    faces_count = copy_face_encodings(duplicate, photo, duplicate.model_version)
+    print(f"  ♻️ Reused {faces_count} face(s) from duplicate photo #{duplicate.id}")
+    
+    photo.face_count = faces_count
+    photo.faces_processed = True
+    photo.processing_status = Photo.ProcessingStatus.SKIPPED
+    photo.processing_error = ''
+    photo.face_detector = duplicate.face_detector
+    photo.model_version = duplicate.model_version
+    if not photo.perceptual_hash:
+        photo.perceptual_hash = duplicate.perceptual_hash
+    return faces_count
 
 
-def validate_image_file(file):
+def validate_image_file(file, verify=True):
     """
     Validate uploaded image file.
     
     Args:
         file: uploaded file object
+        verify: also check the image data; photo ingestion skips this since
+            it decodes the pixels once anyway (images.IngestionImage)
         
     Returns:
         tuple: (is_valid, error_message)
@@ -446,35 +1072,181 @@ def validate_image_file(file):
     if file.content_type not in allowed_types:
         return False, "Only JPEG, PNG, and WebP images are allowed"
     
-    # Try to open as image
+    # Try to open as image (Image.open only reads the header)
     try:
         img = Image.open(file)
-        img.verify()
+        if verify:
+            img.verify()
         return True, None
     except Exception as e:
         return False, f"Invalid image file: {str(e)}"
+    finally:
+        if hasattr(file, 'seek'):
+            file.seek(0)
+
+
+def compute_content_hash(source):
+    """
+    Compute the SHA-256 hex digest of an image's bytes.
+    
+    Args:
+        source: raw bytes, a file path, or a file object (uploaded files are
+            read chunk by chunk and rewound afterwards)
+        
+    Returns:
+        str: 64-character hex digest
+    """
+    digest = hashlib.sha256()
+    
+    if isinstance(source, (bytes, bytearray)):
+        digest.update(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    elif hasattr(source, 'chunks'):
+        for chunk in source.chunks():
+            digest.update(chunk)
+        source.seek(0)
+    else:
+        source.seek(0)
+        for chunk in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(chunk)
+        source.seek(0)
+    
+    return digest.hexdigest()
+
+
+def compute_perceptual_hash(source):
+    """
+    Compute a 64-bit difference hash (dHash) of an image.
+    
+    Visually identical images (re-encoded, resized) produce the same or a
+    very close hash, which makes near-duplicates easy to spot.
+    
+    Args:
+        source: raw bytes, a file path, a file object or a PIL Image
+        
+    Returns:
+        str: 16-character hex string, or '' if the image can't be decoded
+    """
+    try:
+        if isinstance(source, Image.Image):
+            img = source
+        elif isinstance(source, (bytes, bytearray)):
+            img = Image.open(io.BytesIO(source))
+        else:
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            img = Image.open(source)
+        
+        # 9x8 grayscale so each row gives 8 left/right comparisons
+        small = img.convert('L').resize((9, 8), Image.Resampling.LANCZOS)
+        pixels = list(small.getdata())
+        
+        bits = 0
+        for row in range(8):
+            for col in range(8):
+                left = pixels[row * 9 + col]
+                right = pixels[row * 9 + col + 1]
+                bits = (bits << 1) | (1 if left > right else 0)
+        
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return f"{bits:016x}"
+    
+    except Exception as e:
+        print(f"Error computing perceptual hash: {str(e)}")
+        return ''
+
+
+def find_duplicate_photo(content_hash, event=None, exclude=None, processed=False):
+    """
+    Find an existing photo with exactly the same bytes.
+    
+    Args:
+        content_hash: SHA-256 hex digest to look up
+        event: Optional Event to restrict the lookup to
+        exclude: Optional Photo to leave out (usually the photo being processed)
+        processed: If True, only return photos whose encodings can be reused
+        
+    Returns:
+        Photo or None
+    """
+    from .models import Photo
+    
+    if not content_hash:
+        return None
+    
+    photos = Photo.objects.filter(content_hash=content_hash)
+    if event is not None:
+        photos = photos.filter(event=event)
+    if exclude is not None:
+        photos = photos.exclude(pk=exclude.pk)
+    if processed:
+        photos = photos.filter(
+            processing_status__in=[Photo.ProcessingStatus.DONE, Photo.ProcessingStatus.SKIPPED],
+            model_version=get_active_model_version(),
+        )
+    
+    return photos.order_by('uploaded_at').first()
+
 
+def copy_face_encodings(source, target, model_version):
+    """
+    Reuse the face encodings of an exact duplicate instead of recomputing them.
+    
+    Args:
+        source: Photo whose encodings are copied
+        target: Photo that receives the copies (its own encodings of that
+            version are replaced)
+        model_version: Embedding model version of the encodings to copy
+        
+    Returns:
+        int: number of encodings copied
+    """
+    from .models import FaceEncoding
+    
+    target.face_encodings.filter(model_version=model_version).delete()
+    copies = [
+        FaceEncoding(
+            photo=target,
+            model_version=model_version,
+            encoding=face.encoding,
+            top=face.top,
+            right=face.right,
+            bottom=face.bottom,
+            left=face.left
+        )
+        for face in source.face_encodings.filter(model_version=model_version)
+    ]
+    FaceEncoding.objects.bulk_create(copies)
+    return len(copies)
 
-def create_thumbnail(image_path, size=(300, 300)):
+
+def create_thumbnail(image_path, size=(300, 300), format='JPEG', quality=85):
     """
     Create a thumbnail version of an image.
     
     Args:
-        image_path: path to the original image
+        image_path: path to the original image, a file object, or an
+            already decoded PIL image (left unchanged)
         size: tuple of (width, height) for thumbnail
+        format: PIL output format ('JPEG' or 'WEBP')
+        quality: encoder quality
         
     Returns:
         ContentFile object containing the thumbnail
     """
     try:
         # Open image
-        if hasattr(image_path, 'read'):
-            img = Image.open(image_path)
+        if isinstance(image_path, Image.Image):
+            img = image_path.copy()
         else:
             img = Image.open(image_path)
         
         # Convert to RGB if necessary
-        if img.mode not in ('RGB', 'RGBA'):
+        if img.mode != 'RGB' and (format == 'JPEG' or img.mode != 'RGBA'):
             img = img.convert('RGB')
         
         # Create thumbnail
@@ -482,7 +1254,7 @@ def create_thumbnail(image_path, size=(300, 300)):
         
         # Save to bytes
         thumb_io = io.BytesIO()
-        img.save(thumb_io, format='JPEG', quality=85)
+        img.save(thumb_io, format=format, quality=quality)
         
         return ContentFile(thumb_io.getvalue())
     
@@ -506,9 +1278,10 @@ def find_matching_photos(selfie_encoding, event, tolerance=0.6):
     """
     from .models import FaceEncoding, Photo
     
-    # Get all face encodings for photos in this event
+    # Get all face encodings for photos in this event from the active index
     face_encodings = FaceEncoding.objects.filter(
-        photo__event=event
+        photo__event=event,
+        model_version=get_active_model_version()
     ).select_related('photo')
     
     matching_photos = []
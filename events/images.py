@@ -0,0 +1,126 @@
+"""
+Single-decode image handling for photo ingestion
+
+An IngestionImage decodes an upload once and every ingestion stage works
+from that decoded image: validation (a file that can't be decoded is
+invalid), the perceptual hash, the stored renditions and the face
+detection input. JPEGs are decoded with PIL's draft mode straight at the
+smallest DCT scale that still covers the largest size any stage needs, so
+a 24-megapixel photo never exists in memory at full resolution.
+"""
+
+import io
+
+import numpy as np
+from django.conf import settings
+from PIL import Image, ImageOps
+
+from .face_utils import DETECTION_MAX_DIMENSION, compute_perceptual_hash
+
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+
+ORIENTATION_TAG = 0x0112
+
+
+def required_dimension():
+    """Longest side the decoded image must keep for every ingestion stage"""
+    dimension = DETECTION_MAX_DIMENSION
+    if settings.PHOTO_RENDITIONS_ENABLED:
+        dimension = max(dimension, settings.PHOTO_MEDIUM_SIZE)
+    return dimension
+
+
+class IngestionImage:
+    """
+    An uploaded photo decoded once, upright and in RGB.
+
+    Decoding happens on first use of .image (or validate()); downscaled
+    copies are cached, so the renditions and detection share them too.
+    """
+
+    def __init__(self, data, filename='', max_dimension=None):
+        """
+        Args:
+            data: The original file's bytes
+            filename: Original filename (for messages)
+            max_dimension: Longest side that must survive decoding
+                (defaults to required_dimension())
+        """
+        self.data = data
+        self.filename = filename
+        self.max_dimension = max_dimension or required_dimension()
+        self.format = None
+        self.original_size = None  # (width, height) of the upright original
+        self._image = None
+        self._resized = {}
+
+    @property
+    def image(self):
+        """The decoded PIL image (RGB, EXIF orientation applied)"""
+        if self._image is None:
+            self._image = self._decode()
+        return self._image
+
+    def _decode(self):
+        img = Image.open(io.BytesIO(self.data))
+        self.format = img.format
+        self.original_size = img.size
+        # Orientations 5-8 are quarter turns: the upright photo is rotated
+        if img.getexif().get(ORIENTATION_TAG, 1) in (5, 6, 7, 8):
+            self.original_size = img.size[::-1]
+
+        # JPEG: let libjpeg scale down by 1/2, 1/4 or 1/8 while decoding
+        if img.format == 'JPEG':
+            img.draft('RGB', (self.max_dimension, self.max_dimension))
+
+        img.load()
+        img = ImageOps.exif_transpose(img)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        return img
+
+    def validate(self):
+        """
+        Decode the image and check it can be ingested.
+
+        Returns:
+            tuple: (is_valid, error_message)
+        """
+        try:
+            self.image
+        except Exception as e:
+            return False, f"Invalid image file: {str(e)}"
+
+        if self.format not in ALLOWED_FORMATS:
+            return False, "Only JPEG, PNG, and WebP images are allowed"
+        return True, None
+
+    def resized(self, max_dimension):
+        """
+        Get a copy whose longest side is at most max_dimension (cached).
+
+        The decoded image itself is returned when it is already small enough;
+        callers must not modify what they get.
+        """
+        img = self.image
+        if max(img.size) <= max_dimension:
+            return img
+
+        if max_dimension not in self._resized:
+            resized = img.copy()
+            resized.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            self._resized[max_dimension] = resized
+        return self._resized[max_dimension]
+
+    def detection_array(self):
+        """
+        The face detection input: BGR numpy array downscaled to
+        DETECTION_MAX_DIMENSION, the coordinate space of stored face boxes.
+        """
+        rgb = np.asarray(self.resized(DETECTION_MAX_DIMENSION))
+        return np.ascontiguousarray(rgb[:, :, ::-1])
+
+    def perceptual_hash(self):
+        """64-bit difference hash (see face_utils.compute_perceptual_hash)"""
+        return compute_perceptual_hash(self.image)
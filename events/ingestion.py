@@ -0,0 +1,693 @@
+"""
+Photo ingestion pipeline for Hackotsava 2025
+
+Takes an uploaded file that is already on local disk, reads it once and
+decodes it once (images.IngestionImage); the decoded image is used for
+validation, the perceptual hash, the renditions and face detection. The
+upload to Cloudinary runs in the background I/O pool at the same time as
+detection instead of before it, and detection never downloads the image
+back from Cloudinary. The thumbnails and medium rendition are uploaded
+alongside the original. For queued batches every file's upload is started
+up front, so up to UPLOAD_WORKERS uploads are in flight while detection
+works through the files.
+
+Bulk uploads are queued: the request only validates, hashes and stages the
+files and records an UploadBatch; the ingestion itself runs in the
+background thread pool and its progress is read from the UploadItem rows.
+
+Large batches can instead be sent as a chunked upload session: an open
+UploadBatch that receives each file (or each chunk of a large file) in its
+own small request, keyed by a client-chosen idempotency key. Every file is
+queued for ingestion as soon as its last chunk arrives, and a client that
+lost its connection asks for the batch state and resumes from the bytes
+already received.
+
+Photos that are already in Cloudinary (e.g. created by the Cloudinary sync)
+only need the face stage: process_photos_concurrently fetches, detects,
+embeds and stores the encodings of many photos at once in a worker pool.
+"""
+
+import mimetypes
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.uploadedfile import UploadedFile
+from django.db import connections, transaction
+from django.db.models import Count, Sum, Min, Max
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import tasks
+from .uploads import percentile, submit_upload
+from .images import IngestionImage
+from .renditions import build_renditions, submit_rendition_uploads, apply_rendition_uploads
+from .models import Photo, UploadBatch, UploadItem
+from .face_utils import (
+    validate_image_file,
+    compute_content_hash,
+    find_duplicate_photo,
+    detect_faces_for_upload,
+    process_photo_faces,
+    warm_up_models,
+)
+
+
+def _discard_upload(upload):
+    """Cancel an upload that is no longer needed, or delete what it stored"""
+    if upload.cancel():
+        return
+    try:
+        stored_name = upload.result()['name']
+        Photo._meta.get_field('image').storage.delete(stored_name)
+    except Exception:
+        pass
+
+
+def ingest_image_bytes(event, name, image_bytes, uploaded_by=None, content_hash=None, on_uploaded=None,
+                       upload=None):
+    """
+    Validate, store and face-process one image.
+
+    Args:
+        event: Event the photo is added to
+        name: Original filename
+        image_bytes: Image file contents
+        uploaded_by: User who uploaded the photo
+        content_hash: SHA-256 of image_bytes if already known
+        on_uploaded: Optional callback(photo) run once the Photo row exists
+        upload: Optional Future of an upload of this file that was already
+            started (see uploads.submit_upload)
+
+    Returns:
+        dict: {'filename', 'status' ('success' | 'skipped' | 'error'),
+        'message', 'photo_id', 'faces', 'upload'} - 'upload' holds the
+        upload timing from uploads.upload_to_storage
+    """
+    result = {
+        'filename': name,
+        'status': 'error',
+        'message': '',
+        'photo_id': None,
+        'faces': 0,
+        'upload': None,
+    }
+
+    content_hash = content_hash or compute_content_hash(image_bytes)
+
+    # Skip files whose exact bytes are already in this event
+    duplicate = find_duplicate_photo(content_hash, event=event)
+    if duplicate:
+        if upload is not None:
+            _discard_upload(upload)
+        result.update(status='skipped', message='Already uploaded to this event', photo_id=duplicate.id)
+        return result
+
+    # Decoded once here; every later stage uses these pixels
+    image = IngestionImage(image_bytes, name)
+    is_valid, error_msg = image.validate()
+    if not is_valid:
+        if upload is not None:
+            _discard_upload(upload)
+        result['message'] = error_msg
+        return result
+
+    width, height = image.original_size
+    photo = Photo(
+        event=event,
+        uploaded_by=uploaded_by,
+        content_hash=content_hash,
+        perceptual_hash=image.perceptual_hash(),
+        width=width,
+        height=height,
+        bytes=len(image_bytes)
+    )
+
+    # Cloudinary upload in the background while faces are detected locally
+    if upload is None:
+        upload = submit_upload(image_bytes, name)
+
+    rendition_uploads = {}
+    if settings.PHOTO_RENDITIONS_ENABLED:
+        try:
+            rendition_uploads = submit_rendition_uploads(build_renditions(image, name))
+        except Exception as e:
+            # generate_renditions can fill them in later
+            print(f"  ⚠️  Could not create renditions: {str(e)}")
+
+    try:
+        detection = detect_faces_for_upload(image, content_hash)
+    except Exception as e:
+        # process_photo_faces retries from the bytes and records the failure
+        print(f"  ⚠️  Face detection error: {str(e)}")
+        detection = None
+
+    try:
+        result['upload'] = upload.result()
+    except Exception as e:
+        for rendition_upload in rendition_uploads.values():
+            _discard_upload(rendition_upload)
+        result['message'] = f"Upload failed: {str(e)}"
+        return result
+
+    photo.image.name = result['upload']['name']
+    apply_rendition_uploads(photo, rendition_uploads)
+    photo.save()
+    print(f"  ✅ Uploaded to Cloudinary")
+    if on_uploaded:
+        on_uploaded(photo)
+
+    faces_count = process_photo_faces(photo, image_bytes=image_bytes, detection=detection)
+    result.update(status='success', photo_id=photo.id, faces=faces_count)
+    if photo.processing_status == Photo.ProcessingStatus.FAILED:
+        result['message'] = 'Uploaded (face processing pending)'
+    else:
+        result['message'] = f'{faces_count} face(s) detected'
+    return result
+
+
+def _process_photo_faces(photo):
+    try:
+        return process_photo_faces(photo)
+    finally:
+        # Pool threads outlive the command's connection cleanup
+        connections.close_all()
+
+
+def process_photos_concurrently(photos, workers=None):
+    """
+    Face-process existing photos in parallel, yielding each as soon as it is done.
+
+    Every photo goes through process_photo_faces (duplicate reuse, embedding
+    cache, download of the detection rendition, detection, embedding and a
+    bulk insert of its FaceEncoding rows) in a pool of worker threads. The
+    models are built once up front; the DeepFace calls themselves run one
+    at a time (face_utils holds a lock around them), so the pool overlaps
+    downloads, cache lookups and database writes with detection.
+
+    Args:
+        photos: Iterable of Photo instances
+        workers: Number of photos processed at once (defaults to FACE_PROCESSING_WORKERS)
+
+    Yields:
+        tuple: (photo, faces_count, error) in completion order - faces_count
+        is None when error is set; failures recorded on the photo itself
+        (processing_status FAILED) are not errors here
+    """
+    workers = workers or settings.FACE_PROCESSING_WORKERS
+    photos = list(photos)
+    if not photos:
+        return
+    warm_up_models()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='face-processing') as executor:
+        futures = {executor.submit(_process_photo_faces, photo): photo for photo in photos}
+        for future in as_completed(futures):
+            photo = futures[future]
+            try:
+                faces_count = future.result()
+            except Exception as e:
+                yield photo, None, e
+            else:
+                yield photo, faces_count, None
+
+
+def stage_uploaded_file(uploaded_file):
+    """
+    Keep an uploaded file on local disk after the request has finished.
+
+    Temporary upload files are moved (no copy); in-memory uploads are written out.
+
+    Returns:
+        str: path of the staged file
+    """
+    os.makedirs(settings.UPLOAD_STAGING_DIR, exist_ok=True)
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    staged_path = os.path.join(settings.UPLOAD_STAGING_DIR, f"{uuid.uuid4().hex}{extension}")
+
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        uploaded_file.file.flush()
+        file_move_safe(uploaded_file.temporary_file_path(), staged_path)
+    else:
+        with open(staged_path, 'wb') as staged:
+            for chunk in uploaded_file.chunks():
+                staged.write(chunk)
+    return staged_path
+
+
+def _screen_item(item, uploaded_file, event, seen_hashes, now):
+    """
+    Validate, hash and dedupe the file of an upload item.
+
+    Files that can't or needn't be ingested are marked finished (failed or
+    skipped) on the item; seen_hashes collects the hashes of accepted files.
+
+    Returns:
+        bool: True if the file should be ingested
+    """
+    # Only the header is checked here; ingestion decodes (and so fully validates) the image
+    is_valid, error_msg = validate_image_file(uploaded_file, verify=False)
+    if not is_valid:
+        item.status = UploadItem.Status.FAILED
+        item.message = error_msg
+        item.finished_at = now
+        return False
+
+    item.content_hash = compute_content_hash(uploaded_file)
+    duplicate = find_duplicate_photo(item.content_hash, event=event)
+    if duplicate or item.content_hash in seen_hashes:
+        item.status = UploadItem.Status.SKIPPED
+        item.message = 'Already uploaded to this event'
+        item.photo = duplicate
+        item.finished_at = now
+        return False
+
+    seen_hashes.add(item.content_hash)
+    return True
+
+
+def enqueue_upload_batch(event, files, uploaded_by=None):
+    """
+    Validate and stage uploaded files and queue them for background ingestion.
+
+    Invalid files and exact duplicates (already in the event, or repeated in
+    the batch) are recorded as finished items straight away, so every file
+    of the request shows up in the batch progress.
+
+    Args:
+        event: Event the photos are added to
+        files: List of Django UploadedFile objects
+        uploaded_by: User who uploaded the photos
+
+    Returns:
+        tuple: (UploadBatch, summary) - summary counts the files 'queued' for
+        ingestion and those 'skipped' or 'failed' straight away
+    """
+    batch = UploadBatch.objects.create(event=event, created_by=uploaded_by)
+    now = timezone.now()
+    items = []
+    seen_hashes = set()
+
+    for position, uploaded_file in enumerate(files):
+        item = UploadItem(batch=batch, position=position, filename=uploaded_file.name[:255], size=uploaded_file.size)
+        items.append(item)
+
+        if _screen_item(item, uploaded_file, event, seen_hashes, now):
+            item.staged_path = stage_uploaded_file(uploaded_file)
+
+    UploadItem.objects.bulk_create(items)
+
+    queued = [item.id for item in items if item.status == UploadItem.Status.QUEUED]
+    if not queued:
+        UploadBatch.objects.filter(pk=batch.pk).update(finished_at=now)
+        batch.finished_at = now
+
+    summary = {
+        'queued': len(queued),
+        'skipped': sum(1 for item in items if item.status == UploadItem.Status.SKIPPED),
+        'failed': sum(1 for item in items if item.status == UploadItem.Status.FAILED),
+    }
+
+    # Only start once the rows are visible to the worker threads
+    transaction.on_commit(lambda: _start_items(items))
+    return batch, summary
+
+
+_pending_uploads = {}
+_pending_uploads_lock = threading.Lock()
+
+
+def _start_items(items):
+    """
+    Start the uploads of queued items in the I/O pool and queue their ingestion.
+
+    Uploads only need the staged file, so they all start right away and run
+    UPLOAD_WORKERS at a time, ahead of the slower face detection jobs.
+    """
+    queued = [item for item in items if item.status == UploadItem.Status.QUEUED]
+    for item in queued:
+        future = submit_upload(item.staged_path, item.filename)
+        with _pending_uploads_lock:
+            _pending_uploads[item.id] = future
+    for item in queued:
+        tasks.submit(process_upload_item, item.id)
+
+
+def process_upload_item(item_id):
+    """
+    Ingest one queued upload item (runs in the background pool).
+
+    Args:
+        item_id: UploadItem primary key
+
+    Returns:
+        str: the item's final status
+    """
+    item = UploadItem.objects.select_related('batch__event', 'batch__created_by').get(pk=item_id)
+    if item.status != UploadItem.Status.QUEUED:
+        return item.status
+
+    UploadItem.objects.filter(pk=item.pk).update(status=UploadItem.Status.UPLOADING, started_at=timezone.now())
+    print(f"📤 Ingesting {item.filename} (batch {item.batch_id})")
+
+    def mark_processing(photo):
+        UploadItem.objects.filter(pk=item.pk).update(status=UploadItem.Status.PROCESSING, photo=photo)
+
+    # Resumed items have no upload running yet; ingest_image_bytes starts one
+    with _pending_uploads_lock:
+        upload = _pending_uploads.pop(item.pk, None)
+
+    try:
+        with open(item.staged_path, 'rb') as staged:
+            image_bytes = staged.read()
+        result = ingest_image_bytes(
+            item.batch.event,
+            item.filename,
+            image_bytes,
+            uploaded_by=item.batch.created_by,
+            content_hash=item.content_hash,
+            on_uploaded=mark_processing,
+            upload=upload
+        )
+        status = {
+            'success': UploadItem.Status.DONE,
+            'skipped': UploadItem.Status.SKIPPED,
+        }.get(result['status'], UploadItem.Status.FAILED)
+        updates = {
+            'status': status,
+            'message': result['message'][:500],
+            'photo_id': result['photo_id'],
+            'face_count': result['faces'],
+        }
+        if result['upload']:
+            updates['upload_seconds'] = round(result['upload']['seconds'], 3)
+            updates['upload_attempts'] = result['upload']['attempts']
+    except Exception as e:
+        print(f"  ❌ Ingestion failed for {item.filename}: {str(e)}")
+        status = UploadItem.Status.FAILED
+        updates = {'status': status, 'message': str(e)[:500]}
+
+    # The staged copy is only kept for files that can still be retried
+    if status != UploadItem.Status.FAILED:
+        try:
+            os.remove(item.staged_path)
+        except OSError:
+            pass
+        updates['staged_path'] = ''
+
+    UploadItem.objects.filter(pk=item.pk).update(finished_at=timezone.now(), **updates)
+    _finish_batch_if_done(item.batch_id)
+    return status
+
+
+def _finish_batch_if_done(batch_id):
+    active = [
+        UploadItem.Status.RECEIVING,
+        UploadItem.Status.QUEUED,
+        UploadItem.Status.UPLOADING,
+        UploadItem.Status.PROCESSING,
+    ]
+    if not UploadItem.objects.filter(batch_id=batch_id, status__in=active).exists():
+        UploadBatch.objects.filter(
+            pk=batch_id, is_open=False, finished_at__isnull=True
+        ).update(finished_at=timezone.now())
+
+
+def open_upload_session(event, uploaded_by=None):
+    """
+    Start a chunked upload session for an event.
+
+    Returns:
+        UploadBatch: the open batch that receive_chunk adds files to
+    """
+    return UploadBatch.objects.create(event=event, created_by=uploaded_by, is_open=True)
+
+
+def _get_or_create_session_item(batch, upload_key, filename, size, position=None):
+    """Find the item of a session file by its key, creating it on the first chunk (row locked)"""
+    item = UploadItem.objects.select_for_update().filter(batch=batch, upload_key=upload_key).first()
+    if item is not None:
+        return item
+
+    # Lock the batch so concurrent first chunks of the same file create one item
+    UploadBatch.objects.select_for_update().filter(pk=batch.pk).first()
+    item = UploadItem.objects.select_for_update().filter(batch=batch, upload_key=upload_key).first()
+    if item is not None:
+        return item
+
+    os.makedirs(settings.UPLOAD_STAGING_DIR, exist_ok=True)
+    extension = os.path.splitext(filename)[1].lower()
+    if position is None:
+        position = batch.items.aggregate(next=Coalesce(Max('position') + 1, 0))['next']
+    return UploadItem.objects.create(
+        batch=batch,
+        position=position,
+        upload_key=upload_key,
+        filename=filename[:255],
+        size=size,
+        status=UploadItem.Status.RECEIVING,
+        staged_path=os.path.join(settings.UPLOAD_STAGING_DIR, f"{uuid.uuid4().hex}{extension}"),
+    )
+
+
+def receive_chunk(batch, upload_key, filename, size, offset, chunk, position=None):
+    """
+    Store one chunk of a file sent to a chunked upload session.
+
+    Chunks of a file must arrive in order. Repeating a chunk (or a whole
+    file) that was already received is harmless, so clients can simply
+    retry failed requests. When the last chunk arrives the file is
+    validated, hashed and queued for ingestion.
+
+    Args:
+        batch: Open UploadBatch of the session
+        upload_key: Client idempotency key of the file (unique in the session)
+        filename: Original filename
+        size: Total size of the file in bytes
+        offset: Position of this chunk in the file
+        chunk: Django UploadedFile with the chunk's bytes
+        position: Order of the file in the client's list (defaults to the
+            next free position)
+
+    Returns:
+        tuple: (UploadItem or None, error_message) - error_message is None
+        when the chunk was stored or had already been received; an item with
+        an error means the chunk did not continue the file, and the client
+        should resend from item.received_bytes
+    """
+    if size > settings.MAX_UPLOAD_SIZE:
+        max_size_mb = settings.MAX_UPLOAD_SIZE / (1024 * 1024)
+        return None, f"File size exceeds {max_size_mb}MB limit"
+
+    with transaction.atomic():
+        item = _get_or_create_session_item(batch, upload_key, filename, size, position)
+
+        # Already complete, or a retry of a chunk that was stored before
+        if item.status != UploadItem.Status.RECEIVING or offset + chunk.size <= item.received_bytes:
+            return item, None
+
+        if offset != item.received_bytes:
+            return item, f"Expected the chunk at offset {item.received_bytes}"
+        if offset + chunk.size > item.size:
+            return item, "Chunk runs past the end of the file"
+
+        # Write at the offset (not append) so a half-written earlier attempt is overwritten
+        mode = 'r+b' if os.path.exists(item.staged_path) else 'wb'
+        with open(item.staged_path, mode) as staged:
+            staged.seek(offset)
+            for data in chunk.chunks():
+                staged.write(data)
+            staged.truncate()
+
+        item.received_bytes = offset + chunk.size
+        update_fields = ['received_bytes']
+        if item.received_bytes == item.size:
+            update_fields += _complete_session_item(item)
+        item.save(update_fields=update_fields)
+
+    if item.status == UploadItem.Status.QUEUED:
+        transaction.on_commit(lambda: _start_items([item]))
+    elif item.status != UploadItem.Status.RECEIVING:
+        _finish_batch_if_done(batch.pk)
+    return item, None
+
+
+def _complete_session_item(item):
+    """
+    Screen a fully received session file and queue it for ingestion.
+
+    Returns:
+        list: the item fields that were changed
+    """
+    batch = item.batch
+    seen_hashes = set(
+        batch.items.exclude(pk=item.pk).exclude(
+            status__in=[UploadItem.Status.RECEIVING, UploadItem.Status.FAILED]
+        ).exclude(content_hash='').values_list('content_hash', flat=True)
+    )
+    content_type = mimetypes.guess_type(item.filename)[0] or 'application/octet-stream'
+
+    with open(item.staged_path, 'rb') as staged:
+        received = UploadedFile(file=staged, name=item.filename, content_type=content_type, size=item.size)
+        accepted = _screen_item(item, received, batch.event, seen_hashes, timezone.now())
+
+    if accepted:
+        item.status = UploadItem.Status.QUEUED
+        return ['status', 'content_hash']
+
+    try:
+        os.remove(item.staged_path)
+    except OSError:
+        pass
+    item.staged_path = ''
+    return ['status', 'message', 'photo', 'content_hash', 'finished_at', 'staged_path']
+
+
+def close_upload_session(batch):
+    """
+    Stop a chunked upload session from receiving files.
+
+    Files that were only partly received are marked failed; the batch
+    finishes once the files already queued have been ingested.
+    """
+    UploadBatch.objects.filter(pk=batch.pk).update(is_open=False)
+    batch.is_open = False
+
+    partial = batch.items.filter(status=UploadItem.Status.RECEIVING)
+    for staged_path in partial.exclude(staged_path='').values_list('staged_path', flat=True):
+        try:
+            os.remove(staged_path)
+        except OSError:
+            pass
+    partial.update(
+        status=UploadItem.Status.FAILED,
+        message='Upload was not completed',
+        staged_path='',
+        finished_at=timezone.now()
+    )
+    _finish_batch_if_done(batch.pk)
+    batch.refresh_from_db(fields=['finished_at'])
+
+
+def expire_upload_sessions(max_age_hours=None):
+    """
+    Close chunked upload sessions that have been open for too long.
+
+    Args:
+        max_age_hours: Age limit (defaults to UPLOAD_SESSION_MAX_AGE_HOURS)
+
+    Returns:
+        int: number of sessions closed
+    """
+    max_age_hours = max_age_hours or settings.UPLOAD_SESSION_MAX_AGE_HOURS
+    cutoff = timezone.now() - timedelta(hours=max_age_hours)
+    sessions = list(UploadBatch.objects.filter(is_open=True, created_at__lt=cutoff))
+    for batch in sessions:
+        close_upload_session(batch)
+    return len(sessions)
+
+
+def batch_progress(batch, include_items=True):
+    """
+    Summarise the state of an upload batch for the progress endpoint.
+
+    Returns:
+        dict: per-status counts, completion percentage, throughput
+        (files/minute and MB/s of finished files), upload latency percentiles
+        and optionally per-file state
+    """
+    counts = dict(batch.items.values_list('status').annotate(count=Count('id')))
+    total = sum(counts.values())
+    finished_states = [UploadItem.Status.DONE, UploadItem.Status.SKIPPED, UploadItem.Status.FAILED]
+    completed = sum(counts.get(state, 0) for state in finished_states)
+
+    stored = batch.items.filter(status=UploadItem.Status.DONE, started_at__isnull=False).aggregate(
+        bytes=Sum('size'),
+        files=Count('id'),
+        first_started=Min('started_at'),
+        last_finished=Max('finished_at'),
+    )
+    end = batch.finished_at or timezone.now()
+    elapsed = (end - batch.created_at).total_seconds()
+    working = 0.0
+    if stored['first_started'] and stored['last_finished']:
+        working = max((stored['last_finished'] - stored['first_started']).total_seconds(), 0.001)
+
+    files_per_minute = stored['files'] / working * 60 if working else 0.0
+    remaining = total - completed
+
+    upload_latencies = list(
+        batch.items.filter(upload_seconds__isnull=False).values_list('upload_seconds', flat=True)
+    )
+
+    progress = {
+        'batch_id': str(batch.id),
+        'event': batch.event.slug,
+        'total': total,
+        'completed': completed,
+        'percent': round(completed / total * 100) if total else 100,
+        'counts': {state: counts.get(state, 0) for state in UploadItem.Status.values},
+        'elapsed_seconds': round(elapsed, 1),
+        'files_per_minute': round(files_per_minute, 1),
+        'mb_per_second': round((stored['bytes'] or 0) / working / (1024 * 1024), 2) if working else 0.0,
+        'eta_seconds': round(remaining / files_per_minute * 60) if files_per_minute and remaining else None,
+        'upload_latency': {
+            'p50': percentile(upload_latencies, 0.50),
+            'p90': percentile(upload_latencies, 0.90),
+            'p99': percentile(upload_latencies, 0.99),
+            'max': max(upload_latencies) if upload_latencies else None,
+        },
+        'open': batch.is_open,
+        'finished': batch.finished_at is not None,
+    }
+    if include_items:
+        progress['items'] = [
+            {
+                'position': item['position'],
+                'filename': item['filename'],
+                'status': item['status'],
+                'message': item['message'],
+                'photo_id': item['photo_id'],
+                'faces': item['face_count'],
+                'upload_seconds': item['upload_seconds'],
+                'key': item['upload_key'],
+                'received_bytes': item['received_bytes'],
+            }
+            for item in batch.items.values(
+                'position', 'filename', 'status', 'message', 'photo_id', 'face_count', 'upload_seconds',
+                'upload_key', 'received_bytes'
+            )
+        ]
+    return progress
+
+
+def requeue_stale_items(batch=None, include_failed=False):
+    """
+    Queue again items whose background job was lost (e.g. the server restarted).
+
+    Only call this when no ingestion is running, since items that are being
+    worked on look the same as lost ones.
+
+    Args:
+        batch: Optional UploadBatch to limit the search to
+        include_failed: Also retry failed items whose staged file still exists
+
+    Returns:
+        list: ids of the re-queued items
+    """
+    states = [UploadItem.Status.QUEUED, UploadItem.Status.UPLOADING, UploadItem.Status.PROCESSING]
+    if include_failed:
+        states.append(UploadItem.Status.FAILED)
+    items = UploadItem.objects.filter(status__in=states).exclude(staged_path='')
+    if batch is not None:
+        items = items.filter(batch=batch)
+
+    item_ids = [item_id for item_id, path in items.values_list('id', 'staged_path') if os.path.exists(path)]
+    UploadItem.objects.filter(id__in=item_ids).update(
+        status=UploadItem.Status.QUEUED, message='', started_at=None, finished_at=None
+    )
+    UploadBatch.objects.filter(items__id__in=item_ids).update(finished_at=None)
+    return item_ids
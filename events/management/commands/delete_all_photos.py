@@ -2,15 +2,29 @@
 Management command to delete all photos from database and Cloudinary
 """
 from django.core.management.base import BaseCommand
+from events.deletion import delete_photos
 from events.models import Photo
-import cloudinary.uploader
 
 
 class Command(BaseCommand):
     help = 'Delete all photos from database and Cloudinary'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--event',
+            type=str,
+            help='Only delete the photos of the event with this slug'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Concurrent Cloudinary delete calls (default: CLOUDINARY_DELETE_WORKERS)'
+        )
+
     def handle(self, *args, **options):
         photos = Photo.objects.all()
+        if options['event']:
+            photos = photos.filter(event__slug=options['event'])
         total = photos.count()
         
         if total == 0:
@@ -24,44 +38,12 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('Deletion cancelled.'))
             return
         
-        deleted_count = 0
-        failed_count = 0
-        
-        for i, photo in enumerate(photos, 1):
-            try:
-                self.stdout.write(f'[{i}/{total}] Deleting photo {photo.id}...')
-                
-                # Get Cloudinary public_id from the image URL
-                if photo.image:
-                    try:
-                        # Extract public_id from Cloudinary URL
-                        # Format: https://res.cloudinary.com/<cloud>/image/upload/v<version>/<public_id>.<ext>
-                        url_parts = str(photo.image).split('/')
-                        if 'upload' in url_parts:
-                            upload_index = url_parts.index('upload')
-                            # Get everything after 'upload/v<version>/'
-                            public_id_with_ext = '/'.join(url_parts[upload_index + 2:])
-                            # Remove file extension
-                            public_id = public_id_with_ext.rsplit('.', 1)[0]
-                            
-                            # Delete from Cloudinary
-                            result = cloudinary.uploader.destroy(public_id)
-                            if result.get('result') == 'ok':
-                                self.stdout.write(self.style.SUCCESS(f'  ✓ Deleted from Cloudinary'))
-                            else:
-                                self.stdout.write(self.style.WARNING(f'  ⚠ Cloudinary delete status: {result.get("result")}'))
-                    except Exception as e:
-                        self.stdout.write(self.style.WARNING(f'  ⚠ Could not delete from Cloudinary: {e}'))
-                
-                # Delete from database (this also deletes related FaceEncodings due to CASCADE)
-                photo.delete()
-                deleted_count += 1
-                self.stdout.write(self.style.SUCCESS(f'  ✓ Deleted from database'))
-                
-            except Exception as e:
-                failed_count += 1
-                self.stdout.write(self.style.ERROR(f'  ✗ Error: {e}'))
+        self.stdout.write('🗑️  Deleting from Cloudinary in batches of up to 100 images...')
+        result = delete_photos(photos, workers=options['workers'])
         
-        self.stdout.write(self.style.SUCCESS(f'\n✅ Deleted {deleted_count} photos'))
-        if failed_count > 0:
-            self.stdout.write(self.style.WARNING(f'⚠ Failed to delete {failed_count} photos'))
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Deleted {result["deleted"]} photos'))
+        if result['failed'] > 0:
+            self.stdout.write(self.style.WARNING(f'⚠ Kept {result["failed"]} photos whose Cloudinary files could not be deleted:'))
+            for error in result['errors'][:10]:
+                self.stdout.write(self.style.WARNING(f'  ✗ {error}'))
+            self.stdout.write('  Run the command again to retry them.')
@@ -0,0 +1,73 @@
+"""
+Management command to create thumbnails and medium renditions for existing photos
+Usage: python manage.py generate_renditions [--event <slug>] [--force]
+
+New uploads get their renditions at ingestion; this backfills photos that
+were uploaded before, synced from Cloudinary, or whose rendition upload
+failed. Until then, pages fall back to resized Cloudinary URLs.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from events import media
+from events.models import Photo
+from events.renditions import RENDITION_FIELDS, generate_photo_renditions
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail, WebP thumbnail and medium renditions for photos missing them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--event',
+            type=str,
+            help='Only photos in the event with this slug'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Maximum number of photos to process (0 = no limit)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate renditions even for photos that already have them'
+        )
+
+    def handle(self, *args, **options):
+        photos = Photo.objects.order_by('uploaded_at')
+        if not options['force']:
+            missing = Q()
+            for field in RENDITION_FIELDS:
+                missing |= Q(**{f'{field}__isnull': True}) | Q(**{field: ''})
+            photos = photos.filter(missing)
+        if options['event']:
+            photos = photos.filter(event__slug=options['event'])
+        if options['limit'] > 0:
+            photos = photos[:options['limit']]
+        photos = list(photos)
+        total = len(photos)
+
+        self.stdout.write(f'\nGenerating renditions for {total} photos\n')
+
+        # Originals are downloaded a few at a time ahead of the resizing
+        urls = [photo.get_image_url() for photo in photos]
+        generated = 0
+        failed = 0
+        for index, (photo, (url, content, error)) in enumerate(zip(photos, media.fetch_many(urls)), 1):
+            self.stdout.write(f'[{index}/{total}] Photo #{photo.id}...')
+            try:
+                if error is not None:
+                    raise error
+                updated = generate_photo_renditions(photo, image_bytes=content)
+                if len(updated) < len(RENDITION_FIELDS):
+                    raise RuntimeError(f'only {", ".join(updated) or "no renditions"} stored')
+                generated += 1
+                self.stdout.write(self.style.SUCCESS('  ✅ Done'))
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'  ❌ Error: {str(e)}'))
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Generated renditions for {generated}/{total} photos'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠ {failed} photos failed; run the command again to retry'))
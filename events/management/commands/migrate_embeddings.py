@@ -0,0 +1,229 @@
+"""
+Management command to migrate face search to a new embedding model version
+Usage:
+    python manage.py migrate_embeddings status
+    python manage.py migrate_embeddings build facenet512
+    python manage.py migrate_embeddings cutover facenet512
+    python manage.py migrate_embeddings prune dlib-128
+
+The new version is built as a shadow index (extra FaceEncoding rows tagged
+with its model_version) while the active index keeps serving searches, then
+cut over atomically once every photo with faces is covered.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from events import media
+from events.models import Photo, FaceEncoding, EmbeddingIndex
+from events.face_utils import (
+    EMBEDDING_MODELS,
+    embed_photo_for_version,
+    get_active_model_version,
+    get_detection_image_url,
+    get_reembed_image_url,
+    reembed_photo_from_boxes,
+)
+
+
+PROCESSED_STATES = [Photo.ProcessingStatus.DONE, Photo.ProcessingStatus.SKIPPED]
+
+
+def photos_with_faces():
+    """Processed photos that should have encodings in every complete index"""
+    return Photo.objects.filter(processing_status__in=PROCESSED_STATES, face_count__gt=0)
+
+
+def missing_photos(model_version):
+    """Processed photos with faces that have no encodings for a model version yet"""
+    return photos_with_faces().exclude(face_encodings__model_version=model_version)
+
+
+class Command(BaseCommand):
+    help = 'Build, report on and cut over embedding model versions used for face search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'action',
+            choices=['status', 'build', 'cutover', 'prune'],
+            help='status: per-version coverage, build: re-embed into a shadow index, '
+                 'cutover: make a version active, prune: delete a retired version'
+        )
+        parser.add_argument(
+            'model_version',
+            nargs='?',
+            help=f'Embedding model version ({", ".join(EMBEDDING_MODELS)})'
+        )
+        parser.add_argument(
+            '--event',
+            type=str,
+            help='build: only re-embed photos in the event with this slug'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='build: maximum number of photos to re-embed in this run (0 = no limit)'
+        )
+        parser.add_argument(
+            '--from-boxes',
+            action='store_true',
+            help='build: reuse the active index\'s face boxes and only run the embedding model'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='cutover: switch even if the shadow index does not cover every photo'
+        )
+        parser.add_argument(
+            '--noinput',
+            action='store_true',
+            help='prune: do not ask for confirmation'
+        )
+
+    def handle(self, *args, **options):
+        action = options['action']
+
+        if action == 'status':
+            return self.show_status()
+
+        model_version = options['model_version']
+        if not model_version:
+            raise CommandError(f'"{action}" needs a model version')
+
+        if action == 'build':
+            self.build(model_version, options['event'], options['limit'], options['from_boxes'])
+        elif action == 'cutover':
+            self.cutover(model_version, options['force'])
+        elif action == 'prune':
+            self.prune(model_version, options['noinput'])
+
+    def show_status(self):
+        active = get_active_model_version()
+        total = photos_with_faces().count()
+
+        states = dict(EmbeddingIndex.objects.values_list('model_version', 'state'))
+        rows = {
+            row['model_version']: row['encodings']
+            for row in FaceEncoding.objects.values('model_version').annotate(encodings=Count('id'))
+        }
+        versions = sorted(set(states) | set(rows) | {active})
+
+        self.stdout.write(f'\nActive index: {active}')
+        self.stdout.write(f'Processed photos with faces: {total}\n')
+        self.stdout.write(f'{"Version":<16} {"State":<10} {"Photos":>10} {"Coverage":>9} {"Encodings":>10}')
+
+        for version in versions:
+            covered = total - missing_photos(version).count() if total else 0
+            coverage = (covered / total * 100) if total else 100.0
+            state = states.get(version, 'active' if version == active else '-')
+            self.stdout.write(
+                f'{version:<16} {state:<10} {covered:>10} {coverage:>8.1f}% {rows.get(version, 0):>10}'
+            )
+
+    def build(self, model_version, event_slug, limit, from_boxes=False):
+        if model_version not in EMBEDDING_MODELS:
+            raise CommandError(f'Unknown model version "{model_version}" (known: {", ".join(EMBEDDING_MODELS)})')
+        active = get_active_model_version()
+        if model_version == active:
+            raise CommandError(f'{model_version} is already the active index; use reprocess_faces instead')
+
+        index, created = EmbeddingIndex.objects.get_or_create(model_version=model_version)
+        if not created and index.state == EmbeddingIndex.State.RETIRED:
+            index.state = EmbeddingIndex.State.BUILDING
+            index.save(update_fields=['state'])
+
+        photos = missing_photos(model_version).order_by('uploaded_at')
+        if event_slug:
+            photos = photos.filter(event__slug=event_slug)
+        if limit > 0:
+            photos = photos[:limit]
+        photos = list(photos)
+        total = len(photos)
+
+        self.stdout.write(f'\nBuilding shadow index {model_version}: {total} photos to re-embed\n')
+
+        # Download the next few originals while the current photo is being embedded
+        urls = [get_reembed_image_url(photo) if from_boxes else get_detection_image_url(photo) for photo in photos]
+        window = settings.MEDIA_FETCH_WORKERS
+
+        embedded = 0
+        failed = 0
+        for index_number, photo in enumerate(photos, 1):
+            media.prefetch(urls[index_number - 1:index_number - 1 + window])
+            self.stdout.write(f'[{index_number}/{total}] Re-embedding photo #{photo.id}...')
+            try:
+                faces_count = 0
+                if from_boxes:
+                    faces_count = reembed_photo_from_boxes(photo, model_version, source_version=active)
+                if not faces_count:
+                    # No usable boxes in the active index: run the full pipeline
+                    faces_count = embed_photo_for_version(photo, model_version)
+                embedded += 1
+                self.stdout.write(self.style.SUCCESS(f'  ✅ {faces_count} face(s)'))
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'  ❌ Error: {str(e)}'))
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Re-embedded {embedded}/{total} photos'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠ {failed} photos failed; run build again to retry'))
+        self.show_status()
+
+    def cutover(self, model_version, force):
+        try:
+            index = EmbeddingIndex.objects.get(model_version=model_version)
+        except EmbeddingIndex.DoesNotExist:
+            raise CommandError(f'No index for {model_version}; run "build {model_version}" first')
+        if index.state == EmbeddingIndex.State.ACTIVE:
+            self.stdout.write(self.style.WARNING(f'{model_version} is already active'))
+            return
+
+        missing = missing_photos(model_version).count()
+        if missing and not force:
+            raise CommandError(
+                f'{missing} photos have no {model_version} encodings yet; '
+                f'run "build {model_version}" or pass --force'
+            )
+
+        with transaction.atomic():
+            EmbeddingIndex.objects.select_for_update().filter(
+                state=EmbeddingIndex.State.ACTIVE
+            ).update(state=EmbeddingIndex.State.RETIRED)
+            EmbeddingIndex.objects.filter(pk=index.pk).update(
+                state=EmbeddingIndex.State.ACTIVE,
+                activated_at=timezone.now()
+            )
+
+            # Photos now covered by the new index carry its version
+            Photo.objects.filter(processing_status__in=PROCESSED_STATES).filter(
+                Q(face_count=0) | Q(face_encodings__model_version=model_version)
+            ).update(model_version=model_version)
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {model_version} is now the active search index'))
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                f'⚠ {missing} photos are not searchable until reprocessed '
+                f'(python manage.py reprocess_faces --outdated)'
+            ))
+
+    def prune(self, model_version, noinput):
+        if model_version == get_active_model_version():
+            raise CommandError(f'{model_version} is the active index and cannot be pruned')
+
+        encodings = FaceEncoding.objects.filter(model_version=model_version)
+        total = encodings.count()
+        if total == 0:
+            self.stdout.write(self.style.WARNING(f'No {model_version} encodings to delete.'))
+            return
+
+        if not noinput:
+            confirm = input(f'Delete {total} {model_version} encodings? (yes/no): ')
+            if confirm.lower() != 'yes':
+                self.stdout.write(self.style.WARNING('Prune cancelled.'))
+                return
+
+        encodings.delete()
+        EmbeddingIndex.objects.filter(model_version=model_version).update(state=EmbeddingIndex.State.RETIRED)
+        self.stdout.write(self.style.SUCCESS(f'✅ Deleted {total} {model_version} encodings'))
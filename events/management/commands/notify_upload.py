@@ -0,0 +1,60 @@
+"""
+Management command that stands in for Cloudinary's upload notifications
+Usage: python manage.py notify_upload <public_id> [--url <webhook url>] [--event <slug>]
+
+Looks the image up with the Admin API and posts a signed upload
+notification for it to the webhook, exactly as Cloudinary would. Useful
+where Cloudinary can't reach the server (local development) and to check
+the webhook end to end.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from events.webhooks import configure_cloudinary, send_notification
+import cloudinary.api
+
+
+class Command(BaseCommand):
+    help = 'Send a signed Cloudinary upload notification for an image to the webhook'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'public_id',
+            type=str,
+            help='Cloudinary public_id of the uploaded image'
+        )
+        parser.add_argument(
+            '--url',
+            type=str,
+            default='http://localhost:8000/webhooks/cloudinary/',
+            help='Webhook URL (default: the local development server)'
+        )
+        parser.add_argument(
+            '--event',
+            type=str,
+            help='Event slug to send as the upload context'
+        )
+
+    def handle(self, *args, **options):
+        configure_cloudinary()
+        try:
+            resource = cloudinary.api.resource(options['public_id'])
+        except Exception as e:
+            raise CommandError(f'Could not look up "{options["public_id"]}": {str(e)}')
+
+        if options['event']:
+            resource['context'] = {'custom': {'event': options['event']}}
+
+        self.stdout.write(f'📨 Notifying {options["url"]} of {resource["public_id"]}...')
+        try:
+            status_code, result = send_notification(resource, url=options['url'])
+        except Exception as e:
+            raise CommandError(f'Notification failed: {str(e)}')
+
+        if status_code != 200:
+            raise CommandError(f'Webhook answered {status_code}: {result.get("error", result)}')
+
+        message = f'  ✓ {result["status"]}'
+        if result.get('photo_id'):
+            message += f' (photo {result["photo_id"]})'
+        if result.get('reason'):
+            message += f': {result["reason"]}'
+        self.stdout.write(self.style.SUCCESS(message))
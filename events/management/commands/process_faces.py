@@ -1,17 +1,19 @@
 """
 Management command to process faces in uploaded photos
 """
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from events import media
 from events.models import Photo
-from events.face_utils import process_photo_faces
+from events.face_utils import process_photo_faces, get_detection_image_url
 
 
 class Command(BaseCommand):
     help = 'Process faces in all unprocessed photos'
 
     def handle(self, *args, **options):
-        unprocessed = Photo.objects.filter(faces_processed=False)
-        total = unprocessed.count()
+        unprocessed = list(Photo.objects.filter(processing_status=Photo.ProcessingStatus.PENDING))
+        total = len(unprocessed)
         
         self.stdout.write(f'\nFound {total} unprocessed photos\n')
         
@@ -19,14 +21,19 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS('No photos to process!'))
             return
         
+        # Download the next few originals while the current photo is being processed
+        urls = [get_detection_image_url(photo) for photo in unprocessed]
+        window = settings.MEDIA_FETCH_WORKERS
+        
         processed = 0
         for index, photo in enumerate(unprocessed, 1):
+            media.prefetch(urls[index - 1:index - 1 + window])
             self.stdout.write(f'[{index}/{total}] Processing photo #{photo.id}...')
-            try:
-                faces_count = process_photo_faces(photo)
+            faces_count = process_photo_faces(photo)
+            if photo.processing_status == Photo.ProcessingStatus.FAILED:
+                self.stdout.write(self.style.ERROR(f'  ❌ Error: {photo.processing_error}'))
+            else:
                 self.stdout.write(self.style.SUCCESS(f'  ✅ Detected {faces_count} face(s)'))
                 processed += 1
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'  ❌ Error: {str(e)}'))
         
         self.stdout.write(self.style.SUCCESS(f'\n✅ Processed {processed}/{total} photos'))
@@ -0,0 +1,36 @@
+"""
+Management command to repair the photo, face and processed counters on events
+Usage: python manage.py recount_events [--event <slug>]
+
+The counters are adjusted as photos are added, processed and deleted;
+changes made outside those paths (raw SQL, manual database edits) make
+them drift. This recomputes them from the photos.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Recompute Event photo_count, face_count, processed_count and last_photo_at'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--event',
+            type=str,
+            help='Only recount the event with this slug'
+        )
+
+    def handle(self, *args, **options):
+        events = Event.all_objects.all()
+        if options['event']:
+            events = events.filter(slug=options['event'])
+            if not events.exists():
+                raise CommandError(f'Event "{options["event"]}" not found')
+
+        total = events.count()
+        self.stdout.write(f'🔢 Recounting {total} events...')
+        fixed = Event.recount(events)
+
+        if fixed:
+            self.stdout.write(self.style.WARNING(f'  Fixed counters of {fixed} event(s)'))
+        self.stdout.write(self.style.SUCCESS(f'✅ {total - fixed} event(s) were already correct'))
@@ -0,0 +1,116 @@
+"""
+Management command to recompute face embeddings from stored face boxes
+Usage: python manage.py reembed_faces --model-version facenet512 --in-place
+
+Each image is downloaded once and only the embedding model runs on the
+stored top/right/bottom/left boxes, so a model upgrade costs a fraction of
+a full reprocess (no detector cascade). The face crops of each batch of
+photos go through the model in a single call.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from events.models import Photo
+from events.face_utils import (
+    EMBEDDING_MODELS,
+    get_active_model_version,
+    reembed_photos_from_boxes,
+)
+
+
+class Command(BaseCommand):
+    help = 'Re-embed faces from stored bounding boxes without re-running detection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model-version',
+            type=str,
+            help=f'Embedding model version to compute (default: active index; known: {", ".join(EMBEDDING_MODELS)})'
+        )
+        parser.add_argument(
+            '--from-version',
+            type=str,
+            help='Model version whose stored boxes are reused (default: active index)'
+        )
+        parser.add_argument(
+            '--in-place',
+            action='store_true',
+            help='Overwrite the source encodings instead of adding a shadow index '
+                 '(only into the active or the source version; use a shadow index '
+                 'and "migrate_embeddings cutover" for any other)'
+        )
+        parser.add_argument(
+            '--rendition-size',
+            type=int,
+            help='Longest side of the image faces are cropped from '
+                 '(default: FACE_REEMBED_RENDITION_SIZE, 0 = original)'
+        )
+        parser.add_argument(
+            '--event',
+            type=str,
+            help='Only photos in the event with this slug'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Maximum number of photos to re-embed (0 = no limit)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Photos whose face crops are embedded in one model call (default: 50)'
+        )
+
+    def handle(self, *args, **options):
+        active = get_active_model_version()
+        model_version = options['model_version'] or active
+        source_version = options['from_version'] or active
+        in_place = options['in_place']
+
+        if model_version not in EMBEDDING_MODELS:
+            raise CommandError(f'Unknown model version "{model_version}" (known: {", ".join(EMBEDDING_MODELS)})')
+        if model_version == source_version and not in_place:
+            raise CommandError('Re-embedding a version into itself needs --in-place')
+        if in_place and model_version not in (active, source_version):
+            raise CommandError(
+                f'--in-place into {model_version} would hide the photos from searches on the active '
+                f'index ({active}); re-embed into a shadow index and run "migrate_embeddings cutover" instead'
+            )
+
+        photos = Photo.objects.filter(face_encodings__model_version=source_version).distinct().order_by('uploaded_at')
+        if not in_place:
+            # Resumable: skip photos whose shadow rows already exist
+            photos = photos.exclude(face_encodings__model_version=model_version)
+        if options['event']:
+            photos = photos.filter(event__slug=options['event'])
+        if options['limit'] > 0:
+            photos = photos[:options['limit']]
+
+        photo_ids = list(photos.values_list('id', flat=True))
+        total = len(photo_ids)
+        batch_size = max(1, options['batch_size'])
+
+        mode = 'in place' if in_place else 'into shadow index'
+        self.stdout.write(f'\nRe-embedding {total} photos from {source_version} boxes to {model_version} ({mode})\n')
+
+        reembedded = 0
+        faces_total = 0
+        failed = 0
+        for start in range(0, total, batch_size):
+            batch = list(Photo.objects.filter(id__in=photo_ids[start:start + batch_size]).order_by('uploaded_at'))
+            results = reembed_photos_from_boxes(
+                batch, model_version, source_version=source_version, in_place=in_place,
+                rendition_size=options['rendition_size']
+            )
+            for photo, faces_count, error in results:
+                if error is not None:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'  ❌ Photo #{photo.id}: {str(error)}'))
+                else:
+                    faces_total += faces_count
+                    reembedded += 1
+            self.stdout.write(f'[{min(start + batch_size, total)}/{total}] photos done, {faces_total} face(s) re-embedded')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Re-embedded {reembedded}/{total} photos ({faces_total} faces)'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠ {failed} photos failed'))
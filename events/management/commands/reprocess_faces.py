@@ -0,0 +1,129 @@
+"""
+Management command to reprocess faces for a targeted selection of photos
+Usage: python manage.py reprocess_faces --status failed --event hackotsava-2025
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from events import media
+from events.models import Photo
+from events.face_utils import process_photo_faces, get_active_model_version, get_detection_image_url
+
+
+class Command(BaseCommand):
+    help = 'Reprocess faces for photos selected by status, event, date or model version'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status',
+            nargs='+',
+            choices=Photo.ProcessingStatus.values,
+            help='Only photos in these processing states (e.g. failed processing)'
+        )
+        parser.add_argument(
+            '--event',
+            type=str,
+            help='Only photos in the event with this slug'
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='Only photos uploaded on or after this date (YYYY-MM-DD)'
+        )
+        parser.add_argument(
+            '--until',
+            type=str,
+            help='Only photos uploaded on or before this date (YYYY-MM-DD)'
+        )
+        parser.add_argument(
+            '--model-version',
+            type=str,
+            help='Only photos whose encodings were produced by this model version'
+        )
+        parser.add_argument(
+            '--outdated',
+            action='store_true',
+            help='Only photos not yet processed with the model version of the active search index'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Maximum number of photos to reprocess (0 = no limit)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only show how many photos would be reprocessed'
+        )
+
+    def _parse_date(self, value, option):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'{option} must be a date in YYYY-MM-DD format, got "{value}"')
+
+    def handle(self, *args, **options):
+        photos = Photo.objects.select_related('event').order_by('uploaded_at')
+        filtered = False
+        
+        if options['status']:
+            photos = photos.filter(processing_status__in=options['status'])
+            filtered = True
+        if options['event']:
+            photos = photos.filter(event__slug=options['event'])
+            filtered = True
+        if options['since']:
+            photos = photos.filter(uploaded_at__date__gte=self._parse_date(options['since'], '--since'))
+            filtered = True
+        if options['until']:
+            photos = photos.filter(uploaded_at__date__lte=self._parse_date(options['until'], '--until'))
+            filtered = True
+        if options['model_version'] is not None:
+            photos = photos.filter(model_version=options['model_version'])
+            filtered = True
+        if options['outdated']:
+            photos = photos.exclude(model_version=get_active_model_version())
+            filtered = True
+        
+        if not filtered:
+            raise CommandError(
+                'Specify at least one filter (--status, --event, --since, --until, --model-version or --outdated)'
+            )
+        
+        if options['limit'] > 0:
+            photos = photos[:options['limit']]
+        
+        photos = list(photos)
+        total = len(photos)
+        self.stdout.write(f'\nFound {total} photos to reprocess\n')
+        
+        if total == 0 or options['dry_run']:
+            return
+        
+        # Download the next few originals while the current photo is being processed
+        urls = [get_detection_image_url(photo) for photo in photos]
+        window = settings.MEDIA_FETCH_WORKERS
+        
+        succeeded = 0
+        failed = 0
+        for index, photo in enumerate(photos, 1):
+            media.prefetch(urls[index - 1:index - 1 + window])
+            self.stdout.write(
+                f'[{index}/{total}] Reprocessing photo #{photo.id} '
+                f'({photo.processing_status}, {photo.processing_attempts} previous attempt(s))...'
+            )
+            faces_count = process_photo_faces(photo)
+            if photo.processing_status == Photo.ProcessingStatus.FAILED:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'  ❌ Error: {photo.processing_error}'))
+            else:
+                succeeded += 1
+                self.stdout.write(self.style.SUCCESS(
+                    f'  ✅ Detected {faces_count} face(s) in {photo.processing_duration:.1f}s'
+                ))
+        
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Reprocessed {succeeded}/{total} photos'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠ {failed} photos failed again'))
@@ -0,0 +1,45 @@
+"""
+Management command to finish event deletions whose background job was interrupted
+Usage: python manage.py resume_deletions [--retry-failed]
+
+Event deletions run in in-process threads, so a restart loses the job (the
+event stays hidden and its EventDeletion row stays queued or running). Run
+this to finish them here; deletions that failed on Cloudinary errors are
+retried with --retry-failed.
+"""
+from django.core.management.base import BaseCommand
+from events.deletion import run_event_deletion
+from events.models import EventDeletion
+
+
+class Command(BaseCommand):
+    help = 'Finish event deletions left queued or half-done by an interrupted server'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also retry deletions that failed'
+        )
+
+    def handle(self, *args, **options):
+        statuses = [EventDeletion.Status.QUEUED, EventDeletion.Status.RUNNING]
+        if options['retry_failed']:
+            statuses.append(EventDeletion.Status.FAILED)
+
+        deletions = list(EventDeletion.objects.filter(status__in=statuses).order_by('created_at'))
+        total = len(deletions)
+        self.stdout.write(f'\nFound {total} event deletions to resume\n')
+
+        done = 0
+        for index, deletion in enumerate(deletions, 1):
+            self.stdout.write(f'[{index}/{total}] {deletion.event_name}...')
+            status = run_event_deletion(deletion.id)
+            deletion.refresh_from_db()
+            if status == EventDeletion.Status.DONE:
+                done += 1
+                self.stdout.write(self.style.SUCCESS(f'  ✅ {deletion.deleted_photos} photos deleted'))
+            else:
+                self.stdout.write(self.style.ERROR(f'  ❌ {deletion.message}'))
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Finished {done}/{total} deletions'))
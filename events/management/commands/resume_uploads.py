@@ -0,0 +1,59 @@
+"""
+Management command to finish upload batches whose background ingestion was interrupted
+Usage: python manage.py resume_uploads [--retry-failed]
+
+Queued uploads are ingested by in-process threads, so a restart loses the
+jobs (the staged files and UploadItem rows are kept). Run this while the
+web server is not ingesting to process the leftovers here. Chunked upload
+sessions left open for longer than UPLOAD_SESSION_MAX_AGE_HOURS are closed
+first; sessions that are still young stay open so clients can resume them.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from events.models import UploadBatch, UploadItem
+from events.ingestion import requeue_stale_items, process_upload_item, expire_upload_sessions
+
+
+class Command(BaseCommand):
+    help = 'Ingest upload items left queued or half-done by an interrupted server'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch',
+            type=str,
+            help='Only items of this upload batch id'
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also retry failed items whose staged file is still on disk'
+        )
+
+    def handle(self, *args, **options):
+        batch = None
+        if options['batch']:
+            try:
+                batch = UploadBatch.objects.get(pk=options['batch'])
+            except (UploadBatch.DoesNotExist, ValueError):
+                raise CommandError(f'Upload batch "{options["batch"]}" not found')
+
+        expired = expire_upload_sessions()
+        if expired:
+            self.stdout.write(self.style.WARNING(f'Closed {expired} abandoned upload sessions'))
+
+        item_ids = requeue_stale_items(batch=batch, include_failed=options['retry_failed'])
+        total = len(item_ids)
+        self.stdout.write(f'\nFound {total} upload items to resume\n')
+
+        done = 0
+        for index, item_id in enumerate(item_ids, 1):
+            filename = UploadItem.objects.values_list('filename', flat=True).get(pk=item_id)
+            self.stdout.write(f'[{index}/{total}] {filename}...')
+            status = process_upload_item(item_id)
+            if status == UploadItem.Status.FAILED:
+                message = UploadItem.objects.values_list('message', flat=True).get(pk=item_id)
+                self.stdout.write(self.style.ERROR(f'  ❌ {message}'))
+            else:
+                done += 1
+                self.stdout.write(self.style.SUCCESS(f'  ✅ {status}'))
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Resumed {done}/{total} uploads'))
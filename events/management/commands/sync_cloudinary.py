@@ -1,16 +1,17 @@
 """
 Django management command to sync Cloudinary photos to database
-Usage: python manage.py sync_cloudinary
+Usage: python manage.py sync_cloudinary [--folder <prefix>] [--full] [--workers N]
+
+Only images uploaded since the last run are listed (see events.cloudinary_sync).
 """
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.utils import timezone
+from events import media
+from events.cloudinary_sync import sync_event
+from events.ingestion import process_photos_concurrently
 from events.models import Event, Photo
 import cloudinary
-import cloudinary.api
 from decouple import config
-import requests
-from io import BytesIO
-from PIL import Image
 
 class Command(BaseCommand):
     help = 'Sync photos from Cloudinary to database'
@@ -33,6 +34,20 @@ class Command(BaseCommand):
             action='store_true',
             help='Skip face detection (faster)'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=0,
+            help='Photos face-processed at once (default: FACE_PROCESSING_WORKERS). '
+                 'Downloads, cache lookups and database writes run in parallel; '
+                 'detection and embedding run one photo at a time, since the models '
+                 'are shared by the workers and are not thread-safe'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Ignore the checkpoint and list every image in the folder again'
+        )
 
     def handle(self, *args, **options):
         event_slug = options['event_slug']
@@ -58,108 +73,57 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"✗ Event with slug '{event_slug}' not found"))
             return
         
-        # Fetch photos from Cloudinary
-        self.stdout.write(f"\n📡 Fetching photos from Cloudinary...")
+        # Page through the images uploaded since the last sync and insert the new ones
+        self.stdout.write(f"\n📡 Listing photos in Cloudinary...")
+        
+        def on_page(page, photos):
+            self.stdout.write(self.style.SUCCESS(f"✓ Page {page}: created {len(photos)} photos"))
         
         try:
-            if cloudinary_folder.strip():
-                resources = cloudinary.api.resources(
-                    type='upload',
-                    prefix=cloudinary_folder,
-                    max_results=500
-                )
-            else:
-                resources = cloudinary.api.resources(
-                    type='upload',
-                    max_results=500
-                )
-            
-            photos = resources.get('resources', [])
-            total_photos = len(photos)
-            self.stdout.write(self.style.SUCCESS(f"✓ Found {total_photos} photos in Cloudinary\n"))
-            
+            stats = sync_event(
+                event,
+                folder=cloudinary_folder.strip(),
+                full=options['full'],
+                hash_originals=not skip_face_detection,
+                on_page=on_page
+            )
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f"✗ Error fetching from Cloudinary: {str(e)}"))
+            self.stdout.write(self.style.ERROR(f"✗ Error syncing from Cloudinary: {str(e)}"))
+            self.stdout.write("  Progress so far is saved; run the command again to resume")
             return
         
-        # Sync photos to database
-        synced = 0
-        skipped = 0
-        errors = 0
+        photos = [] if skip_face_detection else stats['photos']
+        total_photos = len(photos)
+        errors = stats['errors']
         
-        for idx, photo_data in enumerate(photos, 1):
-            public_id = photo_data['public_id']
-            cloudinary_url = photo_data['secure_url']
+        # New photos go through the shared face pipeline, several at a time
+        if photos:
+            workers = options['workers'] or settings.FACE_PROCESSING_WORKERS
+            self.stdout.write(f"\n🔍 Processing faces of {total_photos} new photos with {workers} workers...")
+        results = process_photos_concurrently(photos, workers=options['workers'])
+        for idx, (photo, faces_count, error) in enumerate(results, 1):
+            self.stdout.write(f"[{idx}/{total_photos}] {photo.public_id}")
+            if error is None and photo.processing_status == Photo.ProcessingStatus.FAILED:
+                error = photo.processing_error
             
-            self.stdout.write(f"[{idx}/{total_photos}] {public_id}")
-            self.stdout.write(f"  URL: {cloudinary_url}")
-            
-            # Check if photo already exists by checking if URL contains the public_id
-            if Photo.objects.filter(image__contains=public_id).exists():
-                self.stdout.write(self.style.WARNING(f"  ⏭️  Already exists, skipping"))
-                skipped += 1
-                continue
-            
-            try:
-                # Create photo object
-                photo = Photo.objects.create(
-                    event=event,
-                    image=cloudinary_url
-                )
-                self.stdout.write(self.style.SUCCESS(f"  ✅ Created database entry"))
-                synced += 1
-                
-                # Face detection (optional)
-                if not skip_face_detection:
-                    self.stdout.write(f"  🔍 Running face detection...")
-                    try:
-                        from deepface import DeepFace
-                        import numpy as np
-                        
-                        # Download image
-                        response = requests.get(cloudinary_url)
-                        img = Image.open(BytesIO(response.content))
-                        img_array = np.array(img)
-                        
-                        # Detect faces with multiple backends
-                        backends = ['retinaface', 'mtcnn', 'opencv', 'ssd']
-                        faces_detected = False
-                        
-                        for backend in backends:
-                            try:
-                                face_objs = DeepFace.extract_faces(
-                                    img_path=img_array,
-                                    detector_backend=backend,
-                                    enforce_detection=False
-                                )
-                                
-                                if face_objs and len(face_objs) > 0:
-                                    face_count = len(face_objs)
-                                    photo.face_count = face_count
-                                    photo.has_faces = True
-                                    photo.save()
-                                    self.stdout.write(self.style.SUCCESS(f"  👤 Detected {face_count} face(s) using {backend}"))
-                                    faces_detected = True
-                                    break
-                            except Exception:
-                                continue
-                        
-                        if not faces_detected:
-                            self.stdout.write(self.style.WARNING(f"  ⚠️  No faces detected"))
-                            
-                    except Exception as e:
-                        self.stdout.write(self.style.WARNING(f"  ⚠️  Face detection failed: {str(e)}"))
-                
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"  ❌ Error: {str(e)}"))
+            if error is not None:
+                self.stdout.write(self.style.ERROR(f"  ❌ Error: {error}"))
                 errors += 1
+            elif photo.processing_status == Photo.ProcessingStatus.SKIPPED:
+                self.stdout.write(self.style.SUCCESS(f"  ♻️  Reused {faces_count} face(s) from duplicate"))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"  👤 Detected {faces_count} face(s) in {photo.processing_duration:.1f}s"
+                ))
         
         # Summary
         self.stdout.write("\n" + "="*60)
         self.stdout.write(self.style.SUCCESS("✅ Sync Complete!"))
-        self.stdout.write(f"Total in Cloudinary: {total_photos}")
-        self.stdout.write(f"Synced to Database: {synced}")
-        self.stdout.write(f"Skipped (already exists): {skipped}")
+        self.stdout.write(f"Listed in Cloudinary: {stats['listed']} ({stats['pages']} pages)")
+        self.stdout.write(f"Synced to Database: {stats['created']}")
+        self.stdout.write(f"Skipped (already exists): {stats['existing']}")
+        self.stdout.write(f"Skipped (duplicates): {stats['duplicates']}")
+        self.stdout.write(f"Skipped (renditions): {stats['renditions']}")
         self.stdout.write(f"Errors: {errors}")
         self.stdout.write("="*60)
         self.stdout.write(f"\n🎉 Photos are now visible at:")
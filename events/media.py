@@ -0,0 +1,469 @@
+"""
+Shared image fetching for Hackotsava 2025
+
+Face processing, the ZIP download and the Cloudinary sync all read photo
+originals over HTTP. This module gives them one pooled keep-alive session
+with retries, a bounded thread pool for prefetching the next images while
+the current one is being processed, and a size-bounded LRU disk cache of
+originals keyed by URL so repeated fetches never hit the network.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Get the shared HTTP session used for all image downloads.
+
+    Connections are kept alive and pooled per host, and transient failures
+    (connection errors, 429 and 5xx responses) are retried with exponential
+    backoff.
+
+    Returns:
+        requests.Session
+    """
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=settings.MEDIA_FETCH_RETRIES,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=['GET', 'HEAD'],
+                    raise_on_status=False,
+                )
+                pool_size = max(10, settings.MEDIA_FETCH_WORKERS * 2)
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+class MediaCache:
+    """
+    LRU disk cache of downloaded originals.
+
+    Each URL is stored in its own file named by the SHA-256 of the URL.
+    A file's mtime is its last access time; once the cache grows past its
+    limit the least recently used files are removed.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+
+    def _path(self, url):
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, url):
+        """Return the cached bytes for a URL, or None on a miss"""
+        path = self._path(url)
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return content
+
+    def set(self, url, content):
+        """Store bytes for a URL and evict old entries if the cache is too big"""
+        if len(content) > self.max_bytes:
+            return
+
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see partial images
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+
+        with self._lock:
+            # Replacing an entry for the same URL only grows the cache by the difference
+            try:
+                old_size = os.stat(path).st_size
+            except OSError:
+                old_size = 0
+            os.replace(temp_path, path)
+
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(content) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Drop least-recently-used files until the cache is back under 90% of its limit"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+        self._size = total
+
+    def clear(self):
+        """Remove every cached file"""
+        with self._lock:
+            for path, _, _ in list(self._entries()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_media_cache():
+    """
+    Get the shared disk cache of originals configured in settings.
+
+    Returns:
+        MediaCache, or None when the cache is disabled
+    """
+    global _cache
+
+    if not getattr(settings, 'MEDIA_FETCH_CACHE_ENABLED', True):
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = MediaCache(settings.MEDIA_FETCH_CACHE_DIR, settings.MEDIA_FETCH_CACHE_MAX_BYTES)
+    return _cache
+
+
+CLOUDINARY_UPLOAD_MARKER = '/image/upload/'
+
+# Format extensions Cloudinary delivers images with; any other dot is part of the public_id
+IMAGE_FORMATS = {
+    '.jpg', '.jpeg', '.jpe', '.png', '.gif', '.webp', '.avif', '.heic', '.heif',
+    '.bmp', '.tif', '.tiff', '.ico', '.svg', '.jp2', '.jxl',
+}
+
+
+def rendition_url(url, max_dimension, quality='auto'):
+    """
+    Build the Cloudinary URL of a downscaled rendition of an image.
+
+    The rendition fits inside max_dimension x max_dimension (c_limit never
+    upscales and keeps the aspect ratio) and is re-encoded with automatic
+    quality in the original format, so OpenCV can always decode it.
+
+    Args:
+        url: Cloudinary delivery URL of the original
+        max_dimension: Longest side in pixels (0 or None for the original)
+        quality: Cloudinary quality setting
+
+    Returns:
+        str: the rendition URL, or the original URL for non-Cloudinary images
+    """
+    if not max_dimension:
+        return url
+    return transformed_url(url, f"c_limit,w_{int(max_dimension)},h_{int(max_dimension)},q_{quality}")
+
+
+def is_cloudinary_url(url):
+    """Whether Cloudinary can transform the image at url"""
+    return bool(url) and 'res.cloudinary.com' in url and CLOUDINARY_UPLOAD_MARKER in url
+
+
+def transformed_url(url, transformation):
+    """
+    Insert a Cloudinary transformation into a delivery URL.
+
+    Args:
+        url: Cloudinary delivery URL of the original
+        transformation: Transformation string, e.g. 'c_limit,w_640,f_auto,q_auto'
+
+    Returns:
+        str: the transformed URL, or the original URL for non-Cloudinary images
+    """
+    if not transformation or not is_cloudinary_url(url):
+        return url
+
+    head, tail = url.split(CLOUDINARY_UPLOAD_MARKER, 1)
+    return f"{head}{CLOUDINARY_UPLOAD_MARKER}{transformation}/{tail}"
+
+
+def public_id_from_url(url):
+    """
+    Get the Cloudinary public_id of the image at a delivery URL.
+
+    Everything after the version component (v<digits>) is the public_id
+    plus the format extension. Only a known image extension (IMAGE_FORMATS)
+    is stripped, so public_ids with dots such as IMG_1234.final are kept
+    whole; URLs without a version are taken to have no
+    transformation either, which holds for the URLs storage and the Admin
+    API return.
+
+    Returns:
+        str: the public_id, or None for non-Cloudinary URLs
+    """
+    if not is_cloudinary_url(url):
+        return None
+
+    tail = url.split(CLOUDINARY_UPLOAD_MARKER, 1)[1].split('?', 1)[0]
+    parts = tail.split('/')
+    for index, part in enumerate(parts):
+        if len(part) > 1 and part[0] == 'v' and part[1:].isdigit():
+            parts = parts[index + 1:]
+            break
+
+    public_id = '/'.join(parts)
+    stem, extension = os.path.splitext(public_id)
+    return stem if extension.lower() in IMAGE_FORMATS else public_id
+
+
+def responsive_url(url, width, quality='auto'):
+    """
+    Build the Cloudinary URL of an image scaled to a srcset width.
+
+    Unlike rendition_url, the format is left to Cloudinary (f_auto), so
+    browsers get WebP or AVIF when they accept them.
+
+    Args:
+        url: Cloudinary delivery URL of the original
+        width: Width in pixels (c_limit never upscales)
+        quality: Cloudinary quality setting
+
+    Returns:
+        str: the scaled URL, or the original URL for non-Cloudinary images
+    """
+    return transformed_url(url, f"c_limit,w_{int(width)},f_auto,q_{quality}")
+
+
+_executor = None
+_executor_lock = threading.Lock()
+# Prefetches still downloading, by URL (a fetch() of the URL takes over the future)
+_inflight = {}
+# Finished prefetches waiting for their fetch() when there is no disk cache
+# to hold them; only the most recent MEDIA_FETCH_WORKERS * 2 are kept
+_prefetched = OrderedDict()
+_inflight_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.MEDIA_FETCH_WORKERS,
+                    thread_name_prefix='media-fetch'
+                )
+    return _executor
+
+
+def _download(url, timeout=None):
+    """Download a URL through the pooled session and store it in the disk cache"""
+    response = get_session().get(url, timeout=timeout or settings.MEDIA_FETCH_TIMEOUT)
+    response.raise_for_status()
+    content = response.content
+
+    cache = get_media_cache()
+    if cache is not None:
+        try:
+            cache.set(url, content)
+        except OSError as e:
+            print(f"⚠️ Could not cache {url}: {e}")
+    return content
+
+
+def fetch(url, timeout=None, use_cache=True):
+    """
+    Get the bytes of an image URL.
+
+    Served from the disk cache when possible, otherwise from a pending
+    prefetch of the same URL, otherwise downloaded now.
+
+    Args:
+        url: Image URL (usually a Cloudinary secure URL)
+        timeout: Request timeout in seconds (defaults to MEDIA_FETCH_TIMEOUT)
+        use_cache: Set to False to bypass the disk cache for reads
+
+    Returns:
+        bytes: the response body
+
+    Raises:
+        requests.RequestException: if the download fails after retries
+    """
+    cache = get_media_cache() if use_cache else None
+    if cache is not None:
+        content = cache.get(url)
+        if content is not None:
+            return content
+
+    with _inflight_lock:
+        future = _inflight.pop(url, None)
+        content = _prefetched.pop(url, None)
+    if content is not None:
+        return content
+    if future is not None:
+        return future.result()
+
+    return _download(url, timeout)
+
+
+def fetch_rendition(url, max_dimension, timeout=None):
+    """
+    Get the bytes of a downscaled Cloudinary rendition of an image.
+
+    Falls back to the original when the rendition can't be fetched (e.g.
+    strict transformations are enabled on the account).
+
+    Args:
+        url: Cloudinary delivery URL of the original
+        max_dimension: Longest side in pixels (0 or None for the original)
+        timeout: Request timeout in seconds
+
+    Returns:
+        bytes: the rendition (or original) body
+    """
+    rendition = rendition_url(url, max_dimension)
+    if rendition != url:
+        try:
+            return fetch(rendition, timeout)
+        except requests.RequestException as e:
+            print(f"⚠️ Rendition unavailable, using original: {e}")
+    return fetch(url, timeout)
+
+
+def prefetch(urls):
+    """
+    Start downloading URLs in the background thread pool.
+
+    A later fetch() of the same URL waits for the background download instead
+    of starting a new one, so callers can prefetch the next few images while
+    they process the current one. URLs already cached or in flight are skipped.
+
+    Args:
+        urls: Iterable of image URLs
+    """
+    cache = get_media_cache()
+    executor = _get_executor()
+
+    for url in urls:
+        if not url:
+            continue
+        with _inflight_lock:
+            if url in _inflight or url in _prefetched:
+                continue
+        if cache is not None and os.path.exists(cache._path(url)):
+            continue
+
+        future = executor.submit(_download, url)
+        with _inflight_lock:
+            _inflight[url] = future
+        future.add_done_callback(lambda f, url=url: _prefetch_done(url, f))
+
+
+def _prefetch_done(url, future):
+    """
+    Drop a finished prefetch from the in-flight table.
+
+    Nothing is kept if a fetch() already took the future over, the download
+    failed (fetch() will retry and raise) or the disk cache holds the bytes.
+    Otherwise the bytes wait in _prefetched for their fetch(), which is
+    bounded so prefetches that are never collected can't pile up.
+    """
+    with _inflight_lock:
+        if _inflight.get(url) is not future:
+            return
+        del _inflight[url]
+        if future.exception() is not None or get_media_cache() is not None:
+            return
+        _prefetched[url] = future.result()
+        while len(_prefetched) > settings.MEDIA_FETCH_WORKERS * 2:
+            _prefetched.popitem(last=False)
+
+
+def fetch_many(urls, window=None):
+    """
+    Fetch several URLs concurrently, yielding results in input order.
+
+    At most `window` downloads are in flight at once, so memory stays bounded
+    while network wait overlaps with the caller's work on earlier results.
+
+    Args:
+        urls: List of image URLs
+        window: Maximum downloads ahead of the consumer (defaults to MEDIA_FETCH_WORKERS)
+
+    Yields:
+        tuple: (url, content, error) - content is None when error is set
+    """
+    urls = list(urls)
+    window = window or settings.MEDIA_FETCH_WORKERS
+    executor = _get_executor()
+
+    def submit(url):
+        # Reuse a pending prefetch rather than blocking a pool thread on it
+        with _inflight_lock:
+            future = _inflight.pop(url, None)
+        return future or executor.submit(fetch, url)
+
+    futures = {}
+    for index in range(min(window, len(urls))):
+        futures[index] = submit(urls[index])
+
+    for index, url in enumerate(urls):
+        next_index = index + window
+        if next_index < len(urls):
+            futures[next_index] = submit(urls[next_index])
+
+        try:
+            yield url, futures.pop(index).result(), None
+        except Exception as e:
+            yield url, None, e
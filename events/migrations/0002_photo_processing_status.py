@@ -0,0 +1,79 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:37
+
+from django.db import migrations, models
+
+
+def backfill_processing_status(apps, schema_editor):
+    """Photos already marked as processed are treated as done; the rest stay pending."""
+    Photo = apps.get_model('events', 'Photo')
+    Photo.objects.filter(faces_processed=True).update(processing_status='done')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='face_detector',
+            field=models.CharField(blank=True, help_text='Detector backend that found the faces', max_length=30),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='model_version',
+            field=models.CharField(blank=True, help_text='Embedding model version used for the stored face encodings', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, help_text='When face processing last finished', null=True),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='processing_attempts',
+            field=models.PositiveIntegerField(default=0, help_text='Number of times face processing has been attempted'),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='processing_duration',
+            field=models.FloatField(blank=True, help_text='Seconds spent on the last processing attempt', null=True),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='processing_error',
+            field=models.TextField(blank=True, help_text='Error message from the last failed processing attempt'),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed'), ('skipped', 'Skipped')], default='pending', help_text='State of the face processing pipeline for this photo', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['processing_status'], name='events_phot_process_a3d82f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['processing_attempts'], name='events_phot_process_572de0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['processing_duration'], name='events_phot_process_2052a6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['face_detector'], name='events_phot_face_de_5a3c6c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['model_version'], name='events_phot_model_v_a76a9a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['processed_at'], name='events_phot_process_3310ad_idx'),
+        ),
+        migrations.RunPython(backfill_processing_status, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_photo_processing_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the original image bytes', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='perceptual_hash',
+            field=models.CharField(blank=True, help_text='64-bit difference hash (hex) for spotting near-duplicates', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['content_hash'], name='events_phot_content_df7a95_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['event', 'content_hash'], name='events_phot_event_i_207181_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['perceptual_hash'], name='events_phot_percept_89b85f_idx'),
+        ),
+    ]
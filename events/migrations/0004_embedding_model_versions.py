@@ -0,0 +1,91 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:41
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+# Versions of the models that produced existing rows. 128-d vectors came from
+# face_recognition (dlib); 512-d vectors are attributed to ArcFace, the model
+# used by face_utils.py (older Facenet512 rows have the same size and can't be
+# told apart - reprocess them with reprocess_faces if needed).
+MODEL_VERSIONS_BY_DIMENSION = {
+    128: 'dlib-128',
+    512: 'arcface-512',
+}
+
+
+def backfill_model_versions(apps, schema_editor):
+    FaceEncoding = apps.get_model('events', 'FaceEncoding')
+    EmbeddingIndex = apps.get_model('events', 'EmbeddingIndex')
+    
+    batch = []
+    for face in FaceEncoding.objects.only('id', 'encoding').iterator(chunk_size=2000):
+        dimensions = len(face.encoding.split(',')) if face.encoding else 0
+        face.model_version = MODEL_VERSIONS_BY_DIMENSION.get(dimensions, f'unknown-{dimensions}')
+        batch.append(face)
+        if len(batch) >= 2000:
+            FaceEncoding.objects.bulk_update(batch, ['model_version'])
+            batch = []
+    if batch:
+        FaceEncoding.objects.bulk_update(batch, ['model_version'])
+    
+    # Processed photos take their encodings' version, so they count as current
+    # for duplicate reuse and reprocess_faces --outdated; photos without faces
+    # were processed by the current (ArcFace) pipeline
+    Photo = apps.get_model('events', 'Photo')
+    Photo.objects.filter(processing_status__in=['done', 'skipped'], model_version='').update(
+        model_version=Coalesce(
+            Subquery(FaceEncoding.objects.filter(photo=OuterRef('pk')).values('model_version')[:1]),
+            Value(MODEL_VERSIONS_BY_DIMENSION[512]),
+        )
+    )
+    
+    EmbeddingIndex.objects.get_or_create(
+        model_version='arcface-512',
+        defaults={'state': 'active', 'activated_at': timezone.now()}
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_photo_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_version', models.CharField(help_text='Embedding model version stored in FaceEncoding.model_version', max_length=50, unique=True)),
+                ('state', models.CharField(choices=[('building', 'Building'), ('active', 'Active'), ('retired', 'Retired')], default='building', help_text='Whether this index is being built, serving searches, or retired', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('activated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Embedding Index',
+                'verbose_name_plural': 'Embedding Indexes',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='faceencoding',
+            name='model_version',
+            field=models.CharField(blank=True, help_text='Embedding model version that produced this encoding (e.g. arcface-512)', max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='faceencoding',
+            index=models.Index(fields=['model_version'], name='events_face_model_v_cbeed3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faceencoding',
+            index=models.Index(fields=['model_version', 'photo'], name='events_face_model_v_736896_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='embeddingindex',
+            index=models.Index(fields=['state'], name='events_embe_state_f1629b_idx'),
+        ),
+        migrations.RunPython(backfill_model_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('events', '0004_embedding_model_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadBatch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, help_text='When the last file of the batch finished', null=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_batches', to=settings.AUTH_USER_MODEL)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_batches', to='events.event')),
+            ],
+            options={
+                'verbose_name': 'Upload Batch',
+                'verbose_name_plural': 'Upload Batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UploadItem',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('position', models.PositiveIntegerField(default=0, help_text='Order of the file within its batch')),
+                ('filename', models.CharField(max_length=255)),
+                ('staged_path', models.CharField(blank=True, help_text='Local copy of the file until it has been ingested', max_length=500)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('content_hash', models.CharField(blank=True, help_text='SHA-256 of the uploaded bytes', max_length=64)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('uploading', 'Uploading'), ('processing', 'Processing'), ('done', 'Done'), ('skipped', 'Skipped'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('message', models.CharField(blank=True, max_length=500)),
+                ('face_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='events.uploadbatch')),
+                ('photo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_items', to='events.photo')),
+            ],
+            options={
+                'verbose_name': 'Upload Item',
+                'verbose_name_plural': 'Upload Items',
+                'ordering': ['batch', 'position'],
+                'indexes': [models.Index(fields=['batch', 'status'], name='events_uplo_batch_i_93ffee_idx'), models.Index(fields=['status'], name='events_uplo_status_3236a1_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='uploadbatch',
+            index=models.Index(fields=['finished_at'], name='events_uplo_finishe_fe1e72_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_upload_batches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploaditem',
+            name='upload_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='uploaditem',
+            name='upload_seconds',
+            field=models.FloatField(blank=True, help_text='Time taken by the upload to Cloudinary, including retries', null=True),
+        ),
+    ]
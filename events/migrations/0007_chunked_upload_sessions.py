@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_upload_timing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadbatch',
+            name='is_open',
+            field=models.BooleanField(default=False, help_text='Chunked upload session that can still receive files'),
+        ),
+        migrations.AddField(
+            model_name='uploaditem',
+            name='received_bytes',
+            field=models.PositiveBigIntegerField(default=0, help_text='Bytes of the file received so far in a chunked upload'),
+        ),
+        migrations.AddField(
+            model_name='uploaditem',
+            name='upload_key',
+            field=models.CharField(blank=True, help_text='Client idempotency key of the file in a chunked upload session', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='uploaditem',
+            name='status',
+            field=models.CharField(choices=[('receiving', 'Receiving'), ('queued', 'Queued'), ('uploading', 'Uploading'), ('processing', 'Processing'), ('done', 'Done'), ('skipped', 'Skipped'), ('failed', 'Failed')], default='queued', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='uploaditem',
+            index=models.Index(fields=['batch', 'upload_key'], name='events_uplo_batch_i_c49bb3_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_chunked_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='medium',
+            field=models.ImageField(blank=True, help_text='Mid-size rendition for the photo viewer', null=True, upload_to='event_photos/medium/%Y/%m/%d/'),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='thumbnail_webp',
+            field=models.ImageField(blank=True, help_text='WebP version of the thumbnail', null=True, upload_to='event_photos/thumbnails/%Y/%m/%d/'),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:14
+
+import os
+
+from django.db import migrations, models
+
+
+# Copied from events.media so this migration keeps working when that module changes
+CLOUDINARY_UPLOAD_MARKER = '/image/upload/'
+IMAGE_FORMATS = {
+    '.jpg', '.jpeg', '.jpe', '.png', '.gif', '.webp', '.avif', '.heic', '.heif',
+    '.bmp', '.tif', '.tiff', '.ico', '.svg', '.jp2', '.jxl',
+}
+
+
+def public_id_from_url(url):
+    """The public_id in a Cloudinary delivery URL, or None for other URLs"""
+    if not url or 'res.cloudinary.com' not in url or CLOUDINARY_UPLOAD_MARKER not in url:
+        return None
+
+    tail = url.split(CLOUDINARY_UPLOAD_MARKER, 1)[1].split('?', 1)[0]
+    parts = tail.split('/')
+    for index, part in enumerate(parts):
+        if len(part) > 1 and part[0] == 'v' and part[1:].isdigit():
+            parts = parts[index + 1:]
+            break
+
+    public_id = '/'.join(parts)
+    stem, extension = os.path.splitext(public_id)
+    return stem if extension.lower() in IMAGE_FORMATS else public_id
+
+
+def backfill_cloudinary_identity(apps, schema_editor):
+    """
+    Fill in public_id and secure_url from the stored image. No API calls:
+    storage-backed names are turned into URLs locally. When several rows
+    point at the same resource only the oldest gets the public_id.
+    """
+    Photo = apps.get_model('events', 'Photo')
+    
+    seen = set()
+    batch = []
+    photos = Photo.objects.exclude(image='').only('id', 'image').order_by('uploaded_at')
+    for photo in photos.iterator(chunk_size=2000):
+        name = str(photo.image)
+        if name.startswith('https://res.cloudinary.com/'):
+            url = name
+        else:
+            try:
+                url = photo.image.url
+            except Exception:
+                continue
+        
+        public_id = public_id_from_url(url)
+        photo.secure_url = url
+        photo.public_id = public_id if public_id and public_id not in seen else None
+        seen.add(public_id)
+        batch.append(photo)
+        if len(batch) >= 2000:
+            Photo.objects.bulk_update(batch, ['public_id', 'secure_url'])
+            batch = []
+    if batch:
+        Photo.objects.bulk_update(batch, ['public_id', 'secure_url'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_photo_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='bytes',
+            field=models.PositiveIntegerField(blank=True, help_text='Size of the original file in bytes', null=True),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, help_text='Height of the original in pixels', null=True),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='public_id',
+            field=models.CharField(blank=True, help_text='Cloudinary public_id of the original', max_length=255, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='secure_url',
+            field=models.URLField(blank=True, help_text='Delivery URL of the original', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, help_text='Width of the original in pixels', null=True),
+        ),
+        migrations.RunPython(backfill_cloudinary_identity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_photo_cloudinary_identity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('folder', models.CharField(blank=True, help_text="Cloudinary folder prefix ('' for the whole account)", max_length=255)),
+                ('last_created_at', models.DateTimeField(blank=True, help_text='created_at of the newest Cloudinary image listed so far', null=True)),
+                ('cursor', models.CharField(blank=True, help_text='next_cursor of an unfinished run, to resume from', max_length=255)),
+                ('cursor_start_at', models.DateTimeField(blank=True, help_text='start_at of the listing the cursor belongs to', null=True)),
+                ('synced_count', models.PositiveIntegerField(default=0, help_text='Photos created by this sync in total')),
+                ('last_synced_at', models.DateTimeField(blank=True, help_text='When a run last reached the end of the listing', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_checkpoints', to='events.event')),
+            ],
+            options={
+                'verbose_name': 'Sync Checkpoint',
+                'verbose_name_plural': 'Sync Checkpoints',
+                'ordering': ['event', 'folder'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='synccheckpoint',
+            constraint=models.UniqueConstraint(fields=('event', 'folder'), name='unique_sync_checkpoint'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('events', '0010_sync_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, help_text='When deletion was requested; the event is hidden until the background deletion removes it', null=True),
+        ),
+        migrations.CreateModel(
+            name='EventDeletion',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('event_name', models.CharField(max_length=200)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('total_photos', models.PositiveIntegerField(default=0)),
+                ('deleted_photos', models.PositiveIntegerField(default=0)),
+                ('failed_photos', models.PositiveIntegerField(default=0, help_text='Photos kept because Cloudinary did not delete their files')),
+                ('deleted_folders', models.TextField(blank=True, help_text='Cloudinary folders removed by prefix (one per line)')),
+                ('message', models.CharField(blank=True, max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('event', models.ForeignKey(blank=True, help_text='Event being deleted (cleared once it is gone)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deletions', to='events.event')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='event_deletions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Event Deletion',
+                'verbose_name_plural': 'Event Deletions',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status'], name='events_even_status_e3c71b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_event_deletion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['-uploaded_at', '-id'], name='events_phot_uploade_58ffe9_idx'),
+        ),
+    ]
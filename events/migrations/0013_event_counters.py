@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:32
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def backfill_event_counters(apps, schema_editor):
+    """Count each event's photos, faces and processed photos once"""
+    Event = apps.get_model('events', 'Event')
+    Photo = apps.get_model('events', 'Photo')
+    
+    totals = Photo.objects.order_by().values('event_id').annotate(
+        photos=Count('id'),
+        faces=Sum('face_count'),
+        processed=Count('id', filter=Q(faces_processed=True)),
+        newest=Max('uploaded_at'),
+    )
+    for row in totals:
+        Event.objects.filter(pk=row['event_id']).update(
+            photo_count=row['photos'],
+            face_count=row['faces'] or 0,
+            processed_count=row['processed'],
+            last_photo_at=row['newest']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_photo_browse_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='face_count',
+            field=models.IntegerField(default=0, help_text="Faces detected across the event's photos"),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='last_photo_at',
+            field=models.DateTimeField(blank=True, help_text='When the newest photo was added', null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='photo_count',
+            field=models.IntegerField(default=0, help_text='Photos in this event'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='processed_count',
+            field=models.IntegerField(default=0, help_text='Photos whose faces have been processed'),
+        ),
+        migrations.RunPython(backfill_event_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_event_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Bumped on every change to the event or its photos; part of page cache keys'),
+        ),
+    ]
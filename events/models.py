@@ -1,12 +1,22 @@
 """
 Models for Events App - Event, Photo, FaceEncoding
 """
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Now
 from django.conf import settings
 from django.utils.text import slugify
+from django_cleanup import cleanup
 import uuid
 
 
+class EventManager(models.Manager):
+    """Events that are not being deleted (the default manager)"""
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Event(models.Model):
     """
     Event model to store event information
@@ -65,6 +75,26 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When deletion was requested; the event is hidden until the background deletion removes it"
+    )
+    
+    # Kept up to date by Photo saves and deletes (recount_events repairs drift)
+    photo_count = models.IntegerField(default=0, help_text="Photos in this event")
+    face_count = models.IntegerField(default=0, help_text="Faces detected across the event's photos")
+    processed_count = models.IntegerField(default=0, help_text="Photos whose faces have been processed")
+    last_photo_at = models.DateTimeField(null=True, blank=True, help_text="When the newest photo was added")
+    
+    version = models.PositiveIntegerField(
+        default=1,
+        help_text="Bumped on every change to the event or its photos; part of page cache keys"
+    )
+    
+    objects = EventManager()
+    all_objects = models.Manager()
+    
     class Meta:
         ordering = ['-event_date', '-created_at']
         verbose_name = 'Event'
@@ -77,30 +107,179 @@ class Event(models.Model):
     def __str__(self):
         return self.name
     
+    # Maintained with F() updates, so saves of a loaded event must not write them back
+    COUNTER_FIELDS = ('photo_count', 'face_count', 'processed_count', 'last_photo_at', 'version')
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
             # Ensure unique slug
             original_slug = self.slug
             counter = 1
-            while Event.objects.filter(slug=self.slug).exists():
+            while Event.all_objects.filter(slug=self.slug).exists():
                 self.slug = f"{original_slug}-{counter}"
                 counter += 1
-        super().save(*args, **kwargs)
+        
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        kwargs['update_fields'] = set(update_fields) | {'updated_at'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Event.all_objects.filter(pk=self.pk).update(version=F('version') + 1)
+        self.version += 1
     
     def get_photo_count(self):
         """Get total number of photos in this event"""
-        return self.photos.count()
+        return self.photo_count
+    get_photo_count.short_description = 'Photos'
+    get_photo_count.admin_order_field = 'photo_count'
     
     def get_face_count(self):
         """Get total number of detected faces in this event"""
-        return FaceEncoding.objects.filter(photo__event=self).count()
+        return self.face_count
+    
+    @classmethod
+    def adjust_counters(cls, event_id, photos=0, faces=0, processed=0, last_photo_at=None, refresh_last_photo=False):
+        """
+        Apply changes to an event's counters in one UPDATE (which also bumps
+        its version, invalidating its cached pages).
+        
+        F() expressions make concurrent adjustments add up instead of
+        overwriting each other.
+        
+        Args:
+            event_id: Event to update
+            photos, faces, processed: Deltas of photo_count, face_count and processed_count
+            last_photo_at: Upload time of a new photo (kept if newer than the current value)
+            refresh_last_photo: Recompute last_photo_at from the remaining photos
+                (after deletions)
+        """
+        updates = {}
+        if photos:
+            updates['photo_count'] = F('photo_count') + photos
+        if faces:
+            updates['face_count'] = F('face_count') + faces
+        if processed:
+            updates['processed_count'] = F('processed_count') + processed
+        if refresh_last_photo:
+            updates['last_photo_at'] = Subquery(
+                Photo.objects.filter(event=OuterRef('pk')).order_by('-uploaded_at').values('uploaded_at')[:1]
+            )
+        elif last_photo_at is not None:
+            updates['last_photo_at'] = Greatest(Coalesce(F('last_photo_at'), Value(last_photo_at)), Value(last_photo_at))
+        if updates:
+            cls.all_objects.filter(pk=event_id).update(version=F('version') + 1, updated_at=Now(), **updates)
+    
+    @classmethod
+    def recount(cls, queryset=None):
+        """
+        Recompute the counters of events from their photos.
+        
+        Returns:
+            int: Number of events whose counters were wrong (and are now fixed)
+        """
+        photos = Photo.objects.filter(event=OuterRef('pk')).order_by().values('event')
+        queryset = (queryset if queryset is not None else cls.all_objects.all()).annotate(
+            actual_photos=Coalesce(Subquery(photos.annotate(n=Count('id')).values('n')), 0),
+            actual_faces=Coalesce(Subquery(photos.annotate(n=Sum('face_count')).values('n')), 0),
+            actual_processed=Coalesce(Subquery(photos.filter(faces_processed=True).annotate(n=Count('id')).values('n')), 0),
+            actual_last_photo=Subquery(photos.annotate(n=models.Max('uploaded_at')).values('n')),
+        )
+        
+        fixed = 0
+        for event in queryset:
+            actual = (event.actual_photos, event.actual_faces, event.actual_processed, event.actual_last_photo)
+            if actual != (event.photo_count, event.face_count, event.processed_count, event.last_photo_at):
+                cls.all_objects.filter(pk=event.pk).update(
+                    photo_count=actual[0],
+                    face_count=actual[1],
+                    processed_count=actual[2],
+                    last_photo_at=actual[3],
+                    version=F('version') + 1,
+                    updated_at=Now()
+                )
+                fixed += 1
+        return fixed
+
+
+class PhotoQuerySet(models.QuerySet):
+    """
+    Photo queries that keep the Event counters in step with bulk inserts and deletes
+    """
+    
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            if ignore_conflicts:
+                # Skipped rows come back too, so count only primary keys that are new afterwards
+                pks = [photo.pk for photo in objs]
+                before = set(self.model._base_manager.using(self.db).filter(pk__in=pks).values_list('pk', flat=True))
+            created = super().bulk_create(objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts, **kwargs)
+            if ignore_conflicts:
+                after = set(self.model._base_manager.using(self.db).filter(pk__in=pks).values_list('pk', flat=True))
+                inserted = after - before
+                created_rows = [photo for photo in created if photo.pk in inserted]
+            else:
+                created_rows = created
+            totals = {}
+            for photo in created_rows:
+                count, faces, processed, newest = totals.get(photo.event_id, (0, 0, 0, None))
+                totals[photo.event_id] = (
+                    count + 1,
+                    faces + photo.face_count,
+                    processed + int(photo.faces_processed),
+                    max(newest, photo.uploaded_at) if newest else photo.uploaded_at
+                )
+                photo._counted = (photo.face_count, photo.faces_processed)
+            for event_id, (count, faces, processed, newest) in totals.items():
+                Event.adjust_counters(event_id, photos=count, faces=faces, processed=processed, last_photo_at=newest)
+        return created
+    
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            totals = list(
+                self.order_by().values('event_id').annotate(
+                    photos=Count('id'),
+                    faces=Sum('face_count'),
+                    processed=Count('id', filter=Q(faces_processed=True))
+                )
+            )
+            result = super().delete()
+            for row in totals:
+                Event.adjust_counters(
+                    row['event_id'],
+                    photos=-row['photos'],
+                    faces=-(row['faces'] or 0),
+                    processed=-row['processed'],
+                    refresh_last_photo=True
+                )
+        return result
+    
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
+@cleanup.ignore  # Files are removed in bulk by deletion.delete_photos
 class Photo(models.Model):
     """
     Photo model to store event photos
     """
+    
+    class ProcessingStatus(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        PROCESSING = 'processing', 'Processing'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+        SKIPPED = 'skipped', 'Skipped'
+    
     id = models.UUIDField(
         primary_key=True,
         default=uuid.uuid4,
@@ -126,6 +305,52 @@ class Photo(models.Model):
         help_text="Thumbnail version of the photo"
     )
     
+    thumbnail_webp = models.ImageField(
+        upload_to='event_photos/thumbnails/%Y/%m/%d/',
+        blank=True,
+        null=True,
+        help_text="WebP version of the thumbnail"
+    )
+    
+    medium = models.ImageField(
+        upload_to='event_photos/medium/%Y/%m/%d/',
+        blank=True,
+        null=True,
+        help_text="Mid-size rendition for the photo viewer"
+    )
+    
+    public_id = models.CharField(
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="Cloudinary public_id of the original"
+    )
+    
+    secure_url = models.URLField(
+        max_length=500,
+        blank=True,
+        help_text="Delivery URL of the original"
+    )
+    
+    width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Width of the original in pixels"
+    )
+    
+    height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Height of the original in pixels"
+    )
+    
+    bytes = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Size of the original file in bytes"
+    )
+    
     caption = models.CharField(
         max_length=500,
         blank=True,
@@ -149,39 +374,248 @@ class Photo(models.Model):
         help_text="Number of faces detected in this photo"
     )
     
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 of the original image bytes"
+    )
+    
+    perceptual_hash = models.CharField(
+        max_length=16,
+        blank=True,
+        help_text="64-bit difference hash (hex) for spotting near-duplicates"
+    )
+    
+    processing_status = models.CharField(
+        max_length=20,
+        choices=ProcessingStatus.choices,
+        default=ProcessingStatus.PENDING,
+        help_text="State of the face processing pipeline for this photo"
+    )
+    
+    processing_error = models.TextField(
+        blank=True,
+        help_text="Error message from the last failed processing attempt"
+    )
+    
+    processing_attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of times face processing has been attempted"
+    )
+    
+    processing_duration = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Seconds spent on the last processing attempt"
+    )
+    
+    face_detector = models.CharField(
+        max_length=30,
+        blank=True,
+        help_text="Detector backend that found the faces"
+    )
+    
+    model_version = models.CharField(
+        max_length=50,
+        blank=True,
+        help_text="Embedding model version used for the stored face encodings"
+    )
+    
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When face processing last finished"
+    )
+    
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
+    objects = PhotoQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-uploaded_at']
         verbose_name = 'Photo'
         verbose_name_plural = 'Photos'
         indexes = [
             models.Index(fields=['event', '-uploaded_at']),
+            models.Index(fields=['-uploaded_at', '-id']),
             models.Index(fields=['faces_processed']),
+            models.Index(fields=['processing_status']),
+            models.Index(fields=['processing_attempts']),
+            models.Index(fields=['processing_duration']),
+            models.Index(fields=['face_detector']),
+            models.Index(fields=['model_version']),
+            models.Index(fields=['processed_at']),
+            models.Index(fields=['content_hash']),
+            models.Index(fields=['event', 'content_hash']),
+            models.Index(fields=['perceptual_hash']),
         ]
     
     def __str__(self):
         return f"Photo in {self.event.name} - {self.uploaded_at.strftime('%Y-%m-%d')}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored secure_url belongs to the loaded image, so get_image_url
+        # can return it without asking the storage
+        loaded = instance.__dict__
+        if loaded.get('secure_url') and 'image' in loaded and instance.image:
+            instance._image_url_cache = (str(instance.image), instance.secure_url)
+        # What the event counters include for this photo (see save)
+        if 'face_count' in loaded and 'faces_processed' in loaded:
+            instance._counted = (instance.face_count, instance.faces_processed)
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """
+        Keep public_id and secure_url in step with the image whenever the
+        image is saved.
+        """
+        update_fields = kwargs.get('update_fields')
+        if self.image and (update_fields is None or 'image' in update_fields):
+            changed = self.set_cloudinary_identity()
+            if update_fields is not None and changed:
+                kwargs['update_fields'] = set(update_fields) | {'public_id', 'secure_url'}
+        
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._update_event_counters(adding, update_fields)
+    
+    def _update_event_counters(self, adding, update_fields=None):
+        """Apply this save's change in photos, faces and processed photos to the event"""
+        if adding:
+            Event.adjust_counters(
+                self.event_id,
+                photos=1,
+                faces=self.face_count,
+                processed=int(self.faces_processed),
+                last_photo_at=self.uploaded_at
+            )
+        elif update_fields is None or {'face_count', 'faces_processed'} & set(update_fields):
+            counted = getattr(self, '_counted', None)
+            if counted is None:
+                return  # Not loaded with its counted values; recount_events repairs it
+            faces_before, processed_before = counted
+            Event.adjust_counters(
+                self.event_id,
+                faces=self.face_count - faces_before,
+                processed=int(self.faces_processed) - int(processed_before)
+            )
+        self._counted = (self.face_count, self.faces_processed)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Event.adjust_counters(
+                self.event_id,
+                photos=-1,
+                faces=-self.face_count,
+                processed=-int(self.faces_processed),
+                refresh_last_photo=True
+            )
+        return result
+    
+    @classmethod
+    def from_cloudinary_resource(cls, resource, **fields):
+        """
+        Build an unsaved Photo for an image already in Cloudinary.
+        
+        Args:
+            resource: Resource dict from the Cloudinary Admin API
+            **fields: Other Photo fields (event, uploaded_by, ...)
+        """
+        photo = cls(
+            image=resource['secure_url'],
+            public_id=resource['public_id'],
+            secure_url=resource['secure_url'],
+            width=resource.get('width'),
+            height=resource.get('height'),
+            bytes=resource.get('bytes'),
+            **fields
+        )
+        photo._image_url_cache = (resource['secure_url'], resource['secure_url'])
+        return photo
+    
+    @classmethod
+    def existing_public_ids(cls, public_ids):
+        """
+        Get which of the given Cloudinary public_ids already have a Photo.
+        
+        Returns:
+            set: the public_ids that are already in the database
+        """
+        return set(cls.objects.filter(public_id__in=list(public_ids)).values_list('public_id', flat=True))
+    
+    def set_cloudinary_identity(self, public_id=None, secure_url=None):
+        """
+        Fill in public_id and secure_url for the current image.
+        
+        Args:
+            public_id: Cloudinary public_id when known (e.g. from the Admin API);
+                derived from the URL otherwise
+            secure_url: Delivery URL when known; built from the image otherwise
+        
+        Returns:
+            bool: Whether either field changed
+        """
+        from . import media
+        
+        url = secure_url or self.get_image_url()
+        if url == self.secure_url and (public_id is None or public_id == self.public_id):
+            return False
+        
+        self.secure_url = url
+        self.public_id = public_id or media.public_id_from_url(url) or None
+        self._image_url_cache = (str(self.image), url)
+        return True
+    
     def get_image_url(self):
         """
         Get the correct image URL - handles both ImageField and direct Cloudinary URLs
+        
+        The URL is memoized on the instance (until the image changes), since
+        a page asks for it once per srcset width and rendition fallback.
         """
         if not self.image:
             return ''
         
         image_str = str(self.image)
+        cached = getattr(self, '_image_url_cache', None)
+        if cached is not None and cached[0] == image_str:
+            return cached[1]
         
         # If it's already a full Cloudinary URL, return it directly
         if image_str.startswith('https://res.cloudinary.com/'):
-            return image_str
+            url = image_str
+        else:
+            # Otherwise, use the standard .url property
+            try:
+                url = self.image.url
+            except Exception:
+                # Fallback to string representation
+                url = image_str
+        
+        self._image_url_cache = (image_str, url)
+        return url
+    
+    def get_rendition_url(self, rendition):
+        """
+        Get the URL of a resized copy of the photo ('thumbnail',
+        'thumbnail_webp' or 'medium').
+        
+        Photos whose renditions have not been generated yet get a resized
+        Cloudinary URL of the original instead.
+        """
+        from .renditions import rendition_fallback_url
         
-        # Otherwise, use the standard .url property
-        try:
-            return self.image.url
-        except Exception:
-            # Fallback to string representation
-            return image_str
+        field = getattr(self, rendition)
+        if field:
+            try:
+                return field.url
+            except Exception:
+                pass
+        return rendition_fallback_url(self.get_image_url(), rendition)
 
 
 class FaceEncoding(models.Model):
@@ -206,6 +640,12 @@ class FaceEncoding(models.Model):
         help_text="Face encoding data (128-dimension vector stored as text)"
     )
     
+    model_version = models.CharField(
+        max_length=50,
+        blank=True,
+        help_text="Embedding model version that produced this encoding (e.g. arcface-512)"
+    )
+    
     # Bounding box coordinates for the face in the photo
     top = models.IntegerField(help_text="Top coordinate of face bounding box")
     right = models.IntegerField(help_text="Right coordinate of face bounding box")
@@ -220,6 +660,8 @@ class FaceEncoding(models.Model):
         verbose_name_plural = 'Face Encodings'
         indexes = [
             models.Index(fields=['photo']),
+            models.Index(fields=['model_version']),
+            models.Index(fields=['model_version', 'photo']),
         ]
     
     def __str__(self):
@@ -235,6 +677,330 @@ class FaceEncoding(models.Model):
         return (self.top, self.right, self.bottom, self.left)
 
 
+class EmbeddingIndex(models.Model):
+    """
+    One search index per embedding model version.
+    
+    Exactly one index is active and serves face searches. A new model version
+    is built as a shadow index next to it and then cut over atomically.
+    """
+    
+    class State(models.TextChoices):
+        BUILDING = 'building', 'Building'
+        ACTIVE = 'active', 'Active'
+        RETIRED = 'retired', 'Retired'
+    
+    model_version = models.CharField(
+        max_length=50,
+        unique=True,
+        help_text="Embedding model version stored in FaceEncoding.model_version"
+    )
+    
+    state = models.CharField(
+        max_length=20,
+        choices=State.choices,
+        default=State.BUILDING,
+        help_text="Whether this index is being built, serving searches, or retired"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    activated_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Embedding Index'
+        verbose_name_plural = 'Embedding Indexes'
+        indexes = [
+            models.Index(fields=['state']),
+        ]
+    
+    def __str__(self):
+        return f"{self.model_version} ({self.get_state_display()})"
+
+
+class UploadBatch(models.Model):
+    """
+    One bulk upload whose files are ingested in the background - either a
+    single multipart request or a chunked upload session
+    """
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='upload_batches'
+    )
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='upload_batches'
+    )
+    
+    is_open = models.BooleanField(
+        default=False,
+        help_text="Chunked upload session that can still receive files"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the last file of the batch finished"
+    )
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Upload Batch'
+        verbose_name_plural = 'Upload Batches'
+        indexes = [
+            models.Index(fields=['finished_at']),
+        ]
+    
+    def __str__(self):
+        return f"Upload to {self.event.name} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
+
+
+class UploadItem(models.Model):
+    """
+    One file of an upload batch, staged on local disk until it is ingested
+    """
+    
+    class Status(models.TextChoices):
+        RECEIVING = 'receiving', 'Receiving'
+        QUEUED = 'queued', 'Queued'
+        UPLOADING = 'uploading', 'Uploading'
+        PROCESSING = 'processing', 'Processing'
+        DONE = 'done', 'Done'
+        SKIPPED = 'skipped', 'Skipped'
+        FAILED = 'failed', 'Failed'
+    
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    
+    batch = models.ForeignKey(
+        UploadBatch,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    
+    position = models.PositiveIntegerField(
+        default=0,
+        help_text="Order of the file within its batch"
+    )
+    
+    filename = models.CharField(max_length=255)
+    
+    staged_path = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="Local copy of the file until it has been ingested"
+    )
+    
+    size = models.PositiveBigIntegerField(default=0)
+    
+    upload_key = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Client idempotency key of the file in a chunked upload session"
+    )
+    
+    received_bytes = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Bytes of the file received so far in a chunked upload"
+    )
+    
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 of the uploaded bytes"
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.QUEUED
+    )
+    
+    message = models.CharField(max_length=500, blank=True)
+    
+    photo = models.ForeignKey(
+        Photo,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_items'
+    )
+    
+    face_count = models.IntegerField(default=0)
+    
+    upload_seconds = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Time taken by the upload to Cloudinary, including retries"
+    )
+    
+    upload_attempts = models.PositiveSmallIntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['batch', 'position']
+        verbose_name = 'Upload Item'
+        verbose_name_plural = 'Upload Items'
+        indexes = [
+            models.Index(fields=['batch', 'status']),
+            models.Index(fields=['batch', 'upload_key']),
+            models.Index(fields=['status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.get_status_display()})"
+
+
+class SyncCheckpoint(models.Model):
+    """
+    Progress of the Cloudinary sync of one folder into an event, so each
+    run only lists images created since the last one
+    """
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='sync_checkpoints'
+    )
+    
+    folder = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Cloudinary folder prefix ('' for the whole account)"
+    )
+    
+    last_created_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="created_at of the newest Cloudinary image listed so far"
+    )
+    
+    cursor = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="next_cursor of an unfinished run, to resume from"
+    )
+    
+    cursor_start_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="start_at of the listing the cursor belongs to"
+    )
+    
+    synced_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Photos created by this sync in total"
+    )
+    
+    last_synced_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a run last reached the end of the listing"
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['event', 'folder']
+        verbose_name = 'Sync Checkpoint'
+        verbose_name_plural = 'Sync Checkpoints'
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'folder'], name='unique_sync_checkpoint'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event.name} <- {self.folder or 'all images'}"
+
+
+class EventDeletion(models.Model):
+    """
+    An event being deleted in the background: the event is hidden at once
+    and its photos, face encodings and Cloudinary images are removed in batches
+    """
+    
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+    
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='deletions',
+        help_text="Event being deleted (cleared once it is gone)"
+    )
+    
+    event_name = models.CharField(max_length=200)
+    
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='event_deletions'
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.QUEUED
+    )
+    
+    total_photos = models.PositiveIntegerField(default=0)
+    deleted_photos = models.PositiveIntegerField(default=0)
+    failed_photos = models.PositiveIntegerField(
+        default=0,
+        help_text="Photos kept because Cloudinary did not delete their files"
+    )
+    
+    deleted_folders = models.TextField(
+        blank=True,
+        help_text="Cloudinary folders removed by prefix (one per line)"
+    )
+    
+    message = models.CharField(max_length=500, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Event Deletion'
+        verbose_name_plural = 'Event Deletions'
+        indexes = [
+            models.Index(fields=['status']),
+        ]
+    
+    def __str__(self):
+        return f"Deletion of {self.event_name} ({self.get_status_display()})"
+
+
 class SearchHistory(models.Model):
     """
     Track user search history for analytics
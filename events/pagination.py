@@ -0,0 +1,122 @@
+"""
+Keyset pagination for photo grids
+
+Photo grids are ordered newest first by (uploaded_at, id) and paged with an
+opaque cursor that encodes the last photo shown, so every page is a range
+read on the (event, -uploaded_at) index instead of a COUNT(*) plus an ever
+larger OFFSET scan. Totals come from the cache and may lag behind new
+uploads by PHOTO_COUNT_CACHE_SECONDS.
+"""
+
+import base64
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+PHOTO_ORDERING = ('-uploaded_at', '-id')
+
+
+def encode_cursor(photo):
+    """Opaque cursor pointing just after a photo in PHOTO_ORDERING"""
+    raw = f"{photo.uploaded_at.isoformat()}|{photo.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+        tuple: (uploaded_at, id), or None for a missing or malformed cursor
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        uploaded_at, photo_id = raw.split('|')
+        uploaded_at = parse_datetime(uploaded_at)
+        if uploaded_at is None:
+            return None
+        return uploaded_at, uuid.UUID(photo_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class PhotoPage:
+    """
+    One page of photos from paginate_photos (iterable like a Paginator page).
+    """
+
+    def __init__(self, photos, next_cursor=None, is_first=True, cursor=None):
+        self.object_list = photos
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+        self.cursor = cursor if not is_first else None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or not self.is_first
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+def paginate_photos(queryset, cursor=None, per_page=24):
+    """
+    Get the page of photos after a cursor.
+
+    Args:
+        queryset: Photo queryset (its ordering is replaced by PHOTO_ORDERING)
+        cursor: Cursor from a previous page's next_cursor (None for the first page)
+        per_page: Photos per page
+
+    Returns:
+        PhotoPage
+    """
+    queryset = queryset.order_by(*PHOTO_ORDERING)
+    position = decode_cursor(cursor)
+    if position is not None:
+        uploaded_at, photo_id = position
+        queryset = queryset.filter(
+            Q(uploaded_at__lt=uploaded_at) | Q(uploaded_at=uploaded_at, id__lt=photo_id)
+        )
+
+    photos = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(photos) > per_page:
+        photos = photos[:per_page]
+        next_cursor = encode_cursor(photos[-1])
+    return PhotoPage(photos, next_cursor=next_cursor, is_first=position is None, cursor=cursor)
+
+
+def cached_count(queryset, *key_parts):
+    """
+    Count a queryset, reusing the count for PHOTO_COUNT_CACHE_SECONDS.
+
+    Args:
+        queryset: Queryset to count
+        *key_parts: Values that identify the queryset (event id, filters, ...)
+
+    Returns:
+        int
+    """
+    digest = hashlib.md5('|'.join(str(part) for part in key_parts).encode()).hexdigest()
+    key = f"photo-count:{digest}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.PHOTO_COUNT_CACHE_SECONDS)
+    return count
@@ -0,0 +1,135 @@
+"""
+Resized copies of event photos for Hackotsava 2025
+
+Grid pages use the thumbnail as the src under their Cloudinary srcset (and
+as the srcset itself for photos Cloudinary can't transform) and the photo
+viewer the medium rendition, so only downloads need the original.
+All renditions are made from the upload's single decoded image (see
+images.IngestionImage): the medium rendition is resized from it and the
+thumbnails from the medium rendition.
+"""
+
+import io
+import os
+
+from django.conf import settings
+
+from . import media
+from .face_utils import create_thumbnail
+from .images import IngestionImage
+from .uploads import submit_upload
+
+
+RENDITION_FIELDS = ('thumbnail', 'thumbnail_webp', 'medium')
+
+
+def rendition_specs():
+    """
+    Returns:
+        dict: rendition field -> (longest side in px, PIL format, file extension)
+    """
+    return {
+        'medium': (settings.PHOTO_MEDIUM_SIZE, 'JPEG', '.jpg'),
+        'thumbnail': (settings.PHOTO_THUMBNAIL_SIZE, 'JPEG', '.jpg'),
+        'thumbnail_webp': (settings.PHOTO_THUMBNAIL_SIZE, 'WEBP', '.webp'),
+    }
+
+
+def build_renditions(image, filename):
+    """
+    Encode every rendition of a decoded photo.
+
+    Args:
+        image: IngestionImage of the photo
+        filename: Original filename, used to name the renditions
+
+    Returns:
+        dict: rendition field -> (filename, bytes)
+    """
+    base = os.path.splitext(os.path.basename(filename))[0]
+    specs = rendition_specs()
+    renditions = {}
+
+    medium_size, medium_format, medium_extension = specs['medium']
+    medium = image.resized(medium_size)
+    buffer = io.BytesIO()
+    medium.save(buffer, format=medium_format, quality=settings.PHOTO_RENDITION_QUALITY)
+    renditions['medium'] = (f"{base}_medium{medium_extension}", buffer.getvalue())
+
+    for field in ('thumbnail', 'thumbnail_webp'):
+        size, image_format, extension = specs[field]
+        content = create_thumbnail(
+            medium, size=(size, size), format=image_format, quality=settings.PHOTO_RENDITION_QUALITY
+        )
+        if content is not None:
+            suffix = '_thumb' if field == 'thumbnail' else '_thumb_webp'
+            renditions[field] = (f"{base}{suffix}{extension}", content.read())
+
+    return renditions
+
+
+def submit_rendition_uploads(renditions):
+    """
+    Start uploading renditions in the background I/O pool.
+
+    Returns:
+        dict: rendition field -> Future of uploads.upload_to_storage
+    """
+    return {
+        field: submit_upload(content, name, field_name=field)
+        for field, (name, content) in renditions.items()
+    }
+
+
+def apply_rendition_uploads(photo, uploads):
+    """
+    Wait for rendition uploads and point the photo's fields at them.
+
+    A failed rendition is left empty (generate_renditions fills it in later)
+    rather than failing the photo.
+
+    Returns:
+        list: the fields that were set
+    """
+    updated = []
+    for field, upload in uploads.items():
+        try:
+            getattr(photo, field).name = upload.result()['name']
+            updated.append(field)
+        except Exception as e:
+            print(f"  ⚠️  {field} rendition upload failed: {str(e)}")
+    return updated
+
+
+def generate_photo_renditions(photo, image_bytes=None, image=None):
+    """
+    Create and store the renditions of an existing photo.
+
+    Args:
+        photo: Photo instance
+        image_bytes: The original's bytes (downloaded when not given)
+        image: IngestionImage of the original if it is already decoded
+
+    Returns:
+        list: the fields that were set and saved
+    """
+    if image is None:
+        if image_bytes is None:
+            image_bytes = media.fetch(photo.get_image_url())
+        image = IngestionImage(image_bytes, photo.image.name, max_dimension=settings.PHOTO_MEDIUM_SIZE)
+
+    renditions = build_renditions(image, photo.image.name)
+    updated = apply_rendition_uploads(photo, submit_rendition_uploads(renditions))
+    if updated:
+        photo.save(update_fields=updated)
+    return updated
+
+
+def rendition_fallback_url(image_url, rendition):
+    """
+    URL of a resized copy of the original when a rendition is not stored.
+
+    Cloudinary resizes on the fly; other images are served as they are.
+    """
+    size = rendition_specs()[rendition][0]
+    return media.rendition_url(image_url, size)
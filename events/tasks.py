@@ -0,0 +1,72 @@
+"""
+In-process background work for Hackotsava 2025
+
+Small shared thread pools for work that should not hold a request open:
+the 'default' pool runs jobs (e.g. ingesting queued uploads) and the
+'io' pool runs the network calls those jobs fan out (Cloudinary uploads).
+Keeping them apart means a job waiting on its upload can never starve the
+pool the upload needs. Database connections opened by a task are closed
+when it finishes, since pool threads outlive Django's per-request
+connection cleanup.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _pool_size(pool):
+    if pool == 'io':
+        return settings.BACKGROUND_IO_WORKERS
+    return settings.BACKGROUND_WORKERS
+
+
+def get_executor(pool='default'):
+    """Get a shared background thread pool by name (created on first use)"""
+    executor = _executors.get(pool)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(pool)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=_pool_size(pool),
+                    thread_name_prefix=f'hackotsava-{pool}'
+                )
+                _executors[pool] = executor
+    return executor
+
+
+def _run(fn, args, kwargs):
+    try:
+        return fn(*args, **kwargs)
+    except Exception as e:
+        print(f"❌ Background task {getattr(fn, '__name__', fn)} failed: {str(e)}")
+        raise
+    finally:
+        connections.close_all()
+
+
+def submit(fn, *args, **kwargs):
+    """
+    Run fn(*args, **kwargs) in the default background pool.
+
+    Returns:
+        concurrent.futures.Future with the function's result
+    """
+    return get_executor('default').submit(_run, fn, args, kwargs)
+
+
+def submit_io(fn, *args, **kwargs):
+    """
+    Run fn(*args, **kwargs) in the I/O pool (network calls made by jobs).
+
+    Returns:
+        concurrent.futures.Future with the function's result
+    """
+    return get_executor('io').submit(_run, fn, args, kwargs)
@@ -2,17 +2,105 @@
 Custom template filters for Events app
 """
 from django import template
+from django.conf import settings
+from django.utils.html import format_html, format_html_join
+
+from events import media
+from events.renditions import RENDITION_FIELDS
 
 register = template.Library()
 
 
 @register.filter(name='photo_url')
-def photo_url(photo):
+def photo_url(photo, size=''):
     """
     Get the correct photo URL - handles both ImageField and direct Cloudinary URLs
-    Usage: {{ photo|photo_url }}
+    Usage: {{ photo|photo_url }} for the original, or a resized copy with
+    {{ photo|photo_url:'thumbnail' }}, {{ photo|photo_url:'thumbnail_webp' }}
+    or {{ photo|photo_url:'medium' }}
     """
     if not photo or not photo.image:
         return ''
     
+    if size:
+        if size not in RENDITION_FIELDS:
+            raise template.TemplateSyntaxError(
+                f"photo_url size must be one of {', '.join(RENDITION_FIELDS)}, not '{size}'"
+            )
+        return photo.get_rendition_url(size)
+    
     return photo.get_image_url()
+
+
+def _rendition_width(photo, max_dimension):
+    """
+    Width of a stored rendition: renditions cap the longest side at
+    max_dimension without upscaling, so portrait photos are narrower.
+    Photos of unknown size fall back to max_dimension.
+    """
+    if not photo.width or not photo.height:
+        return max_dimension
+    longest = max(photo.width, photo.height)
+    if longest <= max_dimension:
+        return photo.width
+    return max(1, round(photo.width * max_dimension / longest))
+
+
+@register.filter(name='photo_srcset')
+def photo_srcset(photo):
+    """
+    Build the srcset of a photo: one candidate per PHOTO_SRCSET_WIDTHS width,
+    each a Cloudinary URL scaled to that width with automatic format and quality.
+    Usage: <img srcset="{{ photo|photo_srcset }}" sizes="...">
+    
+    Photos not served by Cloudinary offer their stored thumbnail and medium
+    renditions instead.
+    """
+    if not photo or not photo.image:
+        return ''
+    
+    image_url = photo.get_image_url()
+    if media.is_cloudinary_url(image_url):
+        candidates = [
+            (media.responsive_url(image_url, width), width)
+            for width in sorted(set(settings.PHOTO_SRCSET_WIDTHS))
+        ]
+    else:
+        candidates = [
+            (photo.get_rendition_url('thumbnail'), _rendition_width(photo, settings.PHOTO_THUMBNAIL_SIZE)),
+            (photo.get_rendition_url('medium'), _rendition_width(photo, settings.PHOTO_MEDIUM_SIZE)),
+        ]
+    
+    # Small photos have renditions of the same width; a srcset may list each width once
+    by_width = {}
+    for url, width in candidates:
+        if url:
+            by_width.setdefault(width, url)
+    return ', '.join(f"{url} {width}w" for width, url in by_width.items())
+
+
+@register.simple_tag
+def responsive_photo(photo, sizes='100vw', alt='', **attrs):
+    """
+    Render a lazy-loaded <img> of a photo with its srcset and sizes.
+    The thumbnail rendition is the src for browsers that ignore srcset.
+    Usage: {% responsive_photo photo sizes='(max-width: 768px) 50vw, 25vw' alt='Event photo' class='photo-image' data_full=url %}
+    
+    Any other keyword becomes an attribute of the <img>, with underscores
+    turned into dashes (data_full -> data-full).
+    """
+    if not photo or not photo.image:
+        return ''
+    
+    extra = format_html_join(
+        '', ' {}="{}"',
+        ((name.replace('_', '-'), value) for name, value in attrs.items())
+    )
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" loading="lazy" decoding="async"{}>',
+        photo.get_rendition_url('thumbnail'),
+        photo_srcset(photo),
+        sizes,
+        alt,
+        extra,
+    )
@@ -0,0 +1,133 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .cloudinary_sync import FOLDER_SYNC_MARGIN, list_resources, sync_event
+from .media import public_id_from_url
+from .models import Event, Photo, SyncCheckpoint
+from .webhooks import resolve_event
+
+
+def make_event(name='Test Event'):
+    user, _ = get_user_model().objects.get_or_create(
+        username='admin', defaults={'email': 'admin@example.com', 'role': 'ADMIN'}
+    )
+    return Event.objects.create(name=name, event_date='2025-01-01', created_by=user)
+
+
+def make_resource(public_id, created_at):
+    return {
+        'public_id': public_id,
+        'secure_url': f'https://res.cloudinary.com/demo/image/upload/v1/{public_id}.jpg',
+        'created_at': created_at,
+        'width': 100,
+        'height': 100,
+        'bytes': 1000,
+    }
+
+
+class ListResourcesTests(TestCase):
+    """Parameters sent to the Admin API by list_resources"""
+
+    def list_params(self, *args, **kwargs):
+        with mock.patch('cloudinary.api.resources', return_value={'resources': []}) as resources:
+            list(list_resources(*args, **kwargs))
+        return resources.call_args.kwargs
+
+    def test_account_listing_is_oldest_first_from_start_at(self):
+        start_at = datetime(2025, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+        self.assertEqual(self.list_params('', start_at=start_at, page_size=100), {
+            'type': 'upload',
+            'resource_type': 'image',
+            'max_results': 100,
+            'direction': 'asc',
+            'start_at': '2025-01-02T03:04:05Z',
+        })
+
+    def test_folder_listing_sends_prefix_only(self):
+        start_at = datetime(2025, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+        self.assertEqual(self.list_params('shoots/day1', start_at=start_at, page_size=100), {
+            'type': 'upload',
+            'resource_type': 'image',
+            'max_results': 100,
+            'prefix': 'shoots/day1',
+        })
+
+    def test_folder_listing_filters_by_created_at(self):
+        start_at = datetime(2025, 1, 2, tzinfo=dt_timezone.utc)
+        pages = [
+            {'resources': [make_resource('shoots/a', '2025-01-01T00:00:00Z')], 'next_cursor': 'next'},
+            {'resources': [make_resource('shoots/b', '2025-01-03T00:00:00Z')]},
+        ]
+        with mock.patch('cloudinary.api.resources', side_effect=pages) as resources:
+            listed = list(list_resources('shoots', start_at=start_at, page_size=100))
+
+        self.assertEqual([[r['public_id'] for r in page] for page, _ in listed], [[], ['shoots/b']])
+        self.assertEqual(resources.call_args.kwargs['next_cursor'], 'next')
+
+
+class SyncEventFolderTests(TestCase):
+    def test_folder_checkpoint_is_when_the_listing_began(self):
+        event = make_event()
+        resources = [
+            make_resource('shoots/z-old', '2025-01-01T00:00:00Z'),
+            make_resource('shoots/a-new', '2025-01-05T00:00:00Z'),
+        ]
+        SyncCheckpoint.objects.create(
+            event=event, folder='shoots', last_created_at=datetime(2025, 1, 2, tzinfo=dt_timezone.utc)
+        )
+
+        before = timezone.now()
+        with mock.patch('cloudinary.api.resources', return_value={'resources': resources}):
+            stats = sync_event(event, folder='shoots')
+
+        self.assertEqual(stats['created'], 1)
+        self.assertTrue(Photo.objects.filter(public_id='shoots/a-new').exists())
+        checkpoint = SyncCheckpoint.objects.get(event=event, folder='shoots')
+        self.assertGreaterEqual(checkpoint.last_created_at, before - FOLDER_SYNC_MARGIN)
+        self.assertLessEqual(checkpoint.last_created_at, timezone.now() - FOLDER_SYNC_MARGIN)
+
+
+class PublicIdFromUrlTests(TestCase):
+    def test_strips_only_image_extensions(self):
+        base = 'https://res.cloudinary.com/demo/image/upload/'
+        self.assertEqual(public_id_from_url(base + 'v123/shoots/IMG_1234.jpg'), 'shoots/IMG_1234')
+        self.assertEqual(public_id_from_url(base + 'v123/shoots/IMG_1234.JPEG'), 'shoots/IMG_1234')
+        self.assertEqual(public_id_from_url(base + 'v123/shoots/IMG_1234.final'), 'shoots/IMG_1234.final')
+        self.assertEqual(public_id_from_url(base + 'v123/shoots/IMG_1234.final.png'), 'shoots/IMG_1234.final')
+        self.assertEqual(public_id_from_url(base + 'c_fill,w_100/v123/a.webp?_a=x'), 'a')
+        self.assertIsNone(public_id_from_url('https://example.com/a.jpg'))
+
+
+class ResolveEventTests(TestCase):
+    """Which event an upload notification is filed under"""
+
+    def test_folder_does_not_claim_sibling_folders(self):
+        day1, day10 = make_event('Day 1'), make_event('Day 10')
+        SyncCheckpoint.objects.create(event=day1, folder='shoots/day1')
+        SyncCheckpoint.objects.create(event=day10, folder='shoots/day10/')
+
+        self.assertEqual(resolve_event({'public_id': 'shoots/day1/a'}), day1)
+        self.assertEqual(resolve_event({'public_id': 'shoots/day10/a'}), day10)
+        self.assertIsNone(resolve_event({'public_id': 'shoots/day1-extra/a'}))
+
+    def test_longest_folder_wins(self):
+        outer, inner = make_event('Outer'), make_event('Inner')
+        SyncCheckpoint.objects.create(event=outer, folder='shoots')
+        SyncCheckpoint.objects.create(event=inner, folder='shoots/day1')
+
+        self.assertEqual(resolve_event({'public_id': 'shoots/day1/a'}), inner)
+        self.assertEqual(resolve_event({'public_id': 'shoots/day2/a'}), outer)
+
+    def test_root_folder_ranks_after_folders_and_setting(self):
+        account, fallback, day1 = make_event('Account'), make_event('Fallback'), make_event('Day 1')
+        SyncCheckpoint.objects.create(event=account, folder='')
+        SyncCheckpoint.objects.create(event=day1, folder='shoots/day1')
+
+        self.assertEqual(resolve_event({'public_id': 'shoots/day1/a'}), day1)
+        self.assertEqual(resolve_event({'public_id': 'elsewhere/a'}), account)
+        with override_settings(CLOUDINARY_WEBHOOK_EVENT=fallback.slug):
+            self.assertEqual(resolve_event({'public_id': 'elsewhere/a'}), fallback)
@@ -0,0 +1,183 @@
+"""
+Concurrent photo uploads to the storage backend (Cloudinary)
+
+Each upload call to Cloudinary is dominated by network latency, so bulk
+uploads run several at once. Uploads are retried with backoff, results are
+collected as they complete (in any order) and timed so callers can report
+throughput and latency percentiles.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+
+from . import tasks
+
+
+def _image_field(field_name='image'):
+    from .models import Photo
+    return Photo._meta.get_field(field_name)
+
+
+def upload_to_storage(source, filename, retries=None, field_name='image'):
+    """
+    Upload one image to the photo storage backend, retrying on errors.
+
+    No database access happens here, so it is safe to call from any thread;
+    assign the returned name to the Photo field afterwards.
+
+    Args:
+        source: Image bytes or a local file path
+        filename: Original filename (the upload_to date folder is added)
+        retries: Extra attempts after a failure (defaults to UPLOAD_RETRIES)
+        field_name: Photo image field whose storage and folder are used
+
+    Returns:
+        dict: {'name': stored name, 'bytes', 'seconds', 'attempts'}
+
+    Raises:
+        Exception: the last error once all attempts have failed
+    """
+    field = _image_field(field_name)
+    retries = settings.UPLOAD_RETRIES if retries is None else retries
+    name = field.generate_filename(None, os.path.basename(filename))
+
+    started = time.monotonic()
+    for attempt in range(1, retries + 2):
+        try:
+            if isinstance(source, (bytes, bytearray)):
+                size = len(source)
+                stored_name = field.storage.save(name, ContentFile(source), max_length=field.max_length)
+            else:
+                size = os.path.getsize(source)
+                with open(source, 'rb') as f:
+                    stored_name = field.storage.save(name, File(f, name=filename), max_length=field.max_length)
+            return {
+                'name': stored_name,
+                'bytes': size,
+                'seconds': time.monotonic() - started,
+                'attempts': attempt,
+            }
+        except Exception as e:
+            if attempt > retries:
+                raise
+            delay = 0.5 * (2 ** (attempt - 1))
+            print(f"  ⚠️  Upload of {filename} failed (attempt {attempt}): {str(e)} - retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def submit_upload(source, filename, retries=None, field_name='image'):
+    """
+    Start upload_to_storage in the shared background I/O pool.
+
+    Returns:
+        concurrent.futures.Future with upload_to_storage's result
+    """
+    return tasks.submit_io(upload_to_storage, source, filename, retries, field_name)
+
+
+def upload_concurrently(files, workers=None, retries=None, stats=None):
+    """
+    Upload many images in parallel, yielding each result as soon as it is done.
+
+    Args:
+        files: Iterable of (key, source, filename) - key identifies the file
+            to the caller, source is bytes or a local path
+        workers: Number of parallel uploads (defaults to UPLOAD_WORKERS)
+        retries: Extra attempts per file (defaults to UPLOAD_RETRIES)
+        stats: Optional UploadStats that every result is recorded in
+
+    Yields:
+        tuple: (key, result, error) in completion order - result is the
+        upload_to_storage dict, or None when error is set
+    """
+    workers = workers or settings.UPLOAD_WORKERS
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='photo-upload') as executor:
+        futures = {
+            executor.submit(upload_to_storage, source, filename, retries): key
+            for key, source, filename in files
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                if stats is not None:
+                    stats.add_failure()
+                yield key, None, e
+            else:
+                if stats is not None:
+                    stats.add(result)
+                yield key, result, None
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class UploadStats:
+    """
+    Aggregate throughput and per-file latency of a set of uploads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.latencies = []
+        self.total_bytes = 0
+        self.failed = 0
+        self.retried = 0
+
+    def add(self, result):
+        with self._lock:
+            self.latencies.append(result['seconds'])
+            self.total_bytes += result['bytes']
+            if result['attempts'] > 1:
+                self.retried += 1
+
+    def add_failure(self):
+        with self._lock:
+            self.failed += 1
+
+    def summary(self):
+        """
+        Returns:
+            dict: files, failed, retried, bytes, wall-clock seconds, MB/s and
+            p50/p90/p99/max upload latency in seconds
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            latencies = list(self.latencies)
+            return {
+                'files': len(latencies),
+                'failed': self.failed,
+                'retried': self.retried,
+                'bytes': self.total_bytes,
+                'seconds': round(elapsed, 2),
+                'mb_per_second': round(self.total_bytes / elapsed / (1024 * 1024), 2) if elapsed else 0.0,
+                'p50': percentile(latencies, 0.50),
+                'p90': percentile(latencies, 0.90),
+                'p99': percentile(latencies, 0.99),
+                'max': max(latencies) if latencies else None,
+            }
+
+    def __str__(self):
+        summary = self.summary()
+        if not summary['files']:
+            return f"0 files uploaded, {summary['failed']} failed"
+        return (
+            f"{summary['files']} files, {summary['bytes'] / (1024 * 1024):.1f} MB in {summary['seconds']:.1f}s "
+            f"({summary['mb_per_second']:.2f} MB/s) - latency p50 {summary['p50']:.2f}s, "
+            f"p90 {summary['p90']:.2f}s, p99 {summary['p99']:.2f}s, max {summary['max']:.2f}s"
+            f" - {summary['retried']} retried, {summary['failed']} failed"
+        )
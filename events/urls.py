@@ -8,10 +8,12 @@ urlpatterns = [
     # Public pages
     path('', views.home, name='home'),
     path('browse-photos/', views.browse_photos, name='browse_photos'),
+    path('browse-photos/page/', views.browse_photos_page, name='browse_photos_page'),
     path('find-my-photos/', views.find_my_photos, name='find_my_photos'),
     path('events/', views.event_list, name='event_list'),
     path('event/<slug:slug>/', views.event_detail, name='event_detail'),
     path('event/<slug:slug>/gallery/', views.event_gallery, name='event_gallery'),
+    path('event/<slug:slug>/gallery/photos/', views.event_gallery_photos, name='event_gallery_photos'),
     path('event/<slug:slug>/search/', views.search_faces, name='search_faces'),
     
     # Admin pages (require admin role)
@@ -20,10 +22,18 @@ urlpatterns = [
     path('manage/event/<slug:slug>/edit/', views.edit_event, name='edit_event'),
     path('manage/event/<slug:slug>/delete/', views.delete_event, name='delete_event'),
     path('manage/event/<slug:slug>/upload-photos/', views.upload_photos, name='upload_photos'),
+    path('manage/event/<slug:slug>/upload-sessions/', views.create_upload_session, name='create_upload_session'),
+    path('manage/uploads/<uuid:batch_id>/progress/', views.upload_progress, name='upload_progress'),
+    path('manage/uploads/<uuid:batch_id>/chunks/', views.upload_chunk, name='upload_chunk'),
+    path('manage/uploads/<uuid:batch_id>/complete/', views.complete_upload_session, name='complete_upload_session'),
+    path('manage/deletions/<uuid:deletion_id>/progress/', views.event_deletion_progress, name='event_deletion_progress'),
     path('manage/photo/<uuid:photo_id>/delete/', views.delete_photo, name='delete_photo'),
     path('manage/photos/bulk-delete/', views.bulk_delete_photos, name='bulk_delete_photos'),
     path('analytics/', views.analytics, name='analytics'),
     
+    # Cloudinary upload notifications
+    path('webhooks/cloudinary/', views.cloudinary_webhook, name='cloudinary_webhook'),
+    
     # Download
     path('photo/<uuid:photo_id>/download/', views.download_photo, name='download_photo'),
     path('photos/download-all/', views.download_all_photos, name='download_all_photos'),
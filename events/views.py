@@ -1,19 +1,24 @@
 """
 Views for Events App - Complete implementation with face recognition
 """
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.http import FileResponse, Http404, HttpResponse, JsonResponse
-from django.db.models import Count, Q, Max
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db.models import Count, Q, Max, Sum
 from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from functools import wraps
+import json
 import tempfile
 import os
+import uuid
 
-from .models import Event, Photo, FaceEncoding, SearchHistory
+from .models import Event, EventDeletion, Photo, SearchHistory, UploadBatch, UploadItem
 from .forms import EventForm, BulkPhotoUploadForm, SelfieUploadForm
 from .face_utils import (
     detect_faces_in_image,
@@ -23,7 +28,28 @@ from .face_utils import (
     string_to_encoding,
     compare_faces,
     find_matching_photos,
+    get_active_model_version,
 )
+from .ingestion import (
+    enqueue_upload_batch,
+    batch_progress,
+    open_upload_session,
+    receive_chunk,
+    close_upload_session,
+)
+from .caching import (
+    cache_anonymous_page,
+    conditional,
+    download_validators,
+    event_page_version,
+    gallery_validators,
+    site_cache_version,
+    site_page_version,
+)
+from .pagination import cached_count, paginate_photos
+from .archives import stream_photo_zip
+from .deletion import delete_photos, deletion_progress, schedule_event_deletion
+from .webhooks import verify_notification, handle_notification
 
 
 # Decorator for admin-only views
@@ -43,13 +69,14 @@ def admin_required(view_func):
 
 # ============== PUBLIC VIEWS ==============
 
+@cache_anonymous_page(site_page_version)
 def home(request):
     """
     Homepage with hero section and featured events
     """
     recent_events = Event.objects.filter(is_public=True)[:6]
     total_events = Event.objects.filter(is_public=True).count()
-    total_photos = Photo.objects.filter(event__is_public=True).count()
+    total_photos = Event.objects.filter(is_public=True).aggregate(total=Sum('photo_count'))['total'] or 0
     
     context = {
         'page_title': 'Hackotsava 2025 - Event Photo Finder',
@@ -60,13 +87,12 @@ def home(request):
     return render(request, 'events/home.html', context)
 
 
+@cache_anonymous_page(site_page_version)
 def event_list(request):
     """
     List all public events with search and filtering
     """
-    events = Event.objects.filter(is_public=True).annotate(
-        photo_count=Count('photos')
-    )
+    events = Event.objects.filter(is_public=True)
     
     # Search functionality
     search_query = request.GET.get('search', '')
@@ -86,19 +112,24 @@ def event_list(request):
         'page_title': 'Events - Hackotsava 2025',
         'events': events_page,
         'search_query': search_query,
+        'cache_version': site_cache_version(),
+        'cache_seconds': settings.PAGE_CACHE_SECONDS,
     }
     return render(request, 'events/event_list.html', context)
 
 
-def browse_photos(request):
+def _browse_queryset(request):
     """
-    Browse all photos from all public events
+    Photos the browse page lists for a request, with its search query
+    
+    Returns:
+        tuple: (photo queryset, search_query)
     """
     # Get all public events or all events if user is admin
     if request.user.is_authenticated and request.user.is_admin():
-        photos = Photo.objects.select_related('event').order_by('-uploaded_at')
+        photos = Photo.objects.filter(event__deleted_at__isnull=True).select_related('event').order_by('-uploaded_at')
     else:
-        photos = Photo.objects.filter(event__is_public=True).select_related('event').order_by('-uploaded_at')
+        photos = Photo.objects.filter(event__is_public=True, event__deleted_at__isnull=True).select_related('event').order_by('-uploaded_at')
     
     # Search functionality
     search_query = request.GET.get('search', '')
@@ -108,20 +139,68 @@ def browse_photos(request):
             Q(event__location__icontains=search_query)
         )
     
-    # Pagination
-    paginator = Paginator(photos, 24)
-    page_number = request.GET.get('page')
-    photos_page = paginator.get_page(page_number)
+    return photos, search_query
+
+
+def browse_photos(request):
+    """
+    Browse all photos from all public events
+    """
+    photos, search_query = _browse_queryset(request)
+    
+    # Keyset pagination (see pagination.py)
+    photos_page = paginate_photos(photos, cursor=request.GET.get('cursor'))
+    next_query = _next_page_query(request, photos_page)
+    is_admin = request.user.is_authenticated and request.user.is_admin()
     
     context = {
         'page_title': 'Browse Photos - Hackotsava 2025',
         'photos': photos_page,
         'search_query': search_query,
-        'total_photos': photos.count(),
+        'total_photos': cached_count(photos, 'browse', is_admin, search_query),
+        'next_query': next_query,
+        'next_url': f"{reverse('browse_photos_page')}?{next_query}" if next_query else None,
+        'zip_photo_limit': settings.DOWNLOAD_ZIP_MAX_PHOTOS,
     }
     return render(request, 'events/browse_photos.html', context)
 
 
+def browse_photos_page(request):
+    """
+    Next page of the browse grid for infinite scroll (JSON)
+    """
+    photos, _ = _browse_queryset(request)
+    photos_page = paginate_photos(photos, cursor=request.GET.get('cursor'))
+    return _photo_page_json(request, photos_page, 'events/partials/browse_photo_cards.html')
+
+
+def _next_page_query(request, page):
+    """Query string of the page after a keyset page (None on the last page)"""
+    if not page.has_next:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = page.next_cursor
+    return params.urlencode()
+
+
+def _photo_page_json(request, page, template, context=None):
+    """
+    Render the grid items of a keyset page for infinite scroll
+    
+    Returns:
+        JsonResponse: html of the items, count, next_cursor and next_url
+        (this endpoint's URL for the following page, None on the last page)
+    """
+    html = render_to_string(template, {'photos': page, **(context or {})}, request=request)
+    next_query = _next_page_query(request, page)
+    return JsonResponse({
+        'html': html,
+        'count': len(page),
+        'next_cursor': page.next_cursor,
+        'next_url': f"{request.path}?{next_query}" if next_query else None,
+    })
+
+
 @require_http_methods(["POST"])
 def find_my_photos(request):
     """
@@ -176,19 +255,22 @@ def find_my_photos(request):
         
         # Find matching photos across all public events (or all events if admin)
         if request.user.is_authenticated and request.user.is_admin():
-            all_photos = Photo.objects.filter(faces_processed=True)
+            all_photos = Photo.objects.filter(event__deleted_at__isnull=True, faces_processed=True)
         else:
-            all_photos = Photo.objects.filter(event__is_public=True, faces_processed=True)
+            all_photos = Photo.objects.filter(event__is_public=True, event__deleted_at__isnull=True, faces_processed=True)
         
         print(f"📊 Total photos to check: {all_photos.count()}")
         
+        # Only compare against vectors from the index that serves searches
+        active_model_version = get_active_model_version()
+        
         matches = []
         checked_count = 0
         all_distances = []
         
         for photo in all_photos:
             # Get all face encodings for this photo
-            face_encodings = photo.face_encodings.all()
+            face_encodings = photo.face_encodings.filter(model_version=active_model_version)
             
             if not face_encodings.exists():
                 continue
@@ -280,6 +362,7 @@ def find_my_photos(request):
         })
 
 
+@cache_anonymous_page(event_page_version)
 def event_detail(request, slug):
     """
     Event detail page with overview and stats
@@ -291,8 +374,8 @@ def event_detail(request, slug):
         messages.error(request, 'This event is private.')
         return redirect('event_list')
     
-    photo_count = event.get_photo_count()
-    face_count = event.get_face_count()
+    photo_count = event.photo_count
+    face_count = event.face_count
     recent_photos = event.photos.all()[:12]
     
     context = {
@@ -301,10 +384,13 @@ def event_detail(request, slug):
         'photo_count': photo_count,
         'face_count': face_count,
         'recent_photos': recent_photos,
+        'cache_seconds': settings.PAGE_CACHE_SECONDS,
     }
     return render(request, 'events/event_detail.html', context)
 
 
+@conditional(gallery_validators)
+@cache_anonymous_page(event_page_version)
 def event_gallery(request, slug):
     """
     Full gallery view of event photos
@@ -318,19 +404,35 @@ def event_gallery(request, slug):
     
     photos = event.photos.all()
     
-    # Pagination
-    paginator = Paginator(photos, 24)
-    page_number = request.GET.get('page')
-    photos_page = paginator.get_page(page_number)
+    # Keyset pagination on the (event, -uploaded_at) index (see pagination.py)
+    photos_page = paginate_photos(photos, cursor=request.GET.get('cursor'))
+    next_query = _next_page_query(request, photos_page)
     
     context = {
         'page_title': f'{event.name} Gallery - Hackotsava 2025',
         'event': event,
         'photos': photos_page,
+        'total_photos': event.photo_count,
+        'cache_seconds': settings.PAGE_CACHE_SECONDS,
+        'next_query': next_query,
+        'next_url': f"{reverse('event_gallery_photos', args=[event.slug])}?{next_query}" if next_query else None,
     }
     return render(request, 'events/gallery.html', context)
 
 
+@conditional(gallery_validators)
+def event_gallery_photos(request, slug):
+    """
+    Next page of an event gallery for infinite scroll (JSON)
+    """
+    event = get_object_or_404(Event, slug=slug)
+    if not event.is_public and not (request.user.is_authenticated and request.user.is_admin()):
+        return JsonResponse({'success': False, 'error': 'This event is private.'}, status=403)
+    
+    photos_page = paginate_photos(event.photos.all(), cursor=request.GET.get('cursor'))
+    return _photo_page_json(request, photos_page, 'events/partials/gallery_items.html')
+
+
 def search_faces(request, slug):
     """
     Search for photos containing user's face
@@ -396,6 +498,34 @@ def search_faces(request, slug):
     return render(request, 'events/search.html', context)
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def cloudinary_webhook(request):
+    """
+    Receive Cloudinary upload notifications (the account's notification URL)
+    
+    Unsigned or stale notifications are refused; anything else is answered
+    with 200 so Cloudinary doesn't retry what we chose to ignore.
+    """
+    body = request.body.decode('utf-8', errors='replace')
+    try:
+        timestamp = int(request.headers.get('X-Cld-Timestamp', ''))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Missing X-Cld-Timestamp'}, status=400)
+    
+    if not verify_notification(body, timestamp, request.headers.get('X-Cld-Signature', '')):
+        return JsonResponse({'success': False, 'error': 'Invalid signature'}, status=403)
+    
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Body is not JSON'}, status=400)
+    
+    result = handle_notification(payload)
+    return JsonResponse({'success': True, **result})
+
+
+@conditional(download_validators)
 def download_photo(request, photo_id):
     """
     Download a single photo (always in JPEG format)
@@ -403,7 +533,7 @@ def download_photo(request, photo_id):
     from PIL import Image
     from io import BytesIO
     
-    photo = get_object_or_404(Photo, id=photo_id)
+    photo = get_object_or_404(Photo.objects.filter(event__deleted_at__isnull=True), id=photo_id)
     
     # Check permissions
     if not photo.event.is_public and not (request.user.is_authenticated and request.user.is_admin()):
@@ -447,12 +577,8 @@ def download_photo(request, photo_id):
 @require_http_methods(["POST"])
 def download_all_photos(request):
     """
-    Download multiple photos as a ZIP file (optimized for speed)
+    Download multiple photos as a ZIP file, streamed while the photos are fetched
     """
-    from io import BytesIO
-    import zipfile
-    import requests
-    
     try:
         # Get photo IDs from POST request
         photo_ids = request.POST.getlist('photo_ids[]')
@@ -463,57 +589,39 @@ def download_all_photos(request):
             print("❌ No photo IDs provided in request")
             return HttpResponse("No photos selected for download", status=400)
         
-        # Limit to prevent timeout (max 50 photos)
-        if len(photo_ids) > 50:
-            photo_ids = photo_ids[:50]
-            print(f"⚠️ Limited to first 50 photos to prevent timeout")
+        # Photos per archive (DOWNLOAD_ZIP_MAX_PHOTOS, 0 = no limit)
+        limit = settings.DOWNLOAD_ZIP_MAX_PHOTOS
+        if limit and len(photo_ids) > limit:
+            photo_ids = photo_ids[:limit]
+            print(f"⚠️ Limited to first {limit} photos")
         
-        # Create ZIP file in memory
-        zip_buffer = BytesIO()
-        
-        print(f"🔧 Creating ZIP file...")
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_STORED) as zip_file:  # No compression for speed
-            for idx, photo_id in enumerate(photo_ids, 1):
-                try:
-                    photo = Photo.objects.get(id=photo_id)
-                    
-                    # Check permissions
-                    if not photo.event.is_public and not (request.user.is_authenticated and request.user.is_admin()):
-                        continue
-                    
-                    # Get image URL
-                    photo_url = str(photo.image.url)
-                    
-                    # Download image directly from Cloudinary
-                    response = requests.get(photo_url, timeout=10)
-                    if response.status_code == 200:
-                        # Get original filename
-                        original_name = os.path.basename(photo.image.name)
-                        filename = f"{idx:03d}_{original_name}"
-                        
-                        # Add to ZIP without re-encoding
-                        zip_file.writestr(filename, response.content)
-                        print(f"  ✓ Added {idx}/{len(photo_ids)}: {filename[:50]}...")
-                    else:
-                        print(f"  ✗ Failed to download photo {photo_id}: HTTP {response.status_code}")
-                    
-                except Photo.DoesNotExist:
-                    print(f"  ✗ Photo {photo_id} not found")
-                    continue
-                except requests.Timeout:
-                    print(f"  ✗ Timeout downloading photo {photo_id}")
-                    continue
-                except Exception as e:
-                    print(f"  ✗ Error processing photo {photo_id}: {e}")
-                    continue
+        # Resolve photos and permissions before streaming starts
+        valid_ids = []
+        for photo_id in photo_ids:
+            try:
+                valid_ids.append(uuid.UUID(photo_id))
+            except ValueError:
+                print(f"  ✗ Invalid photo ID {photo_id}")
+        photos_by_id = Photo.objects.filter(event__deleted_at__isnull=True).select_related('event').in_bulk(valid_ids)
+        allowed = []
+        for photo_id in valid_ids:
+            photo = photos_by_id.get(photo_id)
+            if photo is None:
+                print(f"  ✗ Photo {photo_id} not found")
+                continue
+            
+            # Check permissions
+            if not photo.event.is_public and not (request.user.is_authenticated and request.user.is_admin()):
+                continue
+            allowed.append(photo)
         
-        # Prepare response
-        zip_buffer.seek(0)
-        print(f"✅ ZIP created successfully with {len(photo_ids)} photos")
+        if not allowed:
+            return HttpResponse("None of the selected photos can be downloaded", status=404)
         
-        response = HttpResponse(zip_buffer.getvalue(), content_type='application/zip')
+        print(f"🔧 Streaming ZIP file with {len(allowed)} photos...")
+        response = StreamingHttpResponse(stream_photo_zip(allowed), content_type='application/zip')
         response['Content-Disposition'] = 'attachment; filename="hackotsava_photos.zip"'
-        response['Content-Length'] = zip_buffer.tell()
+        response['X-Accel-Buffering'] = 'no'  # let proxies pass chunks through as they are written
         return response
         
     except Exception as e:
@@ -532,7 +640,7 @@ def admin_dashboard(request):
     """
     # Create default Hackotsava 2025 event if it doesn't exist
     from datetime import date
-    default_event, created = Event.objects.get_or_create(
+    default_event, created = Event.all_objects.get_or_create(
         slug='hackotsava-2025',
         defaults={
             'name': 'Hackotsava 2025',
@@ -544,16 +652,32 @@ def admin_dashboard(request):
         }
     )
     
+    totals = Event.objects.aggregate(photos=Sum('photo_count'), faces=Sum('face_count'))
     total_events = Event.objects.count()
-    total_photos = Photo.objects.count()
-    total_faces = FaceEncoding.objects.count()
+    total_photos = totals['photos'] or 0
+    total_faces = totals['faces'] or 0
     total_searches = SearchHistory.objects.count()
     
     recent_events = Event.objects.all()[:5]
     recent_searches = SearchHistory.objects.select_related('user', 'event')[:10]
     
     # Photos pending face processing
-    pending_photos = Photo.objects.filter(faces_processed=False).count()
+    pending_photos = Photo.objects.filter(
+        processing_status__in=[Photo.ProcessingStatus.PENDING, Photo.ProcessingStatus.PROCESSING]
+    ).count()
+    failed_photos = Photo.objects.filter(processing_status=Photo.ProcessingStatus.FAILED).count()
+    
+    # Upload batches still being ingested in the background
+    active_uploads = [
+        batch_progress(batch, include_items=False)
+        for batch in UploadBatch.objects.filter(finished_at__isnull=True).select_related('event')[:5]
+    ]
+    
+    # Event deletions still running in the background, or that need a retry
+    active_deletions = [
+        deletion_progress(deletion)
+        for deletion in EventDeletion.objects.exclude(status=EventDeletion.Status.DONE)[:5]
+    ]
     
     context = {
         'page_title': 'Admin Dashboard - Hackotsava 2025',
@@ -564,6 +688,9 @@ def admin_dashboard(request):
         'recent_events': recent_events,
         'recent_searches': recent_searches,
         'pending_photos': pending_photos,
+        'failed_photos': failed_photos,
+        'active_uploads': active_uploads,
+        'active_deletions': active_deletions,
     }
     return render(request, 'events/admin/dashboard.html', context)
 
@@ -623,10 +750,10 @@ def delete_event(request, slug):
     event = get_object_or_404(Event, slug=slug)
     
     if request.method == 'POST':
-        event_name = event.name
-        event.delete()
-        messages.success(request, f'Event "{event_name}" deleted successfully!')
-        return redirect('event_list')
+        # Hidden right away; photos and Cloudinary images go in the background
+        schedule_event_deletion(event, requested_by=request.user)
+        messages.success(request, f'Event "{event.name}" is being deleted. Progress is shown on the dashboard.')
+        return redirect('admin_dashboard')
     
     context = {
         'page_title': f'Delete {event.name} - Hackotsava 2025',
@@ -659,136 +786,40 @@ def upload_photos(request, slug):
                 print("❌ No files provided")
                 return JsonResponse({'success': False, 'error': 'No files provided'}, status=400)
             
-            total_files = len(files)
-            uploaded_count = 0
-            error_count = 0
-            results = []
+            # Validate and stage the files only; upload and face detection run in the background
+            batch, summary = enqueue_upload_batch(event, files, uploaded_by=request.user)
             
-            print(f"Starting upload of {total_files} files...\n")
-            
-            for index, file in enumerate(files, 1):
-                print(f"[{index}/{total_files}] Processing: {file.name} ({file.size / 1024 / 1024:.2f} MB)")
-                
-                try:
-                    # Validate each file
-                    is_valid, error_msg = validate_image_file(file)
-                    if not is_valid:
-                        error_count += 1
-                        print(f"  ❌ Validation failed: {error_msg}")
-                        results.append({
-                            'filename': file.name,
-                            'status': 'error',
-                            'message': error_msg
-                        })
-                        continue
-                    
-                    # Create Photo object - Cloudinary handles upload automatically
-                    photo = Photo.objects.create(
-                        event=event,
-                        image=file,
-                        uploaded_by=request.user
-                    )
-                    
-                    uploaded_count += 1
-                    print(f"  ✅ Uploaded to Cloudinary")
-                    
-                    # Process faces immediately
-                    try:
-                        faces_count = process_photo_faces(photo)
-                        print(f"  👤 Detected {faces_count} face(s)")
-                        results.append({
-                            'filename': file.name,
-                            'status': 'success',
-                            'message': f'{faces_count} face(s) detected',
-                            'photo_id': photo.id
-                        })
-                    except Exception as face_error:
-                        print(f"  ⚠️  Face processing error: {str(face_error)}")
-                        results.append({
-                            'filename': file.name,
-                            'status': 'success',
-                            'message': 'Uploaded (face processing pending)',
-                            'photo_id': photo.id
-                        })
-                
-                except Exception as e:
-                    error_count += 1
-                    print(f"  ❌ Upload error: {str(e)}")
-                    results.append({
-                        'filename': file.name,
-                        'status': 'error',
-                        'message': str(e)
-                    })
-            
-            print(f"\n{'='*60}")
-            print(f"✅ Upload Complete!")
-            print(f"Total: {total_files} | Uploaded: {uploaded_count} | Failed: {error_count}")
-            print(f"{'='*60}\n")
+            print(f"✅ Queued batch {batch.id}: {summary['queued']} to ingest, "
+                  f"{summary['skipped']} duplicates, {summary['failed']} invalid\n")
             
             return JsonResponse({
                 'success': True,
-                'total': total_files,
-                'uploaded': uploaded_count,
-                'failed': error_count,
-                'results': results
-            })
+                'batch_id': str(batch.id),
+                'progress_url': reverse('upload_progress', args=[batch.id]),
+                'total': len(files),
+                'queued': summary['queued'],
+                'skipped': summary['skipped'],
+                'failed': summary['failed'],
+                'results': batch_progress(batch)['items']
+            }, status=202)
         
         # Standard form submission (fallback)
         form = BulkPhotoUploadForm(request.POST, request.FILES)
         files = request.FILES.getlist('photos')
         
         if files:
-            total_files = len(files)
-            uploaded_count = 0
-            error_count = 0
+            batch, summary = enqueue_upload_batch(event, files, uploaded_by=request.user)
             
-            print(f"\n{'='*60}")
-            print(f"📸 Starting upload of {total_files} photos to Cloudinary...")
-            print(f"{'='*60}\n")
+            print(f"✅ Queued batch {batch.id}: {summary['queued']} to ingest, "
+                  f"{summary['skipped']} duplicates, {summary['failed']} invalid\n")
             
-            for index, file in enumerate(files, 1):
-                print(f"[{index}/{total_files}] Uploading: {file.name} ({file.size / 1024 / 1024:.2f} MB)")
-                
-                # Validate each file
-                is_valid, error_msg = validate_image_file(file)
-                if not is_valid:
-                    error_count += 1
-                    print(f"  ❌ Validation failed: {error_msg}")
-                    messages.warning(request, f'{file.name}: {error_msg}')
-                    continue
-                
-                try:
-                    # Create Photo object - Cloudinary handles upload automatically
-                    photo = Photo.objects.create(
-                        event=event,
-                        image=file,
-                        uploaded_by=request.user
-                    )
-                    
-                    uploaded_count += 1
-                    print(f"  ✅ Uploaded to Cloudinary!")
-                    
-                    # Process faces immediately (fast in MOCK mode)
-                    try:
-                        faces_count = process_photo_faces(photo)
-                        print(f"  👤 Detected {faces_count} face(s) - Total progress: {uploaded_count}/{total_files}")
-                    except Exception as face_error:
-                        print(f"  ⚠️  Face processing failed: {str(face_error)}")
-                        # Continue anyway, photo is uploaded
-                
-                except Exception as e:
-                    error_count += 1
-                    print(f"  ❌ Upload failed: {str(e)}")
-                    messages.warning(request, f'{file.name}: Error - {str(e)}')
-            
-            print(f"\n{'='*60}")
-            print(f"✅ Upload complete! Success: {uploaded_count}, Failed: {error_count}")
-            print(f"{'='*60}\n")
-            
-            if uploaded_count > 0:
-                messages.success(request, f'Successfully uploaded {uploaded_count} photos! Face detection will run in the background.')
-            if error_count > 0:
-                messages.warning(request, f'Failed to upload {error_count} files.')
+            if summary['queued'] > 0:
+                messages.success(request, f'{summary["queued"]} photos queued! Upload and face detection are running in the background - follow progress on the dashboard.')
+            if summary['skipped'] > 0:
+                messages.info(request, f'Skipped {summary["skipped"]} photos that were already uploaded to this event.')
+            if summary['failed'] > 0:
+                for filename, error in batch.items.filter(status=UploadItem.Status.FAILED).values_list('filename', 'message'):
+                    messages.warning(request, f'{filename}: {error}')
             
             return redirect('event_detail', slug=event.slug)
     else:
@@ -802,6 +833,117 @@ def upload_photos(request, slug):
     return render(request, 'events/admin/upload_photos.html', context)
 
 
+@admin_required
+def upload_progress(request, batch_id):
+    """
+    Progress of a queued upload batch (JSON, polled by the upload page and dashboard)
+    """
+    batch = get_object_or_404(UploadBatch.objects.select_related('event'), id=batch_id)
+    include_items = request.GET.get('items', '1') != '0'
+    return JsonResponse(batch_progress(batch, include_items=include_items))
+
+
+@admin_required
+def event_deletion_progress(request, deletion_id):
+    """
+    Progress of a background event deletion (JSON, polled by the dashboard)
+    """
+    deletion = get_object_or_404(EventDeletion, id=deletion_id)
+    return JsonResponse(deletion_progress(deletion))
+
+
+@admin_required
+@require_http_methods(["POST"])
+def create_upload_session(request, slug):
+    """
+    Start a chunked upload session (JSON)
+    
+    The client then sends each file, or each chunk of a large file, to the
+    chunk URL and closes the session with the complete URL. A client that
+    was interrupted reads the progress URL and resumes each file from its
+    received_bytes.
+    """
+    event = get_object_or_404(Event, slug=slug)
+    batch = open_upload_session(event, uploaded_by=request.user)
+    print(f"📦 Opened upload session {batch.id} for {event.name}")
+    
+    return JsonResponse({
+        'success': True,
+        'batch_id': str(batch.id),
+        'chunk_size': settings.UPLOAD_CHUNK_SIZE,
+        'chunk_url': reverse('upload_chunk', args=[batch.id]),
+        'complete_url': reverse('complete_upload_session', args=[batch.id]),
+        'progress_url': reverse('upload_progress', args=[batch.id]),
+    }, status=201)
+
+
+@admin_required
+@require_http_methods(["POST"])
+def upload_chunk(request, batch_id):
+    """
+    Receive one chunk of a file in a chunked upload session (JSON)
+    
+    POST fields: key (idempotency key of the file), filename, size (of the
+    whole file), offset (of this chunk), optional position (of the file in
+    the client's list) and the chunk itself as 'chunk'.
+    Responds 409 with received_bytes when the chunk does not continue the
+    file, so the client can resend from there.
+    """
+    batch = get_object_or_404(UploadBatch.objects.select_related('event'), id=batch_id)
+    chunk = request.FILES.get('chunk')
+    upload_key = request.POST.get('key', '')
+    filename = os.path.basename(request.POST.get('filename', ''))
+    
+    try:
+        size = int(request.POST.get('size', ''))
+        offset = int(request.POST.get('offset', ''))
+        position = int(request.POST['position']) if request.POST.get('position') else None
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'size, offset and position must be integers'}, status=400)
+    
+    if chunk is None or not filename or not upload_key or len(upload_key) > 64 or size <= 0 or offset < 0 \
+            or (position is not None and position < 0):
+        return JsonResponse({'success': False, 'error': 'key, filename, size, offset and chunk are required'}, status=400)
+    if chunk.size > settings.UPLOAD_CHUNK_SIZE:
+        return JsonResponse({'success': False, 'error': f'Chunks may be at most {settings.UPLOAD_CHUNK_SIZE} bytes'}, status=400)
+    
+    if not batch.is_open:
+        # A retry after the session was closed still learns the file's outcome
+        item = batch.items.filter(upload_key=upload_key).first()
+        if item is None or item.status == UploadItem.Status.RECEIVING:
+            return JsonResponse({'success': False, 'error': 'Upload session is closed'}, status=409)
+        error = None
+    else:
+        item, error = receive_chunk(batch, upload_key, filename, size, offset, chunk, position=position)
+    
+    if item is None:
+        return JsonResponse({'success': False, 'error': error}, status=400)
+    
+    return JsonResponse({
+        'success': error is None,
+        'error': error,
+        'key': item.upload_key,
+        'position': item.position,
+        'status': item.status,
+        'message': item.message,
+        'size': item.size,
+        'received_bytes': item.received_bytes,
+    }, status=409 if error else 200)
+
+
+@admin_required
+@require_http_methods(["POST"])
+def complete_upload_session(request, batch_id):
+    """
+    Close a chunked upload session once the client has sent every file (JSON)
+    """
+    batch = get_object_or_404(UploadBatch.objects.select_related('event'), id=batch_id)
+    if batch.is_open:
+        close_upload_session(batch)
+        print(f"📦 Closed upload session {batch.id}")
+    return JsonResponse(batch_progress(batch))
+
+
 @admin_required
 def delete_photo(request, photo_id):
     """
@@ -827,7 +969,6 @@ def analytics(request):
     """
     Analytics and statistics page
     """
-    from django.db.models import Sum
     from django.contrib.auth import get_user_model
     from django.utils import timezone
     from datetime import timedelta
@@ -835,9 +976,10 @@ def analytics(request):
     User = get_user_model()
     
     # Overall statistics
+    totals = Event.objects.aggregate(photos=Sum('photo_count'), faces=Sum('face_count'))
     total_events = Event.objects.count()
-    total_photos = Photo.objects.count()
-    total_faces = FaceEncoding.objects.count()
+    total_photos = totals['photos'] or 0
+    total_faces = totals['faces'] or 0
     total_searches = SearchHistory.objects.count()
     total_users = User.objects.count()
     
@@ -859,12 +1001,10 @@ def analytics(request):
     ).order_by('-last_login')[:20]
     
     # Events with most photos
-    top_events = Event.objects.annotate(
-        photo_count=Count('photos')
-    ).order_by('-photo_count')[:10]
+    top_events = list(Event.objects.order_by('-photo_count')[:10])
     
     # Calculate percentages for chart
-    max_photos = top_events.first().photo_count if top_events.exists() else 1
+    max_photos = top_events[0].photo_count if top_events else 1
     for event in top_events:
         event.percentage = (event.photo_count / max_photos * 100) if max_photos > 0 else 0
     
@@ -905,31 +1045,13 @@ def delete_photo(request, photo_id):
     """
     Delete a single photo from database and Cloudinary
     """
-    import cloudinary.uploader
-    
-    photo = get_object_or_404(Photo, id=photo_id)
+    photo = get_object_or_404(Photo.objects.select_related('event').only('id', 'event__slug'), id=photo_id)
+    event_slug = photo.event.slug
     
     try:
-        # Delete from Cloudinary
-        if photo.image:
-            try:
-                # Extract public_id from Cloudinary URL
-                url_parts = str(photo.image).split('/')
-                if 'upload' in url_parts:
-                    upload_index = url_parts.index('upload')
-                    public_id_with_ext = '/'.join(url_parts[upload_index + 2:])
-                    public_id = public_id_with_ext.rsplit('.', 1)[0]
-                    
-                    # Delete from Cloudinary
-                    result = cloudinary.uploader.destroy(public_id)
-                    if result.get('result') != 'ok':
-                        messages.warning(request, f'Photo removed from database but Cloudinary deletion returned: {result.get("result")}')
-            except Exception as e:
-                messages.warning(request, f'Photo removed from database but Cloudinary deletion failed: {str(e)}')
-        
-        # Delete from database (cascade deletes FaceEncodings)
-        event_id = photo.event.id
-        photo.delete()
+        result = delete_photos([photo.id])
+        if result['failed']:
+            raise Exception(result['errors'][0])
         
         messages.success(request, 'Photo deleted successfully!')
         
@@ -937,14 +1059,14 @@ def delete_photo(request, photo_id):
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({'success': True, 'message': 'Photo deleted successfully'})
         else:
-            return redirect('manage_event', event_id=event_id)
+            return redirect('event_detail', slug=event_slug)
             
     except Exception as e:
         messages.error(request, f'Error deleting photo: {str(e)}')
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({'success': False, 'error': str(e)})
         else:
-            return redirect('manage_event', event_id=event_id)
+            return redirect('event_detail', slug=event_slug)
 
 
 @admin_required
@@ -952,10 +1074,10 @@ def delete_photo(request, photo_id):
 def bulk_delete_photos(request):
     """
     Delete multiple photos at once (admin only)
-    """
-    import cloudinary.uploader
-    import json
     
+    Photos are loaded in one query, removed from Cloudinary with bulk
+    delete calls and deleted from the database together (see deletion.py).
+    """
     try:
         # Get photo IDs from request
         photo_ids = request.POST.getlist('photo_ids[]')
@@ -963,47 +1085,19 @@ def bulk_delete_photos(request):
         if not photo_ids:
             return JsonResponse({'success': False, 'error': 'No photos selected'})
         
-        deleted_count = 0
-        failed_count = 0
-        errors = []
-        
-        for photo_id in photo_ids:
-            try:
-                photo = Photo.objects.get(id=photo_id)
-                
-                # Delete from Cloudinary
-                if photo.image:
-                    try:
-                        url_parts = str(photo.image).split('/')
-                        if 'upload' in url_parts:
-                            upload_index = url_parts.index('upload')
-                            public_id_with_ext = '/'.join(url_parts[upload_index + 2:])
-                            public_id = public_id_with_ext.rsplit('.', 1)[0]
-                            cloudinary.uploader.destroy(public_id)
-                    except Exception as e:
-                        print(f"Cloudinary deletion failed for {photo_id}: {e}")
-                
-                # Delete from database
-                photo.delete()
-                deleted_count += 1
-                
-            except Photo.DoesNotExist:
-                failed_count += 1
-                errors.append(f"Photo {photo_id} not found")
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"Error deleting photo {photo_id}: {str(e)}")
+        result = delete_photos(photo_ids)
+        failed_count = result['failed'] + result['missing']
         
-        message = f"Successfully deleted {deleted_count} photo(s)"
+        message = f"Successfully deleted {result['deleted']} photo(s)"
         if failed_count > 0:
             message += f", {failed_count} failed"
         
         return JsonResponse({
             'success': True,
             'message': message,
-            'deleted': deleted_count,
+            'deleted': result['deleted'],
             'failed': failed_count,
-            'errors': errors
+            'errors': result['errors']
         })
         
     except Exception as e:
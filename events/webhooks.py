@@ -0,0 +1,227 @@
+"""
+Cloudinary upload notifications for Hackotsava 2025
+
+Photographers can upload straight to Cloudinary; with the account's
+notification URL pointed at the cloudinary_webhook view, every upload is
+announced to us within seconds. The notification is checked against its
+signature, the Photo is created (once per public_id, however often
+Cloudinary retries) and face processing is queued in the background pool,
+so the photo becomes searchable without anyone running a sync.
+
+The event a photo belongs to comes from, in order: an 'event' context
+value on the upload, the longest Cloudinary sync folder (SyncCheckpoint)
+containing it, CLOUDINARY_WEBHOOK_EVENT, or the one event syncing the
+whole account.
+
+send_notification is a local stand-in for Cloudinary: it signs a resource
+the same way and posts it to the endpoint (or a test client).
+"""
+
+import json
+import time
+
+import cloudinary
+import cloudinary.utils
+import requests
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from . import tasks
+from .cloudinary_sync import is_rendition
+from .deletion import folder_prefix
+from .face_utils import process_photo_faces
+from .models import Event, Photo, SyncCheckpoint
+
+
+def configure_cloudinary():
+    """Configure the Cloudinary SDK from settings if nothing else has yet"""
+    if not cloudinary.config().api_secret:
+        cloudinary.config(
+            cloud_name=settings.CLOUDINARY_STORAGE['CLOUD_NAME'],
+            api_key=settings.CLOUDINARY_STORAGE['API_KEY'],
+            api_secret=settings.CLOUDINARY_STORAGE['API_SECRET']
+        )
+
+
+def verify_notification(body, timestamp, signature):
+    """
+    Check the X-Cld-Signature of a notification.
+
+    Args:
+        body: Raw request body (str)
+        timestamp: X-Cld-Timestamp header as an int
+        signature: X-Cld-Signature header
+
+    Returns:
+        bool: True if Cloudinary (or someone with the API secret) sent it
+        within the last CLOUDINARY_WEBHOOK_MAX_AGE seconds
+    """
+    configure_cloudinary()
+    if not signature:
+        return False
+    return cloudinary.utils.verify_notification_signature(
+        body, timestamp, signature, valid_for=settings.CLOUDINARY_WEBHOOK_MAX_AGE
+    )
+
+
+def resolve_event(resource):
+    """
+    Find the event an uploaded resource belongs to.
+
+    Returns:
+        Event or None
+    """
+    context = resource.get('context')
+    custom = context.get('custom', context) if isinstance(context, dict) else {}
+    slug = custom.get('event')
+    if slug:
+        event = Event.objects.filter(slug=slug).first()
+        if event:
+            return event
+
+    public_id = resource['public_id']
+    checkpoints = SyncCheckpoint.objects.filter(event__deleted_at__isnull=True).select_related('event')
+    matches = [
+        checkpoint for checkpoint in checkpoints.exclude(folder='')
+        if public_id.startswith(folder_prefix(checkpoint.folder))
+    ]
+    if matches:
+        return max(matches, key=lambda checkpoint: len(folder_prefix(checkpoint.folder))).event
+
+    if settings.CLOUDINARY_WEBHOOK_EVENT:
+        event = Event.objects.filter(slug=settings.CLOUDINARY_WEBHOOK_EVENT).first()
+        if event:
+            return event
+
+    # An account-wide sync (folder '') only claims uploads nothing else does,
+    # and only when a single event syncs the whole account
+    root_events = {checkpoint.event for checkpoint in checkpoints.filter(folder='')}
+    if len(root_events) == 1:
+        return root_events.pop()
+    return None
+
+
+def _process_notified_photo(photo_id):
+    photo = Photo.objects.filter(pk=photo_id).first()
+    if photo is not None and not photo.faces_processed:
+        process_photo_faces(photo)
+
+
+def handle_notification(payload):
+    """
+    Create the Photo for an upload notification and queue its face processing.
+
+    Only image uploads are handled. Uploads made by the app itself (tagged
+    with the storage's MEDIA_TAG) are left to the ingestion that made them,
+    as are our renditions.
+
+    Returns:
+        dict: {'status' ('created' | 'exists' | 'ignored'), 'photo_id', 'reason'}
+    """
+    result = {'status': 'ignored', 'photo_id': None, 'reason': ''}
+
+    if payload.get('notification_type') != 'upload':
+        result['reason'] = f"notification type {payload.get('notification_type')!r}"
+        return result
+    if payload.get('resource_type', 'image') != 'image' or payload.get('type', 'upload') != 'upload':
+        result['reason'] = 'not a public image upload'
+        return result
+
+    public_id = payload.get('public_id')
+    if not public_id or not payload.get('secure_url'):
+        result['reason'] = 'public_id and secure_url are required'
+        return result
+    if settings.CLOUDINARY_STORAGE.get('MEDIA_TAG', 'media') in (payload.get('tags') or []):
+        result['reason'] = 'uploaded by the app'
+        return result
+    if is_rendition(public_id):
+        result['reason'] = 'rendition'
+        return result
+
+    existing = Photo.objects.filter(public_id=public_id).values_list('id', flat=True).first()
+    if existing:
+        result.update(status='exists', photo_id=existing)
+        return result
+
+    event = resolve_event(payload)
+    if event is None:
+        result['reason'] = 'no event for this folder'
+        return result
+
+    try:
+        with transaction.atomic():
+            photo = Photo.from_cloudinary_resource(payload, event=event)
+            photo.save()
+            transaction.on_commit(lambda: tasks.submit(_process_notified_photo, photo.id))
+    except IntegrityError:
+        # Cloudinary retried while the first delivery was being handled
+        existing = Photo.objects.filter(public_id=public_id).values_list('id', flat=True).first()
+        result.update(status='exists', photo_id=existing)
+        return result
+
+    print(f"📨 Photo {public_id} added to {event.name} from an upload notification")
+    result.update(status='created', photo_id=photo.id)
+    return result
+
+
+def sign_notification(body, timestamp=None):
+    """
+    Headers Cloudinary would send with a notification body.
+
+    Returns:
+        dict: X-Cld-Timestamp and X-Cld-Signature
+    """
+    configure_cloudinary()
+    timestamp = int(timestamp or time.time())
+    signature = cloudinary.utils.compute_hex_hash(
+        f"{body}{timestamp}{cloudinary.config().api_secret}",
+        cloudinary.config().signature_algorithm
+    )
+    return {'X-Cld-Timestamp': str(timestamp), 'X-Cld-Signature': signature}
+
+
+def upload_notification(resource):
+    """Build an upload notification payload from an Admin API resource dict"""
+    payload = {
+        'notification_type': 'upload',
+        'resource_type': 'image',
+        'type': 'upload',
+    }
+    payload.update(resource)
+    return payload
+
+
+def send_notification(resource, url=None, client=None):
+    """
+    Deliver a signed upload notification the way Cloudinary does.
+
+    Args:
+        resource: Resource dict (public_id, secure_url, width, height, bytes, ...)
+        url: Webhook URL to POST to
+        client: django.test.Client to post through instead of the network
+            (url is then a path and defaults to the cloudinary_webhook route)
+
+    Returns:
+        tuple: (status_code, response JSON)
+    """
+    body = json.dumps(upload_notification(resource))
+    headers = sign_notification(body)
+
+    if client is not None:
+        from django.urls import reverse
+
+        response = client.post(
+            url or reverse('cloudinary_webhook'),
+            data=body,
+            content_type='application/json',
+            headers=headers
+        )
+        return response.status_code, response.json()
+
+    response = requests.post(
+        url,
+        data=body,
+        headers={**headers, 'Content-Type': 'application/json'},
+        timeout=settings.MEDIA_FETCH_TIMEOUT
+    )
+    return response.status_code, response.json()
@@ -82,6 +82,8 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Face-processing and background threads write concurrently; wait for the lock instead of failing
+            'OPTIONS': {'timeout': 30},
         }
     }
 
@@ -138,6 +140,97 @@ LOGOUT_REDIRECT_URL = 'home'
 FACE_RECOGNITION_TOLERANCE = config('FACE_RECOGNITION_TOLERANCE', default=0.6, cast=float)
 MAX_UPLOAD_SIZE = config('MAX_UPLOAD_SIZE', default=20971520, cast=int)  # 20MB
 
+# Local cache of face detection results, keyed by image hash and model version
+FACE_EMBEDDING_CACHE_ENABLED = config('FACE_EMBEDDING_CACHE_ENABLED', default=True, cast=bool)
+FACE_EMBEDDING_CACHE_PATH = config('FACE_EMBEDDING_CACHE_PATH', default=str(BASE_DIR / 'cache' / 'face_embeddings.sqlite3'))
+FACE_EMBEDDING_CACHE_MAX_BYTES = config('FACE_EMBEDDING_CACHE_MAX_BYTES', default=268435456, cast=int)  # 256MB
+
+# Image downloads: pooled session with retries, prefetch pool and LRU disk cache of originals
+MEDIA_FETCH_WORKERS = config('MEDIA_FETCH_WORKERS', default=8, cast=int)
+MEDIA_FETCH_TIMEOUT = config('MEDIA_FETCH_TIMEOUT', default=30, cast=int)
+MEDIA_FETCH_RETRIES = config('MEDIA_FETCH_RETRIES', default=3, cast=int)
+MEDIA_FETCH_CACHE_ENABLED = config('MEDIA_FETCH_CACHE_ENABLED', default=True, cast=bool)
+MEDIA_FETCH_CACHE_DIR = config('MEDIA_FETCH_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'originals'))
+MEDIA_FETCH_CACHE_MAX_BYTES = config('MEDIA_FETCH_CACHE_MAX_BYTES', default=1073741824, cast=int)  # 1GB
+
+# "Download all" ZIPs are streamed; the limit caps photos per archive (0 = no limit)
+DOWNLOAD_ZIP_MAX_PHOTOS = config('DOWNLOAD_ZIP_MAX_PHOTOS', default=500, cast=int)
+DOWNLOAD_ZIP_READ_AHEAD = config('DOWNLOAD_ZIP_READ_AHEAD', default=4, cast=int)
+
+# Cloudinary renditions fetched for face processing (longest side in px, 0 = original)
+FACE_DETECTION_RENDITION_SIZE = config('FACE_DETECTION_RENDITION_SIZE', default=1024, cast=int)
+FACE_REEMBED_RENDITION_SIZE = config('FACE_REEMBED_RENDITION_SIZE', default=2048, cast=int)
+
+# Photos face-processed at once when many are processed together (e.g. after a Cloudinary sync);
+# DeepFace inference is serialised, the workers overlap downloads and database writes
+FACE_PROCESSING_WORKERS = config('FACE_PROCESSING_WORKERS', default=os.cpu_count() or 2, cast=int)
+
+# Resized copies stored at ingestion for gallery pages (longest side in px)
+PHOTO_RENDITIONS_ENABLED = config('PHOTO_RENDITIONS_ENABLED', default=True, cast=bool)
+PHOTO_THUMBNAIL_SIZE = config('PHOTO_THUMBNAIL_SIZE', default=480, cast=int)
+PHOTO_MEDIUM_SIZE = config('PHOTO_MEDIUM_SIZE', default=1600, cast=int)
+PHOTO_RENDITION_QUALITY = config('PHOTO_RENDITION_QUALITY', default=82, cast=int)
+
+# Cache for anonymous pages and template fragments: 'locmem' (per process),
+# 'file' or 'db' (run `python manage.py createcachetable` first). Keys carry
+# event versions, so entries never need deleting and any backend works.
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+PAGE_CACHE_SECONDS = config('PAGE_CACHE_SECONDS', default=600, cast=int)
+CACHES = {
+    'default': {
+        'BACKEND': {
+            'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+            'file': 'django.core.cache.backends.filebased.FileBasedCache',
+            'db': 'django.core.cache.backends.db.DatabaseCache',
+        }[CACHE_BACKEND],
+        'LOCATION': config('CACHE_LOCATION', default={
+            'locmem': 'hackotsava',
+            'file': str(BASE_DIR / 'cache' / 'pages'),
+            'db': 'hackotsava_cache',
+        }[CACHE_BACKEND]),
+        'TIMEOUT': PAGE_CACHE_SECONDS,
+        'OPTIONS': {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=5000, cast=int)},
+    }
+}
+
+# How long photo grid totals are cached (seconds)
+PHOTO_COUNT_CACHE_SECONDS = config('PHOTO_COUNT_CACHE_SECONDS', default=300, cast=int)
+
+# Widths (px) offered in the srcset of gallery images served by Cloudinary
+PHOTO_SRCSET_WIDTHS = [int(w) for w in config('PHOTO_SRCSET_WIDTHS', default='320,480,640,960,1280,1600').split(',')]
+
+# Cloudinary sync: images listed per Admin API call and Photo rows per insert
+CLOUDINARY_SYNC_PAGE_SIZE = config('CLOUDINARY_SYNC_PAGE_SIZE', default=500, cast=int)
+CLOUDINARY_SYNC_BATCH_SIZE = config('CLOUDINARY_SYNC_BATCH_SIZE', default=200, cast=int)
+
+# Cloudinary bulk deletes (up to 100 images per call) made at once
+CLOUDINARY_DELETE_WORKERS = config('CLOUDINARY_DELETE_WORKERS', default=4, cast=int)
+
+# Photos deleted per batch by the background deletion of an event
+EVENT_DELETION_BATCH_SIZE = config('EVENT_DELETION_BATCH_SIZE', default=500, cast=int)
+
+# Cloudinary upload notifications: event for uploads outside any synced folder
+# (slug, '' to ignore them) and how old a signed notification may be (seconds)
+CLOUDINARY_WEBHOOK_EVENT = config('CLOUDINARY_WEBHOOK_EVENT', default='')
+CLOUDINARY_WEBHOOK_MAX_AGE = config('CLOUDINARY_WEBHOOK_MAX_AGE', default=7200, cast=int)
+
+# Parallel Cloudinary uploads and extra attempts per file before giving up
+UPLOAD_WORKERS = config('UPLOAD_WORKERS', default=6, cast=int)
+UPLOAD_RETRIES = config('UPLOAD_RETRIES', default=2, cast=int)
+
+# Threads for in-process background work: jobs (queued upload ingestion) and
+# the network calls they make (Cloudinary uploads)
+BACKGROUND_WORKERS = config('BACKGROUND_WORKERS', default=2, cast=int)
+BACKGROUND_IO_WORKERS = config('BACKGROUND_IO_WORKERS', default=UPLOAD_WORKERS, cast=int)
+
+# Uploaded files wait here until the background ingestion has stored them
+UPLOAD_STAGING_DIR = config('UPLOAD_STAGING_DIR', default=str(BASE_DIR / 'cache' / 'uploads'))
+
+# Chunked upload sessions: largest chunk per request, and how long an
+# unfinished session may stay open before resume_uploads closes it
+UPLOAD_CHUNK_SIZE = config('UPLOAD_CHUNK_SIZE', default=4194304, cast=int)  # 4MB
+UPLOAD_SESSION_MAX_AGE_HOURS = config('UPLOAD_SESSION_MAX_AGE_HOURS', default=24, cast=int)
+
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 20971520  # 20MB per file
 DATA_UPLOAD_MAX_MEMORY_SIZE = 524288000  # 500MB total upload size
@@ -6,8 +6,12 @@ INSTRUCTIONS:
 1. Place your photos in a folder (e.g., "photos_to_upload")
 2. Run: python manual_upload_photos.py
 3. Photos will be uploaded to Cloudinary and added to the database
+
+Several photos are uploaded at once (UPLOAD_WORKERS, or the optional second
+argument: python manual_upload_photos.py <folder> <workers>).
 """
 
+import mimetypes
 import os
 import sys
 import django
@@ -19,22 +23,32 @@ sys.path.insert(0, str(BASE_DIR))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hackotsava_project.settings')
 django.setup()
 
-from django.core.files import File
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import UploadedFile
 from events.models import Event, Photo
-from events.face_utils import process_photo_faces
+from events.uploads import UploadStats, upload_concurrently
+from events.images import IngestionImage
+from events.renditions import generate_photo_renditions
+from events.face_utils import (
+    process_photo_faces,
+    compute_content_hash,
+    find_duplicate_photo,
+    detect_faces_for_upload,
+    validate_image_file,
+)
 import cloudinary
 import cloudinary.uploader
 
 User = get_user_model()
 
-def upload_photos_to_event(photos_folder, event_slug='hackotsava-2025'):
+def upload_photos_to_event(photos_folder, event_slug='hackotsava-2025', workers=None):
     """
     Upload all photos from a folder to an event
     
     Args:
         photos_folder: Path to folder containing photos
         event_slug: Slug of the event (default: hackotsava-2025)
+        workers: Number of parallel uploads (default: UPLOAD_WORKERS setting)
     """
     
     # Get or create the event
@@ -82,30 +96,85 @@ def upload_photos_to_event(photos_folder, event_slug='hackotsava-2025'):
     print(f"{'='*60}\n")
     
     uploaded_count = 0
+    skipped_count = 0
     error_count = 0
     
-    for index, filename in enumerate(photo_files, 1):
+    # Skip invalid files and files already in this event (same bytes) before uploading anything
+    pending = []
+    seen_hashes = set()
+    for filename in photo_files:
         file_path = os.path.join(photos_folder, filename)
-        print(f"[{index}/{len(photo_files)}] {filename}")
-        
         try:
-            # Open and upload the photo
-            with open(file_path, 'rb') as photo_file:
-                # Create Photo object - Django + Cloudinary will handle upload
-                django_file = File(photo_file, name=filename)
-                photo = Photo.objects.create(
-                    event=event,
-                    image=django_file,
-                    uploaded_by=admin_user
+            with open(file_path, 'rb') as f:
+                local_file = UploadedFile(
+                    f, name=filename, size=os.path.getsize(file_path),
+                    content_type=mimetypes.guess_type(filename)[0],
                 )
+                is_valid, error_msg = validate_image_file(local_file)
+                if not is_valid:
+                    error_count += 1
+                    print(f"❌ {filename}: {error_msg}")
+                    continue
+                content_hash = compute_content_hash(local_file)
+        except Exception as e:
+            error_count += 1
+            print(f"❌ {filename}: {str(e)}")
+            continue
+        duplicate = find_duplicate_photo(content_hash, event=event)
+        if duplicate or content_hash in seen_hashes:
+            print(f"⏭️  {filename}: already uploaded, skipping")
+            skipped_count += 1
+            continue
+        seen_hashes.add(content_hash)
+        pending.append((filename, file_path, content_hash))
+    
+    hashes = {filename: content_hash for filename, _, content_hash in pending}
+    files = [(filename, file_path, filename) for filename, file_path, _ in pending]
+    stats = UploadStats()
+    
+    # Uploads finish in any order; each photo is saved and face-processed as soon as its upload is done
+    for index, (filename, upload, error) in enumerate(upload_concurrently(files, workers=workers, stats=stats), 1):
+        print(f"[{index}/{len(files)}] {filename}")
+        if error is not None:
+            error_count += 1
+            print(f"  ❌ Error: {str(error)}")
+            continue
+        
+        photo = None
+        try:
+            # Read and decode once for the hash, renditions and face detection
+            with open(os.path.join(photos_folder, filename), 'rb') as photo_file:
+                image_bytes = photo_file.read()
+            image = IngestionImage(image_bytes, filename)
+            perceptual_hash = image.perceptual_hash()
+            width, height = image.original_size
+            
+            photo = Photo(
+                event=event,
+                uploaded_by=admin_user,
+                content_hash=hashes[filename],
+                perceptual_hash=perceptual_hash,
+                width=width,
+                height=height,
+                bytes=len(image_bytes)
+            )
+            photo.image.name = upload['name']
+            photo.save()
             
-            print(f"  ✅ Uploaded to Cloudinary")
-            print(f"  📍 URL: {photo.image.url}")
+            print(f"  ✅ Uploaded to Cloudinary in {upload['seconds']:.2f}s")
+            print(f"  📍 URL: {photo.secure_url}")
             uploaded_count += 1
             
+            # Thumbnails for the gallery pages
+            try:
+                generate_photo_renditions(photo, image=image)
+            except Exception as rendition_error:
+                print(f"  ⚠️  Renditions: {str(rendition_error)}")
+            
             # Process faces
             try:
-                faces_count = process_photo_faces(photo)
+                detection = detect_faces_for_upload(image, hashes[filename])
+                faces_count = process_photo_faces(photo, image_bytes=image_bytes, detection=detection)
                 print(f"  👤 Detected {faces_count} face(s)")
             except Exception as face_error:
                 print(f"  ⚠️  Face processing: {str(face_error)}")
@@ -113,12 +182,20 @@ def upload_photos_to_event(photos_folder, event_slug='hackotsava-2025'):
         except Exception as e:
             error_count += 1
             print(f"  ❌ Error: {str(e)}")
+            if photo is None or photo.pk is None:
+                # No photo refers to the upload; don't leave it orphaned on Cloudinary
+                try:
+                    Photo._meta.get_field('image').storage.delete(upload['name'])
+                except Exception as delete_error:
+                    print(f"  ⚠️  Could not delete {upload['name']}: {str(delete_error)}")
     
     print(f"\n{'='*60}")
     print(f"✅ Upload Complete!")
     print(f"Total: {len(photo_files)}")
     print(f"Uploaded: {uploaded_count}")
+    print(f"Skipped (duplicates): {skipped_count}")
     print(f"Failed: {error_count}")
+    print(f"Throughput: {stats}")
     print(f"{'='*60}\n")
     
     if uploaded_count > 0:
@@ -160,7 +237,7 @@ if __name__ == "__main__":
     if not photos_folder:
         print("\n❌ No folder specified!")
         print("\nUsage:")
-        print("  python manual_upload_photos.py <folder_path>")
+        print("  python manual_upload_photos.py <folder_path> [workers]")
         print("\nExample:")
         print("  python manual_upload_photos.py photos_to_upload")
         sys.exit(1)
@@ -170,5 +247,7 @@ if __name__ == "__main__":
     if not event_slug:
         event_slug = 'hackotsava-2025'
     
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    
     # Upload photos
-    upload_photos_to_event(photos_folder, event_slug)
+    upload_photos_to_event(photos_folder, event_slug, workers)
@@ -8,6 +8,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hackotsava_project.settings')
 django.setup()
 
 from django.contrib.auth import get_user_model
+from events.deletion import delete_photos
 from events.models import Event, Photo, SearchHistory
 
 User = get_user_model()
@@ -21,11 +22,11 @@ def reset_database():
     searches.delete()
     print(f"   ✅ Deleted {count} search records")
     
-    # Delete all photos
-    photos = Photo.objects.all()
-    count = photos.count()
-    photos.delete()
-    print(f"   ✅ Deleted {count} photos")
+    # Delete all photos, with their Cloudinary originals and renditions
+    result = delete_photos(Photo.objects.all())
+    print(f"   ✅ Deleted {result['deleted']} photos")
+    if result['failed']:
+        print(f"   ⚠️  Kept {result['failed']} photos whose Cloudinary files could not be deleted")
     
     # Delete all events
     events = Event.objects.all()
@@ -66,7 +67,6 @@ def reset_database():
         print(f"   🔑 Password: Kotian@2005")
     
     print("\n✨ Database reset complete!")
-    print("\n⚠️  Note: Photos stored on Cloudinary need to be deleted manually from Cloudinary dashboard")
 
 if __name__ == '__main__':
     reset_database()
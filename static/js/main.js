@@ -237,7 +237,7 @@ function createMessageContainer() {
  * Simple lightbox for images
  */
 function initLightbox() {
-    const images = document.querySelectorAll('.gallery-item img, .result-image img');
+    const imageSelector = '.gallery-item img, .result-image img';
     
     // Create lightbox element
     const lightbox = document.createElement('div');
@@ -253,13 +253,20 @@ function initLightbox() {
     const lightboxImg = lightbox.querySelector('img');
     const closeBtn = lightbox.querySelector('.lightbox-close');
     
-    images.forEach(img => {
-        img.style.cursor = 'pointer';
-        img.addEventListener('click', function() {
-            lightboxImg.src = this.src;
-            lightbox.classList.add('active');
-            document.body.style.overflow = 'hidden';
-        });
+    // Delegated, so photos added by infinite scroll open too
+    const cursorStyle = document.createElement('style');
+    cursorStyle.textContent = `${imageSelector} { cursor: pointer; }`;
+    document.head.appendChild(cursorStyle);
+    
+    document.addEventListener('click', function(e) {
+        const img = e.target.closest(imageSelector);
+        if (!img) {
+            return;
+        }
+        // Tiles show a thumbnail; data-full holds the larger rendition
+        lightboxImg.src = img.dataset.full || img.src;
+        lightbox.classList.add('active');
+        document.body.style.overflow = 'hidden';
     });
     
     // Close lightbox
@@ -283,6 +290,47 @@ function initLightbox() {
     }
 }
 
+/**
+ * Infinite scroll for keyset-paginated photo grids
+ *
+ * The pagination block carries the JSON URL of the next page; when it
+ * scrolls into view the page's items are appended to the grid and the
+ * URL advances until the last page. The "Load more" link stays as the
+ * fallback without JavaScript.
+ */
+function initInfiniteScroll() {
+    document.querySelectorAll('[data-infinite-scroll]').forEach(pager => {
+        const grid = document.querySelector(pager.dataset.grid);
+        let nextUrl = pager.dataset.nextUrl;
+        let loading = false;
+        
+        if (!grid || !nextUrl || !('IntersectionObserver' in window)) {
+            return;
+        }
+        
+        const observer = new IntersectionObserver(entries => {
+            if (!entries.some(entry => entry.isIntersecting) || loading || !nextUrl) {
+                return;
+            }
+            loading = true;
+            fetch(nextUrl, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+                .then(response => response.json())
+                .then(page => {
+                    grid.insertAdjacentHTML('beforeend', page.html);
+                    nextUrl = page.next_url;
+                    if (!nextUrl) {
+                        observer.disconnect();
+                        pager.remove();
+                    }
+                })
+                .catch(() => observer.disconnect())
+                .finally(() => { loading = false; });
+        }, { rootMargin: '600px 0px' });
+        
+        observer.observe(pager);
+    });
+}
+
 /**
  * Loading indicator
  */
@@ -340,5 +388,8 @@ if (document.querySelector('.gallery-item, .result-image')) {
     initLightbox();
 }
 
+// Initialize infinite scroll on paginated photo grids
+initInfiniteScroll();
+
 // Initialize smooth scroll
 smoothScroll();
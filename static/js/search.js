@@ -182,7 +182,8 @@ function initDownloadAll() {
             
             if (img && img.src) {
                 try {
-                    await downloadImage(img.src, `photo-${i + 1}.jpg`);
+                    // The card shows a thumbnail; download the original
+                    await downloadImage(img.dataset.original || img.src, `photo-${i + 1}.jpg`);
                     
                     // Small delay between downloads to avoid overwhelming the browser
                     if (i < resultCards.length - 1) {
@@ -15,11 +15,11 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hackotsava_project.settings')
 django.setup()
 
 from django.contrib.auth import get_user_model
+from events.cloudinary_sync import sync_event
+from events.ingestion import process_photos_concurrently
 from events.models import Event, Photo
-from events.face_utils import process_photo_faces
 from django.core.files.base import ContentFile
 import cloudinary
-import cloudinary.api
 import requests
 
 User = get_user_model()
@@ -62,85 +62,34 @@ def sync_cloudinary_photos(event_slug='hackotsava-2025', cloudinary_folder='even
     print(f"{'='*60}\n")
     
     try:
-        # Get photos from Cloudinary folder
+        # Page through the photos uploaded since the last sync
         print(f"Fetching photos from Cloudinary...")
-        if cloudinary_folder and cloudinary_folder.strip():
-            result = cloudinary.api.resources(
-                type='upload',
-                prefix=cloudinary_folder,
-                max_results=500
-            )
-        else:
-            # Get all photos (root folder)
-            result = cloudinary.api.resources(
-                type='upload',
-                max_results=500
-            )
+        stats = sync_event(
+            event,
+            folder=(cloudinary_folder or '').strip(),
+            uploaded_by=admin_user,
+            on_page=lambda page, photos: print(f"  Page {page}: created {len(photos)} photos")
+        )
+        print(f"Listed {stats['listed']} photos in Cloudinary since the last sync\n")
         
-        cloudinary_photos = result.get('resources', [])
-        print(f"Found {len(cloudinary_photos)} photos in Cloudinary\n")
+        synced_count = stats['created']
+        skipped_count = stats['existing']
+        error_count = stats['errors']
         
-        if not cloudinary_photos:
-            print("❌ No photos found in Cloudinary folder!")
-            print(f"Please check the folder path: {cloudinary_folder}")
-            return
-        
-        synced_count = 0
-        skipped_count = 0
-        error_count = 0
-        
-        for index, photo_data in enumerate(cloudinary_photos, 1):
-            public_id = photo_data['public_id']
-            filename = public_id.split('/')[-1]
-            url = photo_data['secure_url']
-            
-            print(f"[{index}/{len(cloudinary_photos)}] {filename}")
-            print(f"  URL: {url}")
-            
-            try:
-                # Check if photo already exists in database
-                existing_photo = Photo.objects.filter(image__icontains=filename).first()
-                
-                if existing_photo:
-                    print(f"  ⏭️  Already in database (ID: {existing_photo.id})")
-                    skipped_count += 1
-                    
-                    # Process faces if not done
-                    if not existing_photo.faces_processed:
-                        try:
-                            faces_count = process_photo_faces(existing_photo)
-                            print(f"  👤 Detected {faces_count} face(s)")
-                        except Exception as e:
-                            print(f"  ⚠️  Face processing: {str(e)}")
-                    continue
-                
-                # Create new Photo entry with Cloudinary URL
-                photo = Photo(
-                    event=event,
-                    uploaded_by=admin_user
-                )
-                
-                # Set the image field to the Cloudinary public_id
-                photo.image = public_id
-                photo.save()
-                
-                print(f"  ✅ Created database entry")
-                synced_count += 1
-                
-                # Process faces
-                try:
-                    faces_count = process_photo_faces(photo)
-                    print(f"  👤 Detected {faces_count} face(s)")
-                except Exception as face_error:
-                    print(f"  ⚠️  Face processing: {str(face_error)}")
-                
-            except Exception as e:
+        # New photos, and earlier ones whose faces were never processed
+        pending = event.photos.filter(faces_processed=False).order_by('uploaded_at')
+        total = pending.count()
+        for index, (photo, faces_count, face_error) in enumerate(process_photos_concurrently(pending), 1):
+            print(f"[{index}/{total}] {photo.public_id or photo.id}")
+            if face_error is not None:
                 error_count += 1
-                print(f"  ❌ Error: {str(e)}")
+                print(f"  ⚠️  Face processing: {str(face_error)}")
+            else:
+                print(f"  👤 Detected {faces_count} face(s)")
         
         print(f"\n{'='*60}")
         print(f"✅ Sync Complete!")
-        print(f"Total in Cloudinary: {len(cloudinary_photos)}")
+        print(f"Listed in Cloudinary: {stats['listed']}")
         print(f"Synced to Database: {synced_count}")
         print(f"Skipped (already exists): {skipped_count}")
         print(f"Errors: {error_count}")